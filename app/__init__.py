@@ -1,4 +1,5 @@
-from flask import Flask
+import math
+from flask import Flask, jsonify
 from flask_cors import CORS
 from config.config import Config
 
@@ -18,13 +19,78 @@ def create_app(config_class=Config):
          allow_headers=["Content-Type", "Authorization"],
          methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
     
+    # Define o repositório de usuários conforme a configuração
+    from app.services.user_repository import create_user_repository, set_user_repository
+    set_user_repository(create_user_repository(config_class))
+    
+    # Componentes com threads de segundo plano: as threads começam na primeira requisição
+    # de cada processo (ou no post_fork), nunca aqui; com preload, create_app roda no master
+    # do gunicorn, que não deve ter threads nem locks em uso ao fazer o fork dos workers
+    
+    # Índice de emails e CPFs cadastrados, aquecido em segundo plano
+    from app.services.duplicate_index import init_duplicate_index
+    init_duplicate_index(app)
+    
+    # Índice de busca por nome e email, carregado em segundo plano
+    from app.services.search_index import init_search_index
+    init_search_index(app)
+    
+    # Estatísticas de usuários, reconciliadas periodicamente em segundo plano
+    from app.services.user_stats import init_user_stats
+    init_user_stats(app)
+    
     # Registra blueprints (sem prefixo adicional, pois já está definido no blueprint)
     from app.routes.user_routes import user_bp
     app.register_blueprint(user_bp)
     
+    # Instrumentação de latência e rota /api/metrics
+    from app.utils.metrics import init_metrics
+    init_metrics(app)
+    
+    # Banco indisponível (circuito aberto ou prazo esgotado): 503 em vez de esperar o timeout do socket
+    from app.services.resilience import BackendUnavailable, backend_policy
+    
+    @app.errorhandler(BackendUnavailable)
+    def backend_unavailable(error):
+        response = jsonify({'error': str(error)})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(max(1, math.ceil(backend_policy.breaker.retry_after())))
+        return response
+    
+    # Compressão negociada das respostas grandes
+    from app.utils.compression import init_compression
+    init_compression(app)
+    
     # Rota de verificação de saúde também com prefixo /api
     @app.route('/api/health')
     def health_check():
         return {'status': 'ok'}, 200
     
-    return app
\ No newline at end of file
+    return app
+
+def reset_after_fork():
+    """
+    Recria os recursos do processo herdados do processo pai (hook post_fork do gunicorn)
+    Conexões, locks e threads não são compartilháveis entre processos e os caches começam vazios;
+    o código carregado no pai (preload) continua compartilhado copy-on-write, mas os índices em
+    memória (duplicatas, busca, estatísticas) são carregados por cada worker a partir do banco
+    """
+    from app.services.duplicate_index import duplicate_index
+    from app.services.login_writer import last_login_writer
+    from app.services.resilience import backend_policy
+    from app.services.search_index import search_index
+    from app.services.single_flight import user_lookups
+    from app.services.user_cache import user_cache
+    from app.services.user_stats import user_stats
+    from app.utils.metrics import exporter, metrics
+    
+    Config.reset_after_fork()
+    metrics.reset_after_fork()
+    exporter.reset_after_fork()
+    user_cache.reset_after_fork()
+    user_lookups.reset_after_fork()
+    last_login_writer.reset_after_fork()
+    backend_policy.reset_after_fork()
+    duplicate_index.reset_after_fork()
+    search_index.reset_after_fork()
+    user_stats.reset_after_fork()
@@ -0,0 +1,171 @@
+import io
+import sys
+from typing import Any, Awaitable, Callable, Dict
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from flask import request
+from app import create_app
+from config.config import Config
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+class AsyncFlaskApp:
+    """
+    Aplicação ASGI sobre a aplicação Flask
+
+    As rotas com versão assíncrona (app.routes.async_user_routes) rodam no event loop,
+    com as chamadas ao banco feitas sem bloquear; as demais (exportação, cadastro em lote,
+    rotas administrativas, /api/metrics e OPTIONS) são servidas pela aplicação WSGI,
+    cada requisição na sua própria thread (sem fila única entre elas).
+    Roteamento, hooks (métricas, CORS, compressão) e tratamento de erros são os do Flask.
+    """
+    def __init__(self, flask_app, async_views: Dict[str, Callable[..., Awaitable[Any]]]):
+        self.flask_app = flask_app
+        self.async_views = async_views
+        self.wsgi = WsgiToAsgi(flask_app)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f"Tipo de conexão ASGI não suportado: {scope['type']}")
+
+        body = await _read_body(receive)
+        environ = _build_environ(scope, body)
+
+        adapter = self.flask_app.url_map.bind_to_environ(environ)
+        try:
+            endpoint, _ = adapter.match()
+        except Exception:
+            endpoint = None
+
+        view = self.async_views.get(endpoint)
+        if view is None or scope['method'] == 'OPTIONS':
+            # Contexto próprio: sem ele o WsgiToAsgi (thread_sensitive) executa todas as
+            # requisições em uma única thread compartilhada, uma de cada vez
+            async with ThreadSensitiveContext():
+                await self.wsgi(scope, _replay(body), send)
+            return
+
+        status, headers, chunks = await self._dispatch(environ, view)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b''.join(chunks)})
+
+    async def _dispatch(self, environ: Dict[str, Any], view):
+        """Equivalente assíncrono do Flask.full_dispatch_request para uma view assíncrona"""
+        app = self.flask_app
+        ctx = app.request_context(environ)
+        error = None
+        try:
+            try:
+                ctx.push()
+                try:
+                    rv = app.preprocess_request()
+                    if rv is None:
+                        rv = await view(**request.view_args)
+                except Exception as e:
+                    rv = app.handle_user_exception(e)
+                response = app.finalize_request(rv)
+            except Exception as e:
+                error = e
+                response = app.handle_exception(e)
+            except BaseException:
+                error = sys.exc_info()[1]
+                raise
+            app_iter, status, headers = response.get_wsgi_response(environ)
+            try:
+                chunks = list(app_iter)
+            finally:
+                # Como um servidor WSGI faria: fecha o iterador e executa os call_on_close
+                response.close()
+        finally:
+            ctx.pop(error)
+
+        encoded = [(key.lower().encode('latin-1'), value.encode('latin-1')) for key, value in headers]
+        return int(status.split(' ', 1)[0]), encoded, chunks
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                from app.services.login_writer import last_login_writer
+                last_login_writer.stop()
+                await Config.close_async_postgrest_client()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+async def _read_body(receive: Receive) -> bytes:
+    """Lê o corpo completo da requisição"""
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            break
+    return b''.join(chunks)
+
+def _replay(body: bytes) -> Receive:
+    """receive que entrega novamente um corpo já lido (para a aplicação WSGI)"""
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+    async def receive() -> Dict[str, Any]:
+        if messages:
+            return messages.pop()
+        return {'type': 'http.disconnect'}
+    return receive
+
+def _build_environ(scope: Scope, body: bytes) -> Dict[str, Any]:
+    """Monta o environ WSGI de uma requisição ASGI"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    root_path = scope.get('root_path', '')
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path.encode('utf8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('ascii'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'CONTENT_LENGTH': str(len(body))
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1')
+        value = value.decode('latin-1')
+        if name == 'content-length':
+            continue
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+            continue
+        key = 'HTTP_' + name.upper().replace('-', '_')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+def create_asgi_app(config_class=Config) -> AsyncFlaskApp:
+    """
+    Função fábrica da aplicação ASGI (servida por uvicorn)
+    """
+    flask_app = create_app(config_class)
+
+    # Repositório assíncrono equivalente ao configurado
+    from app.services.async_user_repository import create_async_user_repository, set_async_user_repository
+    set_async_user_repository(create_async_user_repository(config_class))
+
+    from app.routes.async_user_routes import async_user_views
+    return AsyncFlaskApp(flask_app, async_user_views)
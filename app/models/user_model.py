@@ -1,7 +1,31 @@
-from datetime import datetime
-from typing import Dict, Optional, Any
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Any, Sequence
+
+# Colunas da tabela users expostas pela API
+USER_FIELDS = (
+    'id', 'email', 'full_name', 'cpf', 'birth_date', 'status',
+    'role', 'last_login', 'created_at', 'updated_at'
+)
+
+# Colunas que podem ser alteradas em uma atualização (as demais são mantidas pelo servidor)
+USER_EDITABLE_FIELDS = ('email', 'full_name', 'cpf', 'birth_date', 'status', 'role')
+
+# Valores padrão das colunas ausentes
+USER_DEFAULTS = {'status': 'active', 'role': 'user'}
+
+def now_timestamp(seconds_ago: float = 0.0) -> str:
+    """
+    Horário atual (menos seconds_ago segundos) no formato gravado em created_at, updated_at e deleted_at
+    Sempre com microssegundos, para que os textos ordenem como os horários (cursor do feed de alterações)
+    """
+    return (datetime.now() - timedelta(seconds=seconds_ago)).isoformat(timespec='microseconds')
 
 class User:
+    FIELDS = USER_FIELDS
+
+    # Sem __dict__ por instância: reduz memória e alocações em listagens grandes
+    __slots__ = USER_FIELDS
+
     def __init__(
         self,
         id: Optional[int] = None,
@@ -61,11 +85,15 @@ class User:
             'updated_at': self.updated_at
         }
 
-    def to_response_dict(self) -> Dict[str, Any]:
+    def to_response_dict(self, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
         """
         Converte a instância de User para dicionário para resposta da API
         (exclui informações sensíveis)
+        Se fields for informado, retorna apenas essas colunas
         """
+        if fields is not None:
+            return {field: getattr(self, field) for field in fields}
+        
         return {
             'id': self.id,
             'email': self.email,
@@ -77,4 +105,52 @@ class User:
             'last_login': self.last_login,
             'created_at': self.created_at,
             'updated_at': self.updated_at
-        }
\ No newline at end of file
+        }
+
+class UserBatch:
+    """
+    Resultado com várias linhas de usuários armazenado por colunas
+    Serializa para o formato de resposta sem criar um User por linha
+    """
+    __slots__ = ('fields', 'columns')
+
+    def __init__(self, fields: Sequence[str], columns: Sequence[Sequence[Any]]):
+        self.fields = tuple(fields)
+        self.columns = tuple(columns)
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]], fields: Optional[Sequence[str]] = None) -> 'UserBatch':
+        """
+        Cria o lote a partir das linhas retornadas pelo banco
+        Se fields for informado, mantém apenas essas colunas
+        """
+        fields = tuple(fields) if fields else USER_FIELDS
+        columns = []
+        for field in fields:
+            default = USER_DEFAULTS.get(field)
+            columns.append([row.get(field, default) for row in rows])
+        return cls(fields, columns)
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def __iter__(self) -> Iterator[User]:
+        # Cria objetos User sob demanda (usado por quem precisa da instância)
+        for values in zip(*self.columns):
+            yield User(**dict(zip(self.fields, values)))
+
+    def column(self, field: str) -> Sequence[Any]:
+        """Retorna os valores de uma coluna"""
+        return self.columns[self.fields.index(field)]
+
+    def to_response_dicts(self, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Converte o lote para a lista de dicionários da resposta da API
+        Se fields for informado, retorna apenas essas colunas
+        """
+        if fields is None:
+            fields = self.fields
+            columns = self.columns
+        else:
+            columns = [self.column(field) for field in fields]
+        return [dict(zip(fields, values)) for values in zip(*columns)]
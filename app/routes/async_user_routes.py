@@ -0,0 +1,149 @@
+from flask import request, jsonify, current_app
+from app.services.async_user_service import AsyncUserService
+from app.routes.user_routes import _batch_ids, _batch_response, _page_params, _page_response, _user_body
+from app.utils.auth import generate_token
+from app.utils.etag import not_modified
+
+# Versões assíncronas das rotas do user_bp usadas no modo ASGI
+# As funções recebem os mesmos argumentos da rota síncrona e rodam no contexto de requisição do Flask
+
+async def register():
+    """
+    Registra um novo usuário
+    """
+    data = request.get_json()
+
+    user, error = await AsyncUserService.create_user(data)
+
+    if error:
+        return jsonify({'error': error}), 400
+
+    return jsonify({
+        'message': 'Usuário registrado com sucesso',
+        'user': user.to_response_dict()
+    }), 201
+
+async def login():
+    """
+    Login de usuário com username e data de nascimento
+    """
+    data = request.get_json()
+
+    if 'username' not in data or 'birth_date' not in data:
+        return jsonify({'error': 'Username e data de nascimento são obrigatórios'}), 400
+
+    user, error = await AsyncUserService.authenticate_user(data['username'], data['birth_date'])
+
+    if error:
+        return jsonify({'error': error}), 401
+
+    token = generate_token(user.to_dict(), current_app.config['SECRET_KEY'])
+
+    return jsonify({
+        'message': 'Login realizado com sucesso',
+        'token': token,
+        'user': user.to_response_dict()
+    }), 200
+
+async def get_all_users():
+    """
+    Obter usuários paginados por cursor
+    """
+    params, error_response = _page_params()
+    if error_response is not None:
+        return error_response
+
+    users, next_cursor, error = await AsyncUserService.get_all_users(**params)
+
+    if error:
+        return jsonify({'error': error}), 500
+
+    return _page_response(users, next_cursor, **params)
+
+async def get_users_batch():
+    """
+    Obter vários usuários pelo ID em uma única requisição
+    """
+    user_ids, error_response = _batch_ids()
+    if error_response is not None:
+        return error_response
+
+    users, missing, error = await AsyncUserService.get_users_by_ids(user_ids)
+
+    if error:
+        return jsonify({'error': error}), 500
+
+    return _batch_response(users, missing)
+
+async def get_user(user_id):
+    """
+    Obter um usuário pelo ID
+    """
+    return await _user_response(user_id)
+
+async def _user_response(user_id):
+    """
+    Resposta de um usuário com ETag (304 sem buscar a linha completa se o ETag ainda for válido)
+    """
+    if request.if_none_match:
+        etag, _ = await AsyncUserService.get_user_etag(user_id)
+        response = not_modified(etag)
+        if response is not None:
+            return response
+
+    user, error = await AsyncUserService.get_user_by_id(user_id)
+
+    if error:
+        return jsonify({'error': error}), 404
+
+    return _user_body(user)
+
+async def update_user(user_id):
+    """
+    Atualizar um usuário
+    """
+    data = request.get_json()
+    user, error = await AsyncUserService.update_user(user_id, data)
+
+    if error:
+        return jsonify({'error': error}), 400
+
+    return jsonify({
+        'message': 'Usuário atualizado com sucesso',
+        'user': user.to_response_dict()
+    }), 200
+
+async def delete_user(user_id):
+    """
+    Excluir um usuário
+    """
+    success, error = await AsyncUserService.delete_user(user_id)
+
+    if error:
+        return jsonify({'error': error}), 400
+
+    return jsonify({
+        'message': 'Usuário excluído com sucesso'
+    }), 200
+
+async def get_current_user():
+    """
+    Obter o usuário pelo ID fornecido
+    """
+    user_id = request.args.get('id')
+    if not user_id:
+        return jsonify({'error': 'ID do usuário é obrigatório'}), 400
+
+    return await _user_response(user_id)
+
+# Endpoint do Flask -> view assíncrona (os demais endpoints são servidos pela aplicação WSGI)
+async_user_views = {
+    'user.register': register,
+    'user.login': login,
+    'user.get_all_users': get_all_users,
+    'user.get_users_batch': get_users_batch,
+    'user.get_user': get_user,
+    'user.get_current_user': get_current_user,
+    'user.update_user': update_user,
+    'user.delete_user': delete_user
+}
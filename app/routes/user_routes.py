@@ -1,6 +1,20 @@
-from flask import Blueprint, request, jsonify, current_app
-from app.services.user_service import UserService
-from app.utils.auth import generate_token
+import csv
+import io
+import json
+import math
+from flask import Blueprint, Response, request, jsonify, current_app
+from app.services.user_service import INVALID_CURSOR_ERROR, UserService
+from app.services.user_cache import user_cache
+from app.services.duplicate_index import duplicate_index
+from app.services.search_index import search_index
+from app.services.user_stats import user_stats
+from app.services.resilience import backend_policy
+from app.services.login_writer import last_login_writer
+from app.services.single_flight import user_lookups
+from app.models.user_model import User
+from app.utils.auth import generate_token, admin_required
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.etag import user_etag, list_etag, not_modified
 
 # Cria blueprint
 user_bp = Blueprint('user', __name__, url_prefix='/api/users')
@@ -24,6 +38,41 @@ def register():
         'user': user.to_response_dict()
     }), 201
 
+@user_bp.route('/register/bulk', methods=['POST'])
+@admin_required
+def register_bulk():
+    """
+    Registra usuários em lote
+    Corpo: {"users": [...]}; retorna um resultado por linha
+    """
+    data = request.get_json()
+    users_data = data.get('users') if isinstance(data, dict) else None
+    
+    if not isinstance(users_data, list) or not users_data:
+        return jsonify({'error': 'Lista de usuários é obrigatória'}), 400
+    
+    max_rows = current_app.config['USERS_BULK_MAX_ROWS']
+    if len(users_data) > max_rows:
+        return jsonify({'error': f'O lote deve ter no máximo {max_rows} usuários'}), 400
+    
+    results = UserService.create_users_bulk(users_data)
+    created = sum(1 for result in results if 'user' in result)
+    unavailable = sum(1 for result in results if result.get('unavailable'))
+    
+    # Retorna resultado por linha
+    body = jsonify({
+        'message': 'Cadastro em lote interrompido: banco indisponível' if unavailable else 'Cadastro em lote processado',
+        'created': created,
+        'failed': len(results) - created,
+        'unavailable': unavailable,
+        'results': results
+    })
+    if unavailable:
+        # As linhas criadas continuam no resultado; só as marcadas com unavailable devem ser reenviadas
+        retry_after = str(max(1, math.ceil(backend_policy.breaker.retry_after())))
+        return body, 503, {'Retry-After': retry_after}
+    return body, 201 if created else 400
+
 @user_bp.route('/login', methods=['POST'])
 def login():
     """
@@ -56,34 +105,317 @@ def login():
 @user_bp.route('/', methods=['GET'])
 def get_all_users():
     """
-    Obter todos os usuários
+    Obter usuários paginados por cursor
+    Parâmetros: limit, after (cursor) e fields (colunas separadas por vírgula)
     """
-    users, error = UserService.get_all_users()
+    params, error_response = _page_params()
+    if error_response is not None:
+        return error_response
+    
+    users, next_cursor, error = UserService.get_all_users(**params)
     
     if error:
         return jsonify({'error': error}), 500
     
+    return _page_response(users, next_cursor, **params)
+
+def _page_params():
+    """
+    Lê e valida os parâmetros de paginação da requisição
+    Retorna os parâmetros ou uma resposta de erro
+    """
+    max_limit = current_app.config['USERS_MAX_PAGE_SIZE']
+    
+    try:
+        limit = int(request.args.get('limit', current_app.config['USERS_PAGE_SIZE']))
+        after = request.args.get('after')
+        after = int(after) if after else None
+    except ValueError:
+        return None, (jsonify({'error': 'Parâmetros de paginação inválidos'}), 400)
+    
+    if limit < 1 or limit > max_limit:
+        return None, (jsonify({'error': f'O limite deve estar entre 1 e {max_limit}'}), 400)
+    
+    fields = None
+    if request.args.get('fields'):
+        fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+        invalid = [field for field in fields if field not in User.FIELDS]
+        if invalid:
+            return None, (jsonify({'error': f"Campos inválidos: {', '.join(invalid)}"}), 400)
+    
+    return {'limit': limit, 'after': after, 'fields': fields}, None
+
+def _page_response(users, next_cursor, limit, after, fields):
+    """Resposta de uma página com ETag (ou 304 se o cliente já tem a versão atual)"""
+    # ETag da página: versões das linhas + parâmetros (evita serializar se nada mudou)
+    etag = list_etag(
+        _page_versions(users), limit, after, ','.join(fields or []), next_cursor
+    )
+    response = not_modified(etag)
+    if response is not None:
+        return response
+    
     # Retorna dados dos usuários
+    response = jsonify({
+        'message': 'Usuários recuperados com sucesso',
+        'users': users.to_response_dicts(fields),
+        'next_cursor': next_cursor
+    })
+    response.set_etag(etag)
+    return response, 200
+
+def _page_versions(users):
+    """ETag de cada linha da página"""
+    columns = [users.column(field) for field in ('id', 'updated_at', 'last_login')]
+    return [user_etag(*values) for values in zip(*columns)]
+
+@user_bp.route('/search', methods=['GET'])
+@admin_required
+def search_users():
+    """
+    Buscar usuários por prefixo do nome ou do email (sem diferenciar maiúsculas e acentos)
+    Parâmetros: q, limit e after (next_cursor da página anterior, opaco)
+    """
+    params, error_response = _search_params()
+    if error_response is not None:
+        return error_response
+    
+    users, next_cursor, error = UserService.search_users(**params)
+    
+    if error:
+        return jsonify({'error': error}), 400 if error == INVALID_CURSOR_ERROR else 500
+    
     return jsonify({
         'message': 'Usuários recuperados com sucesso',
-        'users': [user.to_response_dict() for user in users]
+        'users': [user.to_response_dict() for user in users],
+        'next_cursor': next_cursor
     }), 200
 
+def _search_params():
+    """
+    Lê e valida os parâmetros da busca
+    Retorna os parâmetros ou uma resposta de erro
+    """
+    query = request.args.get('q', '').strip()
+    min_length = current_app.config['SEARCH_MIN_QUERY_LENGTH']
+    if len(query) < min_length:
+        return None, (jsonify({'error': f'A busca deve ter ao menos {min_length} caracteres'}), 400)
+    
+    max_limit = current_app.config['SEARCH_MAX_PAGE_SIZE']
+    try:
+        limit = int(request.args.get('limit', current_app.config['SEARCH_PAGE_SIZE']))
+    except ValueError:
+        return None, (jsonify({'error': 'Parâmetros de paginação inválidos'}), 400)
+    
+    if limit < 1 or limit > max_limit:
+        return None, (jsonify({'error': f'O limite deve estar entre 1 e {max_limit}'}), 400)
+    
+    return {'query': query, 'limit': limit, 'after': request.args.get('after') or None}, None
+
+@user_bp.route('/changes', methods=['GET'])
+@admin_required
+def list_changes():
+    """
+    Feed de alterações: usuários criados, atualizados ou excluídos desde o cursor
+    Parâmetros: cursor (next_cursor da leitura anterior; sem cursor, desde o início) e limit
+    """
+    max_limit = current_app.config['CHANGE_FEED_MAX_PAGE_SIZE']
+    try:
+        limit = int(request.args.get('limit', current_app.config['CHANGE_FEED_PAGE_SIZE']))
+        cursor = request.args.get('cursor')
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return jsonify({'error': 'Parâmetros de paginação inválidos'}), 400
+    
+    if limit < 1 or limit > max_limit:
+        return jsonify({'error': f'O limite deve estar entre 1 e {max_limit}'}), 400
+    
+    changes, next_after, has_more, error = UserService.get_changes(after, limit)
+    
+    if error:
+        return jsonify({'error': error}), 500
+    
+    return jsonify({
+        'message': 'Alterações recuperadas com sucesso',
+        'changes': changes,
+        'next_cursor': encode_cursor(*next_after) if next_after else None,
+        'has_more': has_more
+    }), 200
+
+@user_bp.route('/export', methods=['GET'])
+@admin_required
+def export_users():
+    """
+    Exporta todos os usuários em streaming (formato ndjson ou csv)
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'Formato inválido. Use ndjson ou csv'}), 400
+    
+    users = UserService.iter_all_users()
+    
+    if export_format == 'csv':
+        return Response(_csv_rows(users), mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename=users.csv'})
+    
+    return Response(_ndjson_rows(users), mimetype='application/x-ndjson')
+
+def _ndjson_rows(users):
+    """Gera uma linha JSON por usuário"""
+    for user in users:
+        yield json.dumps(user.to_response_dict(), default=str, ensure_ascii=False) + '\n'
+
+def _csv_rows(users):
+    """Gera o cabeçalho e uma linha CSV por usuário"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=User.FIELDS)
+    writer.writeheader()
+    for user in users:
+        writer.writerow(user.to_response_dict())
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Envia o cabeçalho mesmo quando não há usuários
+    if buffer.tell():
+        yield buffer.getvalue()
+
+@user_bp.route('/batch', methods=['GET'])
+def get_users_batch():
+    """
+    Obter vários usuários pelo ID em uma única requisição
+    Parâmetro: ids (separados por vírgula); a resposta segue a ordem pedida
+    """
+    user_ids, error_response = _batch_ids()
+    if error_response is not None:
+        return error_response
+    
+    users, missing, error = UserService.get_users_by_ids(user_ids)
+    
+    if error:
+        return jsonify({'error': error}), 500
+    
+    return _batch_response(users, missing)
+
+def _batch_ids():
+    """
+    Lê e valida os IDs da busca em lote
+    Retorna os IDs ou uma resposta de erro
+    """
+    try:
+        user_ids = [int(value) for value in request.args.get('ids', '').split(',') if value.strip()]
+    except ValueError:
+        return None, (jsonify({'error': 'Lista de IDs inválida'}), 400)
+    
+    if not user_ids:
+        return None, (jsonify({'error': 'Parâmetro ids é obrigatório'}), 400)
+    
+    max_ids = current_app.config['USERS_BATCH_MAX_IDS']
+    if len(user_ids) > max_ids:
+        return None, (jsonify({'error': f'A busca deve ter no máximo {max_ids} IDs'}), 400)
+    
+    return user_ids, None
+
+def _batch_response(users, missing):
+    """Resposta da busca em lote com os usuários encontrados e os IDs ausentes"""
+    return jsonify({
+        'message': 'Usuários recuperados com sucesso',
+        'users': [user.to_response_dict() for user in users],
+        'missing': missing
+    }), 200
+
+@user_bp.route('/stats', methods=['GET'])
+@admin_required
+def get_user_stats():
+    """
+    Obter contagens de usuários por status e papel, cadastros e usuários ativos por período
+    Servidas dos contadores em memória (sem consultar o banco); reconciled_at e updated_at
+    informam a última reconciliação com a tabela e a última alteração aplicada
+    """
+    if not user_stats.enabled:
+        return jsonify({'error': 'Estatísticas de usuários desativadas'}), 404
+    
+    snapshot = user_stats.snapshot()
+    if snapshot is None:
+        response = jsonify({'error': 'Estatísticas de usuários em cálculo'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+    
+    return jsonify({'stats': snapshot}), 200
+
+@user_bp.route('/cache/stats', methods=['GET'])
+@admin_required
+def get_cache_stats():
+    """
+    Obter contadores do cache de usuários e do agrupamento de buscas
+    """
+    return jsonify({'cache': user_cache.stats(), 'lookups': user_lookups.stats()}), 200
+
+@user_bp.route('/last-login/stats', methods=['GET'])
+@admin_required
+def get_last_login_stats():
+    """
+    Obter fila e métricas da gravação de last_login
+    """
+    return jsonify({'last_login_writer': last_login_writer.stats()}), 200
+
+@user_bp.route('/backend/stats', methods=['GET'])
+@admin_required
+def get_backend_stats():
+    """
+    Obter estado do circuit breaker e contadores de novas tentativas, prazos e hedge
+    """
+    return jsonify({'backend': backend_policy.stats()}), 200
+
+@user_bp.route('/duplicate-index/stats', methods=['GET'])
+@admin_required
+def get_duplicate_index_stats():
+    """
+    Obter memória, taxa de falsos positivos e contadores do índice de duplicatas
+    """
+    return jsonify({'duplicate_index': duplicate_index.stats()}), 200
+
+@user_bp.route('/search/stats', methods=['GET'])
+@admin_required
+def get_search_index_stats():
+    """
+    Obter tamanho e estado do índice de busca
+    """
+    return jsonify({'search_index': search_index.stats()}), 200
+
 @user_bp.route('/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     """
     Obter um usuário pelo ID
     """
+    return _user_response(user_id)
+
+def _user_response(user_id):
+    """
+    Resposta de um usuário com ETag
+    Se o If-None-Match ainda for válido, responde 304 sem buscar a linha completa
+    """
+    if request.if_none_match:
+        etag, _ = UserService.get_user_etag(user_id)
+        response = not_modified(etag)
+        if response is not None:
+            return response
+    
     user, error = UserService.get_user_by_id(user_id)
     
     if error:
         return jsonify({'error': error}), 404
     
-    # Retorna dados do usuário
-    return jsonify({
+    return _user_body(user)
+
+def _user_body(user):
+    """Resposta 200 de um usuário com o ETag da versão atual"""
+    response = jsonify({
         'message': 'Usuário recuperado com sucesso',
         'user': user.to_response_dict()
-    }), 200
+    })
+    response.set_etag(user_etag(user.id, user.updated_at, user.last_login))
+    return response, 200
 
 @user_bp.route('/<int:user_id>', methods=['PUT'])
 def update_user(user_id):
@@ -126,13 +458,4 @@ def get_current_user():
     if not user_id:
         return jsonify({'error': 'ID do usuário é obrigatório'}), 400
         
-    user, error = UserService.get_user_by_id(user_id)
-    
-    if error:
-        return jsonify({'error': error}), 404
-    
-    # Retorna dados do usuário
-    return jsonify({
-        'message': 'Usuário recuperado com sucesso',
-        'user': user.to_response_dict()
-    }), 200
\ No newline at end of file
+    return _user_response(user_id)
@@ -0,0 +1,174 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence
+from app.models.user_model import now_timestamp
+from app.services.user_repository import DELETE_USER_FUNCTION, UserRepository, create_base_user_repository, _logical, _quote
+from config.config import Config
+
+class AsyncUserRepository(ABC):
+    """
+    Versão assíncrona da interface UserRepository (modo ASGI)
+    """
+
+    @abstractmethod
+    async def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Insere um usuário e retorna a linha criada"""
+
+    @abstractmethod
+    async def get_by_id(self, user_id: int, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """Retorna o usuário com o ID informado (apenas as colunas pedidas, se informadas) ou None"""
+
+    @abstractmethod
+    async def get_many(self, user_ids: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Retorna os usuários existentes entre os IDs informados, em uma única consulta (ordem não garantida)"""
+
+    @abstractmethod
+    async def get_by_credentials(self, email: str, birth_date: str) -> Optional[Dict[str, Any]]:
+        """Retorna o usuário com o email e data de nascimento informados ou None"""
+
+    @abstractmethod
+    async def find_existing(self, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Retorna as linhas (colunas email e cpf) em que algum dos campos informados tem o valor informado"""
+
+    @abstractmethod
+    async def list_page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Retorna até limit usuários com ID maior que after, ordenados por ID"""
+
+    @abstractmethod
+    async def update(self, user_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Atualiza um usuário e retorna a linha atualizada ou None se não existir"""
+
+    @abstractmethod
+    async def delete(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Exclui um usuário e retorna a linha excluída ou None se não existir"""
+
+class AsyncSupabaseUserRepository(AsyncUserRepository):
+    """
+    Repositório assíncrono sobre o cliente PostgREST com httpx.AsyncClient
+    """
+
+    @staticmethod
+    def _table(name: str = 'users'):
+        return Config.get_async_postgrest_client().from_(name)
+
+    async def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self._table().insert(row).execute()
+        return response.data[0]
+
+    async def get_by_id(self, user_id: int, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        response = await self._table().select(','.join(columns) if columns else '*').eq('id', user_id).execute()
+        return response.data[0] if response.data else None
+
+    async def get_many(self, user_ids: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        if not user_ids:
+            return []
+        response = await self._table().select(','.join(columns) if columns else '*').in_('id', list(user_ids)).execute()
+        return response.data
+
+    async def get_by_credentials(self, email: str, birth_date: str) -> Optional[Dict[str, Any]]:
+        response = await self._table().select('*').eq('email', email).eq('birth_date', birth_date).execute()
+        return response.data[0] if response.data else None
+
+    async def find_existing(self, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        query = self._table().select('email,cpf')
+        if len(values) == 1:
+            (field, value), = values.items()
+            query = query.eq(field, value)
+        else:
+            query = _logical(query, 'or', [f'{field}.eq.{_quote(value)}' for field, value in values.items()])
+        response = await query.limit(len(values)).execute()
+        return response.data
+
+    async def list_page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        query = self._table().select(','.join(columns) if columns else '*').order('id')
+        if after is not None:
+            query = query.gt('id', after)
+        response = await query.limit(limit).execute()
+        return response.data
+
+    async def update(self, user_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        response = await self._table().update(values).eq('id', user_id).execute()
+        return response.data[0] if response.data else None
+
+    async def delete(self, user_id: int) -> Optional[Dict[str, Any]]:
+        params = {'p_user_id': user_id, 'p_deleted_at': now_timestamp()}
+        response = await Config.get_async_postgrest_client().rpc(DELETE_USER_FUNCTION, params).execute()
+        return response.data[0] if response.data else None
+
+class ThreadedUserRepository(AsyncUserRepository):
+    """
+    Adapta um repositório síncrono (ex.: SQLite) executando as chamadas em threads
+    """
+    def __init__(self, repository: UserRepository):
+        self.repository = repository
+
+    async def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.repository.insert, row)
+
+    async def get_by_id(self, user_id: int, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.repository.get_by_id, user_id, columns)
+
+    async def get_many(self, user_ids: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.repository.get_many, user_ids, columns)
+
+    async def get_by_credentials(self, email: str, birth_date: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.repository.get_by_credentials, email, birth_date)
+
+    async def find_existing(self, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.repository.find_existing, values)
+
+    async def list_page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.repository.list_page, limit, after, columns)
+
+    async def update(self, user_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.repository.update, user_id, values)
+
+    async def delete(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.repository.delete, user_id)
+
+def create_async_user_repository(config_class=Config) -> AsyncUserRepository:
+    """Cria o repositório assíncrono equivalente ao configurado em USER_REPOSITORY"""
+    if getattr(config_class, 'USER_REPOSITORY', 'supabase') == 'supabase':
+        repository = AsyncSupabaseUserRepository()
+    else:
+        repository = ThreadedUserRepository(create_base_user_repository(config_class))
+
+    if getattr(config_class, 'FAULT_INJECTION_ENABLED', False):
+        from app.services.fault_injection import AsyncFaultInjectingUserRepository, fault_options
+        repository = AsyncFaultInjectingUserRepository(repository, **fault_options(config_class))
+    if getattr(config_class, 'BACKEND_RESILIENCE_ENABLED', False):
+        from app.services.resilient_user_repository import AsyncResilientUserRepository
+        repository = AsyncResilientUserRepository(repository)
+    return repository
+
+# Repositório assíncrono do processo (definido por create_asgi_app ou criado sob demanda)
+_async_user_repository: Optional[AsyncUserRepository] = None
+
+def get_async_user_repository() -> AsyncUserRepository:
+    """Retorna o repositório assíncrono de usuários do processo"""
+    global _async_user_repository
+
+    if _async_user_repository is None:
+        _async_user_repository = create_async_user_repository()
+    return _async_user_repository
+
+def set_async_user_repository(repository: Optional[AsyncUserRepository]) -> None:
+    """Define o repositório assíncrono do processo (None volta ao padrão da configuração)"""
+    global _async_user_repository
+
+    _async_user_repository = repository
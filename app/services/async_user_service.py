@@ -0,0 +1,255 @@
+from typing import Dict, List, Optional, Any, Tuple
+from app.models.user_model import User, UserBatch, now_timestamp
+from app.services.resilience import BackendUnavailable
+from app.services.user_cache import user_cache
+from app.services.single_flight import user_lookups
+from app.services.user_service import UserService, VERSION_FIELDS
+from app.services.async_user_repository import get_async_user_repository
+from app.utils.auth import validate_birth_date
+from app.utils.metrics import metrics
+from app.utils.etag import user_etag
+from config.config import Config
+
+class AsyncUserService:
+    """
+    Versão assíncrona do UserService usada no modo ASGI
+    Mesmas validações, cache e retornos (valor, erro), mas sem bloquear o event loop
+    """
+
+    @staticmethod
+    async def create_user(user_data: Dict[str, Any]) -> Tuple[User, Optional[str]]:
+        """
+        Cria um novo usuário no banco de dados
+        Retorna o usuário criado ou uma mensagem de erro
+        """
+        user, error = UserService._prepare_new_user(user_data)
+        if error:
+            return None, error
+
+        try:
+            error, values = UserService._duplicate_lookup(user)
+            if not error and values:
+                with metrics.time_backend('check_duplicates'):
+                    rows = await get_async_user_repository().find_existing(values)
+                error = UserService._on_duplicates_checked(values, rows)
+            if error:
+                return None, error
+
+            with metrics.time_backend('create_user'):
+                row = await get_async_user_repository().insert(UserService._insert_row(user))
+
+            return UserService._on_created(row), None
+
+        except BackendUnavailable:
+            raise
+        except Exception as e:
+            return None, str(e)
+
+    @staticmethod
+    async def authenticate_user(username: str, birth_date: str) -> Tuple[User, Optional[str]]:
+        """
+        Autentica um usuário com username e data de nascimento
+        Retorna o usuário autenticado ou uma mensagem de erro
+        """
+        if not validate_birth_date(birth_date):
+            return None, "Formato de data de nascimento inválido. Use AAAA-MM-DD"
+
+        try:
+            with metrics.time_backend('authenticate_user'):
+                user_data = await get_async_user_repository().get_by_credentials(username, birth_date)
+
+            if not user_data:
+                return None, "Credenciais inválidas"
+
+            return UserService._on_authenticated(user_data), None
+
+        except BackendUnavailable:
+            raise
+        except Exception as e:
+            return None, str(e)
+
+    @staticmethod
+    async def get_user_by_id(user_id: int) -> Tuple[User, Optional[str]]:
+        """
+        Obtém um usuário pelo ID
+        Retorna o usuário ou uma mensagem de erro
+        """
+        try:
+            user_id = int(user_id)
+
+            user = user_cache.get(user_id)
+            if user is not None:
+                return user, None
+
+            user = await user_lookups.do_async(user_id, lambda: AsyncUserService._load_user(user_id))
+
+            if user is None:
+                return None, "Usuário não encontrado"
+
+            return user, None
+
+        except ValueError:
+            return None, "ID de usuário inválido"
+        except BackendUnavailable:
+            raise
+        except Exception as e:
+            return None, str(e)
+
+    @staticmethod
+    async def _load_user(user_id: int) -> Optional[User]:
+        """Busca um usuário no banco e armazena no cache (executado uma vez por grupo de buscas)"""
+        read_token = user_cache.read_token()
+        with metrics.time_backend('get_user_by_id'):
+            user_data = await get_async_user_repository().get_by_id(user_id)
+        return UserService._on_fetched(user_data, read_token) if user_data else None
+
+    @staticmethod
+    async def get_users_by_ids(user_ids: List[int]) -> Tuple[List[User], List[int], Optional[str]]:
+        """
+        Obtém vários usuários pelo ID com uma única consulta para os que não estão em cache
+        Retorna os usuários na ordem pedida, os IDs não encontrados e uma mensagem de erro
+        """
+        try:
+            user_ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+
+            found, misses = UserService._cached_users(user_ids)
+
+            if misses:
+                read_token = user_cache.read_token()
+                with metrics.time_backend('get_users_by_ids'):
+                    rows = await get_async_user_repository().get_many(misses)
+                for row in rows:
+                    user = UserService._on_fetched(row, read_token)
+                    found[int(user.id)] = user
+
+            users = [found[user_id] for user_id in user_ids if user_id in found]
+            missing = [user_id for user_id in user_ids if user_id not in found]
+            return users, missing, None
+
+        except ValueError:
+            return [], [], "ID de usuário inválido"
+        except BackendUnavailable:
+            raise
+        except Exception as e:
+            return [], [], str(e)
+
+    @staticmethod
+    async def get_user_etag(user_id: int) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Obtém o ETag atual de um usuário sem buscar a linha completa
+        Retorna o ETag ou uma mensagem de erro
+        """
+        try:
+            user_id = int(user_id)
+
+            # Só o backend compartilhado: a camada local pode estar atrasada (ver UserService.get_user_etag)
+            user = user_cache.get_shared(user_id)
+            if user is not None:
+                return user_etag(user.id, user.updated_at, user.last_login), None
+
+            with metrics.time_backend('get_user_etag'):
+                version = await get_async_user_repository().get_by_id(user_id, VERSION_FIELDS)
+
+            if not version:
+                return None, "Usuário não encontrado"
+
+            return user_etag(version['id'], version['updated_at'], version['last_login']), None
+
+        except ValueError:
+            return None, "ID de usuário inválido"
+        except BackendUnavailable:
+            raise
+        except Exception as e:
+            return None, str(e)
+
+    @staticmethod
+    async def get_all_users(
+        limit: int = Config.USERS_PAGE_SIZE,
+        after: Optional[int] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[UserBatch, Optional[int], Optional[str]]:
+        """
+        Obtém uma página de usuários ordenada por ID (paginação por cursor)
+        Retorna o lote de usuários, o cursor da próxima página (ou None) e uma mensagem de erro
+        """
+        try:
+            if after is not None:
+                after = int(after)
+
+            fields = UserService._page_fields(fields)
+
+            with metrics.time_backend('get_all_users'):
+                page = await get_async_user_repository().list_page(limit + 1, after, fields)
+
+            rows = page[:limit]
+            next_cursor = rows[-1]['id'] if len(page) > limit else None
+
+            return UserBatch.from_rows(rows, fields), next_cursor, None
+
+        except ValueError:
+            return UserBatch.from_rows([]), None, "Cursor de paginação inválido"
+        except BackendUnavailable:
+            raise
+        except Exception as e:
+            return UserBatch.from_rows([]), None, str(e)
+
+    @staticmethod
+    async def update_user(user_id: int, user_data: Dict[str, Any]) -> Tuple[User, Optional[str]]:
+        """
+        Atualiza um usuário
+        Retorna o usuário atualizado ou uma mensagem de erro
+        """
+        try:
+            user_id = int(user_id)
+
+            # Linha atual lida do banco (não do cache, que pode estar desatualizado)
+            current = await AsyncUserService._load_user(user_id)
+            if current is None:
+                return None, "Usuário não encontrado"
+
+            changes = UserService._update_changes(current, user_data or {})
+            if not changes:
+                return current, None
+
+            changes['updated_at'] = now_timestamp()
+
+            with metrics.time_backend('update_user'):
+                updated = await get_async_user_repository().update(user_id, changes)
+
+            user = UserService._on_updated(user_id, updated, current)
+            if user is None:
+                return None, "Usuário não encontrado"
+
+            return user, None
+
+        except ValueError:
+            return None, "ID de usuário inválido"
+        except BackendUnavailable:
+            raise
+        except Exception as e:
+            return None, str(e)
+
+    @staticmethod
+    async def delete_user(user_id: int) -> Tuple[bool, Optional[str]]:
+        """
+        Exclui um usuário
+        Retorna status de sucesso e mensagem de erro opcional
+        """
+        try:
+            user_id = int(user_id)
+
+            with metrics.time_backend('delete_user'):
+                deleted = await get_async_user_repository().delete(user_id)
+            UserService._on_deleted(user_id, deleted)
+
+            if not deleted:
+                return False, "Usuário não encontrado"
+
+            return True, None
+
+        except ValueError:
+            return False, "ID de usuário inválido"
+        except BackendUnavailable:
+            raise
+        except Exception as e:
+            return False, str(e)
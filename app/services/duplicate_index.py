@@ -0,0 +1,315 @@
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from app.services.user_repository import get_user_repository
+from app.utils.metrics import metrics
+from config.config import Config
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Campos únicos da tabela users cobertos pelo índice
+UNIQUE_FIELDS = ('email', 'cpf')
+
+class BloomFilter:
+    """
+    Filtro de Bloom em um bytearray
+    Dimensionado pela capacidade esperada e pela taxa de falsos positivos desejada
+    """
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> List[int]:
+        # Duplo hashing (Kirsch-Mitzenmacher) sobre um único digest de 128 bits
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    def estimated_error_rate(self) -> float:
+        """Taxa de falsos positivos estimada pela fração de bits ligados"""
+        filled = int.from_bytes(self._bits, 'little').bit_count() / self.size
+        return filled ** self.hashes
+
+class DuplicateIndex:
+    """
+    Índice em memória (por worker) de emails e CPFs já cadastrados
+
+    Um filtro de Bloom responde "com certeza não existe" (cadastro segue direto para o banco)
+    ou "talvez exista" (o chamador confirma no banco). Duplicatas confirmadas ficam em um
+    LRU curto para que novas tentativas do mesmo cliente sejam recusadas sem ida ao banco.
+    Exclusões não podem ser removidas do filtro: quando acumulam, o filtro é reconstruído.
+    """
+    def __init__(
+        self,
+        enabled: bool = True,
+        capacity: int = 1000000,
+        error_rate: float = 0.01,
+        page_size: int = 1000,
+        confirmed_size: int = 10000,
+        confirmed_ttl: float = 30.0,
+        rebuild_ratio: float = 0.1
+    ):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.page_size = page_size
+        self.confirmed_size = confirmed_size
+        self.confirmed_ttl = confirmed_ttl
+        self.rebuild_ratio = rebuild_ratio
+        self._filter = BloomFilter(capacity, error_rate)
+        self._rebuilding: Optional[BloomFilter] = None
+        self._confirmed: 'OrderedDict[Tuple[str, str], float]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._last_id: Optional[int] = None
+        self.warmed = False
+        self.stale = 0
+        self.negatives = 0
+        self.maybes = 0
+        self.false_positives = 0
+        self.rejected = 0
+        self.rejected_without_lookup = 0
+
+    @staticmethod
+    def _key(field: str, value: Any) -> str:
+        # Valores exatos, como no índice único do banco
+        return f'{field}:{value}'
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Registra os emails e CPFs de uma linha criada ou atualizada"""
+        if not self.enabled:
+            return
+        with self._lock:
+            for field in UNIQUE_FIELDS:
+                if row.get(field):
+                    key = self._key(field, row[field])
+                    self._filter.add(key)
+                    if self._rebuilding is not None:
+                        self._rebuilding.add(key)
+
+    def lookup(self, values: Dict[str, Any]) -> Tuple[Optional[str], List[str]]:
+        """
+        Consulta o índice antes de um cadastro
+        Retorna o campo já confirmado como duplicado (recusa sem ida ao banco) ou None,
+        e os campos que talvez existam e precisam ser confirmados no banco
+        """
+        if not self.enabled:
+            return None, []
+        self.start()
+
+        now = time.monotonic()
+        maybe = []
+        with self._lock:
+            for field in UNIQUE_FIELDS:
+                if not values.get(field):
+                    continue
+                key = self._key(field, values[field])
+                expires_at = self._confirmed.get((field, key))
+                if expires_at is not None:
+                    if expires_at > now:
+                        self.rejected += 1
+                        self.rejected_without_lookup += 1
+                        return field, []
+                    del self._confirmed[(field, key)]
+                if key in self._filter:
+                    maybe.append(field)
+            if maybe:
+                self.maybes += 1
+            else:
+                self.negatives += 1
+        return None, maybe
+
+    def confirm(self, field: str, value: Any) -> None:
+        """Registra uma duplicata confirmada no banco"""
+        with self._lock:
+            self.rejected += 1
+            self._confirmed[(field, self._key(field, value))] = time.monotonic() + self.confirmed_ttl
+            while len(self._confirmed) > self.confirmed_size:
+                self._confirmed.popitem(last=False)
+
+    def record_false_positive(self) -> None:
+        """Registra um "talvez" que o banco não confirmou"""
+        with self._lock:
+            self.false_positives += 1
+
+    def mark_deleted(self) -> None:
+        """Registra uma exclusão (reconstrói o filtro quando as exclusões acumulam)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            # Uma duplicata confirmada pode ter deixado de existir
+            self._confirmed.clear()
+            self.stale += 1
+            rebuild = (self.warmed and self._rebuilding is None
+                       and self.stale > max(100, self.rebuild_ratio * self._filter.count))
+            if rebuild:
+                # Novas linhas entram nos dois filtros enquanto o novo é carregado
+                self._rebuilding = BloomFilter(self.capacity, self.error_rate)
+                self.stale = 0
+        if rebuild:
+            threading.Thread(target=self._rebuild, name='duplicate-index-rebuild', daemon=True).start()
+
+    def start(self) -> None:
+        """Inicia o aquecimento em segundo plano (uma vez por processo, seguro após fork)"""
+        pid = os.getpid()
+        if not self.enabled or self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run_warmup, name='duplicate-index', daemon=True)
+            self._thread.start()
+
+    def warm(self) -> int:
+        """
+        Carrega os emails e CPFs da tabela, página por página, no filtro atual
+        Continua a partir do último ID carregado por este processo
+        """
+        loaded, last_id = self._load(self._filter_add, self._last_id)
+        self._last_id = last_id
+        return loaded
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna memória, taxa de falsos positivos e contadores do índice"""
+        with self._lock:
+            checks = self.negatives + self.maybes
+            return {
+                'enabled': self.enabled,
+                'warmed': self.warmed,
+                'items': self._filter.count,
+                'capacity': self.capacity,
+                'memory_bytes': self._filter.memory_bytes,
+                'hashes': self._filter.hashes,
+                'configured_error_rate': self.error_rate,
+                'estimated_error_rate': self._filter.estimated_error_rate(),
+                'observed_false_positive_rate': self.false_positives / checks if checks else 0.0,
+                'stale': self.stale,
+                'negatives': self.negatives,
+                'maybes': self.maybes,
+                'false_positives': self.false_positives,
+                'rejected': self.rejected,
+                'rejected_without_lookup': self.rejected_without_lookup,
+                'confirmed': len(self._confirmed)
+            }
+
+    def reset_after_fork(self) -> None:
+        """
+        Recria no processo filho o lock e as threads e inicia o aquecimento do worker
+        O master não aquece o filtro (create_app não inicia threads): cada worker lê a
+        tabela inteira ao iniciar, inclusive os reciclados por GUNICORN_MAX_REQUESTS
+        """
+        self._lock = threading.Lock()
+        self._rebuilding = None
+        self._confirmed = OrderedDict()
+        self._thread = None
+        self._pid = None
+        self.start()
+
+    def reset(self) -> None:
+        """Descarta o conteúdo e os contadores (o aquecimento recomeça no próximo uso)"""
+        with self._lock:
+            self._filter = BloomFilter(self.capacity, self.error_rate)
+            self._rebuilding = None
+            self._confirmed.clear()
+            self._pid = None
+            self._last_id = None
+            self.warmed = False
+            self.stale = self.negatives = self.maybes = self.false_positives = 0
+            self.rejected = self.rejected_without_lookup = 0
+
+    def _filter_add(self, key: str) -> None:
+        self._filter.add(key)
+
+    def _load(self, add, after: Optional[int] = None) -> Tuple[int, Optional[int]]:
+        """Carrega as linhas com ID maior que after; retorna a quantidade e o último ID"""
+        loaded = 0
+        repository = get_user_repository()
+        while True:
+            page = repository.list_page(self.page_size, after, ['id', *UNIQUE_FIELDS])
+            with self._lock:
+                for row in page:
+                    for field in UNIQUE_FIELDS:
+                        if row.get(field):
+                            add(self._key(field, row[field]))
+            loaded += len(page)
+            if page:
+                after = page[-1]['id']
+            if len(page) < self.page_size:
+                return loaded, after
+
+    def _run_warmup(self) -> None:
+        start = time.perf_counter()
+        try:
+            loaded = self.warm()
+        except Exception as e:
+            logger.warning(f"Erro ao carregar o índice de duplicatas: {e}")
+            return
+        self.warmed = True
+        logger.info(f"Índice de duplicatas carregado: {loaded} usuários em {time.perf_counter() - start:.2f}s")
+
+    def _rebuild(self) -> None:
+        rebuilding = self._rebuilding
+        try:
+            _, last_id = self._load(rebuilding.add)
+        except Exception as e:
+            logger.warning(f"Erro ao reconstruir o índice de duplicatas: {e}")
+            with self._lock:
+                self._rebuilding = None
+            return
+        with self._lock:
+            self._filter = rebuilding
+            self._rebuilding = None
+            self._last_id = last_id
+
+# Índice de duplicatas do processo
+duplicate_index = DuplicateIndex(
+    enabled=Config.DUPLICATE_INDEX_ENABLED,
+    capacity=Config.DUPLICATE_INDEX_CAPACITY,
+    error_rate=Config.DUPLICATE_INDEX_ERROR_RATE,
+    page_size=Config.DUPLICATE_INDEX_PAGE_SIZE,
+    confirmed_size=Config.DUPLICATE_INDEX_CONFIRMED_SIZE,
+    confirmed_ttl=Config.DUPLICATE_INDEX_CONFIRMED_TTL
+)
+
+def init_duplicate_index(app) -> None:
+    """
+    Ativa o índice conforme a configuração da aplicação
+    O aquecimento em segundo plano começa na primeira requisição do processo
+    """
+    duplicate_index.enabled = app.config.get('DUPLICATE_INDEX_ENABLED', True)
+
+    @app.before_request
+    def _start_duplicate_index():
+        duplicate_index.start()
+
+# Expõe o índice em /api/metrics
+metrics.register_collector(lambda: {
+    f'duplicate_index_{name}': float(value) for name, value in duplicate_index.stats().items()
+})
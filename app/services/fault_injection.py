@@ -0,0 +1,175 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+from app.services.async_user_repository import AsyncUserRepository
+from app.services.user_repository import ChangeCursor, UserRepository
+
+# Falhas que podem ser programadas com script()
+FAULT_ERROR = 'error'
+FAULT_HANG = 'hang'
+FAULT_OK = 'ok'
+
+class InjectedFault(ConnectionError):
+    """Falha de conexão simulada"""
+
+def fault_options(config_class) -> Dict[str, float]:
+    """Parâmetros de injeção de falhas da configuração (FAULT_INJECTION_*)"""
+    return {
+        'latency': config_class.FAULT_INJECTION_LATENCY,
+        'jitter': config_class.FAULT_INJECTION_JITTER,
+        'failure_rate': config_class.FAULT_INJECTION_FAILURE_RATE,
+        'hang_rate': config_class.FAULT_INJECTION_HANG_RATE
+    }
+
+class _FaultInjector:
+    """Sorteio (ou script) das falhas, compartilhado pelas versões síncrona e assíncrona"""
+    def __init__(
+        self,
+        repository: Any,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        hang_time: float = 30.0,
+        seed: Optional[int] = None
+    ):
+        self.repository = repository
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self.hang_time = hang_time
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._script: Deque[str] = deque()
+        self._lock = threading.Lock()
+
+    def script(self, *faults: str) -> None:
+        """Programa o resultado das próximas chamadas (FAULT_OK, FAULT_ERROR ou FAULT_HANG)"""
+        with self._lock:
+            self._script.extend(faults)
+
+    def _next_fault(self) -> Tuple[str, float]:
+        """Retorna a falha da próxima chamada e quanto ela deve esperar"""
+        with self._lock:
+            self.calls += 1
+            if self._script:
+                fault = self._script.popleft()
+            else:
+                roll = self._random.random()
+                if roll < self.failure_rate:
+                    fault = FAULT_ERROR
+                elif roll < self.failure_rate + self.hang_rate:
+                    fault = FAULT_HANG
+                else:
+                    fault = FAULT_OK
+            if fault == FAULT_HANG:
+                return fault, self.hang_time
+            return fault, self.latency + self._random.uniform(0, self.jitter) if self.jitter else self.latency
+
+class FaultInjectingUserRepository(_FaultInjector, UserRepository):
+    """
+    Repositório substituto que injeta latência, falhas de conexão e travamentos
+    nas chamadas de outro repositório (ex.: SQLite local)
+
+    Usado nos testes e para exercitar a política de resiliência sem um Supabase instável:
+      - latency/jitter: atraso de cada chamada
+      - failure_rate: fração das chamadas que falham com InjectedFault
+      - hang_rate/hang_time: fração das chamadas que ficam presas por hang_time segundos
+      - script(...): sequência exata de resultados das próximas chamadas
+    """
+    def _call(self, fn: Callable[[], Any]) -> Any:
+        fault, delay = self._next_fault()
+        if delay:
+            time.sleep(delay)
+        if fault == FAULT_ERROR:
+            raise InjectedFault("Falha de conexão injetada")
+        return fn()
+
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return self._call(lambda: self.repository.insert(row))
+
+    def insert_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self._call(lambda: self.repository.insert_many(rows))
+
+    def get_by_id(self, user_id: int, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        return self._call(lambda: self.repository.get_by_id(user_id, columns))
+
+    def get_many(self, user_ids: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        return self._call(lambda: self.repository.get_many(user_ids, columns))
+
+    def get_by_credentials(self, email: str, birth_date: str) -> Optional[Dict[str, Any]]:
+        return self._call(lambda: self.repository.get_by_credentials(email, birth_date))
+
+    def find_existing(self, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self._call(lambda: self.repository.find_existing(values))
+
+    def list_page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        return self._call(lambda: self.repository.list_page(limit, after, columns))
+
+    def search(self, terms: Sequence[str], limit: int, after: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self._call(lambda: self.repository.search(terms, limit, after))
+
+    def list_changes(self, after: Optional[ChangeCursor], until: str, limit: int) -> List[Dict[str, Any]]:
+        return self._call(lambda: self.repository.list_changes(after, until, limit))
+
+    def list_tombstones(self, after: Optional[ChangeCursor], until: str, limit: int) -> List[Dict[str, Any]]:
+        return self._call(lambda: self.repository.list_tombstones(after, until, limit))
+
+    def update(self, user_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self._call(lambda: self.repository.update(user_id, values))
+
+    def update_many(self, user_ids: Sequence[int], values: Dict[str, Any]) -> None:
+        return self._call(lambda: self.repository.update_many(user_ids, values))
+
+    def delete(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self._call(lambda: self.repository.delete(user_id))
+
+class AsyncFaultInjectingUserRepository(_FaultInjector, AsyncUserRepository):
+    """
+    Versão assíncrona do FaultInjectingUserRepository (latência e travamentos sem bloquear o event loop)
+    """
+    async def _call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        fault, delay = self._next_fault()
+        if delay:
+            await asyncio.sleep(delay)
+        if fault == FAULT_ERROR:
+            raise InjectedFault("Falha de conexão injetada")
+        return await fn()
+
+    async def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._call(lambda: self.repository.insert(row))
+
+    async def get_by_id(self, user_id: int, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        return await self._call(lambda: self.repository.get_by_id(user_id, columns))
+
+    async def get_many(self, user_ids: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        return await self._call(lambda: self.repository.get_many(user_ids, columns))
+
+    async def get_by_credentials(self, email: str, birth_date: str) -> Optional[Dict[str, Any]]:
+        return await self._call(lambda: self.repository.get_by_credentials(email, birth_date))
+
+    async def find_existing(self, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self._call(lambda: self.repository.find_existing(values))
+
+    async def list_page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        return await self._call(lambda: self.repository.list_page(limit, after, columns))
+
+    async def update(self, user_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self._call(lambda: self.repository.update(user_id, values))
+
+    async def delete(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return await self._call(lambda: self.repository.delete(user_id))
@@ -0,0 +1,159 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from app.models.user_model import now_timestamp
+from app.services.user_cache import user_cache
+from app.services.user_repository import get_user_repository
+from app.utils.metrics import metrics
+from config.config import Config
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+class LastLoginWriter:
+    """
+    Grava last_login em segundo plano (write-behind)
+    Logins repetidos do mesmo usuário são mesclados e a gravação ocorre ao atingir
+    o tamanho do lote ou o intervalo de flush
+    """
+    def __init__(self, flush_size: int = 100, flush_interval: float = 2.0):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self.flushes = 0
+        self.rows_written = 0
+        self.errors = 0
+        self.last_flush_seconds = 0.0
+
+    def record(self, user_id: int, timestamp: str) -> None:
+        """Enfileira o último login de um usuário"""
+        with self._lock:
+            self._pending[int(user_id)] = timestamp
+            depth = len(self._pending)
+
+        self._ensure_started()
+        if depth >= self.flush_size:
+            self._wakeup.set()
+
+    def pending(self, user_id: int) -> Optional[str]:
+        """Último login de um usuário ainda não gravado (ou None)"""
+        with self._lock:
+            return self._pending.get(int(user_id))
+
+    def flush(self) -> int:
+        """
+        Grava todos os logins pendentes
+        Usuários com o mesmo horário (precisão de segundos) são gravados em um único update
+        Retorna a quantidade de usuários gravados
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            # Agrupa os usuários pelo horário do login
+            groups: Dict[str, List[int]] = {}
+            for user_id, timestamp in pending.items():
+                groups.setdefault(timestamp, []).append(user_id)
+
+            start = time.perf_counter()
+            written = 0
+            try:
+                repository = get_user_repository()
+                for timestamp, user_ids in groups.items():
+                    with metrics.time_backend('record_last_login'):
+                        # updated_at marca a alteração para o feed de alterações (horário da gravação)
+                        repository.update_many(user_ids, {'last_login': timestamp, 'updated_at': now_timestamp()})
+                    written += len(user_ids)
+                    for user_id in user_ids:
+                        # O usuário em cache ainda tem o last_login e o updated_at (ETag) anteriores
+                        user_cache.invalidate(user_id)
+                        del pending[user_id]
+            except Exception as e:
+                # Devolve à fila o que não foi gravado, sem sobrescrever logins mais recentes
+                with self._lock:
+                    for user_id, timestamp in pending.items():
+                        self._pending.setdefault(user_id, timestamp)
+                self.errors += 1
+                logger.warning(f"Erro ao gravar last_login: {e}")
+
+            self.flushes += 1
+            self.rows_written += written
+            self.last_flush_seconds = time.perf_counter() - start
+            return written
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Encerra a thread de gravação e grava o que estiver pendente"""
+        self._stopped.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna profundidade da fila e métricas de flush"""
+        with self._lock:
+            depth = len(self._pending)
+        return {
+            'queue_depth': depth,
+            'flushes': self.flushes,
+            'rows_written': self.rows_written,
+            'errors': self.errors,
+            'last_flush_seconds': self.last_flush_seconds
+        }
+
+    def reset_after_fork(self) -> None:
+        """Descarta no processo filho a fila e a thread herdadas (os logins pendentes são do processo pai)"""
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_started(self) -> None:
+        # A thread não sobrevive a um fork, então é iniciada por processo
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='last-login-writer', daemon=True)
+            self._pid = pid
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            self.flush()
+
+# Gravador de last_login do processo
+last_login_writer = LastLoginWriter(
+    flush_size=Config.LAST_LOGIN_FLUSH_SIZE,
+    flush_interval=Config.LAST_LOGIN_FLUSH_INTERVAL
+)
+
+# Grava logins pendentes ao encerrar o worker
+atexit.register(last_login_writer.stop)
+
+# Expõe a fila de last_login em /api/metrics
+metrics.register_collector(lambda: {
+    f'last_login_{name}': value for name, value in last_login_writer.stats().items()
+})
@@ -0,0 +1,334 @@
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.utils.metrics import metrics
+from config.config import Config
+
+class BackendUnavailable(Exception):
+    """Banco de dados indisponível: circuito aberto, prazo esgotado ou falhas transitórias seguidas"""
+    message = "Serviço temporariamente indisponível"
+
+    def __init__(self, message: Optional[str] = None):
+        super().__init__(message or self.message)
+
+class CircuitOpenError(BackendUnavailable):
+    """Chamada recusada sem ida ao banco porque o circuito está aberto"""
+
+class DeadlineExceeded(BackendUnavailable):
+    """A chamada não terminou dentro do prazo"""
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Falhas de rede e de prazo, que justificam nova tentativa e contam para o circuito
+    As demais (ex.: violação de índice único) mostram que o banco está respondendo
+    """
+    if isinstance(error, (TimeoutError, ConnectionError, DeadlineExceeded)):
+        return True
+    # httpx só é consultado se já foi carregado (import tardio do cliente Supabase)
+    httpx = sys.modules.get('httpx')
+    return httpx is not None and isinstance(error, httpx.TransportError)
+
+class CircuitBreaker:
+    """
+    Circuit breaker por falhas consecutivas
+    Fechado: tudo passa. Aberto: tudo é recusado até reset_timeout.
+    Meio aberto: uma única chamada de teste decide se fecha ou volta a abrir
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    STATES = (CLOSED, HALF_OPEN, OPEN)
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Indica se uma chamada pode ir ao banco"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def retry_after(self) -> float:
+        """Segundos até o circuito aceitar uma chamada de teste"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = self.opened = 0
+            self._probing = False
+
+class ResiliencePolicy:
+    """
+    Prazo por chamada, novas tentativas com jitter (somente leituras), circuit breaker
+    e requisições de cobertura (hedge) para leituras pontuais
+
+    As leituras síncronas rodam em um pool de threads próprio: o thread da requisição
+    desiste no prazo mesmo que o socket ainda esteja esperando a resposta.
+    Escritas rodam no próprio thread, sem prazo, nova tentativa nem hedge: desistir não
+    cancela a escrita (o thread abandonado ainda a gravaria e o chamador a daria como
+    perdida); o limite delas é o timeout do cliente HTTP (SUPABASE_READ_TIMEOUT)
+    """
+    def __init__(
+        self,
+        enabled: bool = True,
+        deadline: float = 2.0,
+        read_retries: int = 2,
+        retry_base_delay: float = 0.05,
+        retry_max_delay: float = 0.5,
+        hedge_delay: float = 0.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+        max_workers: int = 64
+    ):
+        self.enabled = enabled
+        self.deadline = deadline
+        self.read_retries = read_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.hedge_delay = hedge_delay
+        self.max_workers = max_workers
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ('calls', 'rejected', 'failures', 'retries', 'deadline_exceeded', 'hedged', 'hedge_wins'), 0
+        )
+
+    def call(self, fn: Callable[[], Any], read: bool = False, hedge: bool = False) -> Any:
+        """
+        Executa fn sob a política
+        Leituras (read) têm prazo e são repetidas em falhas transitórias; hedge dispara uma
+        segunda leitura se a primeira não responder em hedge_delay. Escritas rodam no thread atual
+        """
+        if not self.enabled:
+            return fn()
+        deadline_at = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self._before_attempt()
+            try:
+                result = self._attempt(fn, deadline_at, hedge) if read else fn()
+            except Exception as e:
+                delay = self._after_failure(e, attempt, read, deadline_at)
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def call_async(self, fn: Callable[[], Awaitable[Any]], read: bool = False, hedge: bool = False) -> Any:
+        """Versão assíncrona de call (fn cria uma nova corrotina a cada tentativa)"""
+        import asyncio
+
+        if not self.enabled:
+            return await fn()
+        deadline_at = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self._before_attempt()
+            try:
+                result = await self._attempt_async(fn, deadline_at, hedge) if read else await fn()
+            except Exception as e:
+                delay = self._after_failure(e, attempt, read, deadline_at)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna o estado do circuito e os contadores da política"""
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            'enabled': self.enabled,
+            'state': self.breaker.state,
+            'consecutive_failures': self.breaker.failures,
+            'opened': self.breaker.opened,
+            'retry_after': self.breaker.retry_after(),
+            'deadline': self.deadline,
+            'hedge_delay': self.hedge_delay,
+            **counters
+        }
+
+    def reset(self) -> None:
+        """Fecha o circuito e zera os contadores"""
+        self.breaker.reset()
+        with self._lock:
+            self._counters = dict.fromkeys(self._counters, 0)
+
+    def reset_after_fork(self) -> None:
+        """Começa o processo filho com circuito fechado, contadores zerados e sem o pool de threads do pai"""
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self.breaker = CircuitBreaker(self.breaker.failure_threshold, self.breaker.reset_timeout)
+        self._counters = dict.fromkeys(self._counters, 0)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _before_attempt(self) -> None:
+        if not self.breaker.allow():
+            self._count('rejected')
+            raise CircuitOpenError()
+        self._count('calls')
+
+    def _after_failure(self, error: Exception, attempt: int, read: bool, deadline_at: float) -> float:
+        """Registra a falha e retorna a espera até a próxima tentativa (ou relança o erro)"""
+        if not is_transient(error):
+            self.breaker.record_success()
+            raise error
+        self.breaker.record_failure()
+        self._count('failures')
+
+        # Backoff exponencial com jitter total, sem ultrapassar o prazo da chamada
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+        if not read or attempt >= self.read_retries or time.monotonic() + delay >= deadline_at:
+            if isinstance(error, BackendUnavailable):
+                raise error
+            raise BackendUnavailable() from error
+        self._count('retries')
+        return delay
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Threads não sobrevivem a um fork: cada processo cria o seu pool
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='backend')
+                    self._executor_pid = pid
+        return self._executor
+
+    def _attempt(self, fn: Callable[[], Any], deadline_at: float, hedge: bool) -> Any:
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            self._count('deadline_exceeded')
+            raise DeadlineExceeded()
+
+        pool = self._pool()
+        futures: List[Future] = [pool.submit(fn)]
+        if hedge and 0 < self.hedge_delay < remaining:
+            done, _ = wait(futures, timeout=self.hedge_delay)
+            if not done:
+                self._count('hedged')
+                futures.append(pool.submit(fn))
+
+        # Vale a primeira resposta bem-sucedida; erros só contam se todas falharem
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline_at - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                self._count('deadline_exceeded')
+                raise DeadlineExceeded()
+            for future in done:
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        self._count('hedge_wins')
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    async def _attempt_async(self, fn: Callable[[], Awaitable[Any]], deadline_at: float, hedge: bool) -> Any:
+        import asyncio
+
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            self._count('deadline_exceeded')
+            raise DeadlineExceeded()
+
+        tasks = [asyncio.ensure_future(fn())]
+        try:
+            if hedge and 0 < self.hedge_delay < remaining:
+                done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay)
+                if not done:
+                    self._count('hedged')
+                    tasks.append(asyncio.ensure_future(fn()))
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, deadline_at - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    self._count('deadline_exceeded')
+                    raise DeadlineExceeded()
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self._count('hedge_wins')
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            # Ao contrário das threads, as corrotinas perdedoras podem ser canceladas
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+# Política compartilhada pelas chamadas ao banco do processo (síncronas e assíncronas)
+backend_policy = ResiliencePolicy(
+    enabled=Config.BACKEND_RESILIENCE_ENABLED,
+    deadline=Config.BACKEND_DEADLINE,
+    read_retries=Config.BACKEND_READ_RETRIES,
+    retry_base_delay=Config.BACKEND_RETRY_BASE_DELAY,
+    retry_max_delay=Config.BACKEND_RETRY_MAX_DELAY,
+    hedge_delay=Config.BACKEND_HEDGE_DELAY,
+    failure_threshold=Config.BACKEND_BREAKER_FAILURES,
+    reset_timeout=Config.BACKEND_BREAKER_RESET_TIMEOUT,
+    max_workers=Config.BACKEND_MAX_WORKERS
+)
+
+def _collect() -> Dict[str, float]:
+    stats = backend_policy.stats()
+    values = {f'backend_{name}': float(value) for name, value in stats.items() if not isinstance(value, str)}
+    values['backend_circuit_state'] = float(CircuitBreaker.STATES.index(stats['state']))
+    return values
+
+# Expõe o estado do circuito em /api/metrics (0 fechado, 1 meio aberto, 2 aberto)
+metrics.register_collector(_collect)
@@ -0,0 +1,96 @@
+from typing import Any, Dict, List, Optional, Sequence
+from app.services.async_user_repository import AsyncUserRepository
+from app.services.resilience import ResiliencePolicy, backend_policy
+from app.services.user_repository import ChangeCursor, UserRepository
+
+class ResilientUserRepository(UserRepository):
+    """
+    Aplica a política de resiliência (prazo, novas tentativas, circuit breaker e hedge)
+    às chamadas de outro repositório
+    Leituras têm prazo e são repetidas em falhas transitórias; escritas passam apenas
+    pelo circuit breaker (insert não é idempotente e uma escrita abandonada ainda grava)
+    """
+    def __init__(self, repository: UserRepository, policy: ResiliencePolicy = backend_policy):
+        self.repository = repository
+        self.policy = policy
+
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return self.policy.call(lambda: self.repository.insert(row))
+
+    def insert_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self.policy.call(lambda: self.repository.insert_many(rows))
+
+    def get_by_id(self, user_id: int, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        return self.policy.call(lambda: self.repository.get_by_id(user_id, columns), read=True, hedge=True)
+
+    def get_many(self, user_ids: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        return self.policy.call(lambda: self.repository.get_many(user_ids, columns), read=True)
+
+    def get_by_credentials(self, email: str, birth_date: str) -> Optional[Dict[str, Any]]:
+        return self.policy.call(lambda: self.repository.get_by_credentials(email, birth_date), read=True)
+
+    def find_existing(self, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self.policy.call(lambda: self.repository.find_existing(values), read=True)
+
+    def list_page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        return self.policy.call(lambda: self.repository.list_page(limit, after, columns), read=True)
+
+    def search(self, terms: Sequence[str], limit: int, after: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self.policy.call(lambda: self.repository.search(terms, limit, after), read=True)
+
+    def list_changes(self, after: Optional[ChangeCursor], until: str, limit: int) -> List[Dict[str, Any]]:
+        return self.policy.call(lambda: self.repository.list_changes(after, until, limit), read=True)
+
+    def list_tombstones(self, after: Optional[ChangeCursor], until: str, limit: int) -> List[Dict[str, Any]]:
+        return self.policy.call(lambda: self.repository.list_tombstones(after, until, limit), read=True)
+
+    def update(self, user_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self.policy.call(lambda: self.repository.update(user_id, values))
+
+    def update_many(self, user_ids: Sequence[int], values: Dict[str, Any]) -> None:
+        return self.policy.call(lambda: self.repository.update_many(user_ids, values))
+
+    def delete(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self.policy.call(lambda: self.repository.delete(user_id))
+
+class AsyncResilientUserRepository(AsyncUserRepository):
+    """
+    Versão assíncrona do ResilientUserRepository (as requisições perdedoras do hedge são canceladas)
+    """
+    def __init__(self, repository: AsyncUserRepository, policy: ResiliencePolicy = backend_policy):
+        self.repository = repository
+        self.policy = policy
+
+    async def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.policy.call_async(lambda: self.repository.insert(row))
+
+    async def get_by_id(self, user_id: int, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        return await self.policy.call_async(lambda: self.repository.get_by_id(user_id, columns), read=True, hedge=True)
+
+    async def get_many(self, user_ids: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        return await self.policy.call_async(lambda: self.repository.get_many(user_ids, columns), read=True)
+
+    async def get_by_credentials(self, email: str, birth_date: str) -> Optional[Dict[str, Any]]:
+        return await self.policy.call_async(lambda: self.repository.get_by_credentials(email, birth_date), read=True)
+
+    async def find_existing(self, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self.policy.call_async(lambda: self.repository.find_existing(values), read=True)
+
+    async def list_page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.policy.call_async(lambda: self.repository.list_page(limit, after, columns), read=True)
+
+    async def update(self, user_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self.policy.call_async(lambda: self.repository.update(user_id, values))
+
+    async def delete(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return await self.policy.call_async(lambda: self.repository.delete(user_id))
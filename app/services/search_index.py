@@ -0,0 +1,376 @@
+import bisect
+import heapq
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+from app.models.user_model import now_timestamp
+from app.services.user_repository import ChangeCursor, get_user_repository
+from app.utils.metrics import metrics
+from config.config import Config
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Colunas lidas da tabela para montar o índice
+SEARCH_COLUMNS = ('id', 'full_name', 'email')
+
+# Separadores de palavras no nome e na parte local do email
+_WORD_SPLIT = re.compile(r'[^0-9a-z]+')
+
+# Maior caractere possível: todo termo que começa com p é menor que p + _LAST_CHAR
+_LAST_CHAR = '\U0010ffff'
+
+def normalize(text: Any) -> str:
+    """Texto em minúsculas e sem acentos ('Éric' -> 'eric'), para comparação"""
+    if not text:
+        return ''
+    text = str(text)
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+def words(text: str) -> List[str]:
+    """Palavras de um texto já normalizado"""
+    return [word for word in _WORD_SPLIT.split(text) if word]
+
+class _PrefixIndex:
+    """
+    Termos distintos em uma lista ordenada, cada um com o conjunto de IDs que o contêm
+    A busca por prefixo é uma busca binária pelo intervalo de termos que começam com o
+    prefixo (uma trie compactada em array); os conjuntos ficam em uma lista paralela
+    para que a união do intervalo seja feita sem laço Python
+    """
+    def __init__(self):
+        self.postings: Dict[str, Set[int]] = {}
+        self._terms: List[str] = []
+        self._sets: List[Set[int]] = []
+        self._pending: Set[str] = set()
+
+    def link(self, user_id: int, terms: FrozenSet[str]) -> None:
+        for term in terms:
+            ids = self.postings.get(term)
+            if ids is None:
+                # Termos novos entram na lista ordenada na próxima consulta (ver _sorted)
+                self.postings[term] = ids = set()
+                self._pending.add(term)
+            ids.add(user_id)
+
+    def unlink(self, user_id: int, terms: FrozenSet[str]) -> None:
+        for term in terms:
+            ids = self.postings.get(term)
+            if ids is None:
+                continue
+            ids.discard(user_id)
+            if not ids:
+                del self.postings[term]
+                if term in self._pending:
+                    self._pending.discard(term)
+                else:
+                    position = bisect.bisect_left(self._terms, term)
+                    del self._terms[position]
+                    del self._sets[position]
+
+    def _sorted(self) -> None:
+        """
+        Inclui os termos novos na lista ordenada
+        Poucos termos são inseridos um a um; muitos (ex.: carregamento) de uma vez, em uma ordenação
+        """
+        if not self._pending:
+            return
+        if len(self._pending) <= 32:
+            for term in self._pending:
+                position = bisect.bisect_left(self._terms, term)
+                self._terms.insert(position, term)
+                self._sets.insert(position, self.postings[term])
+        else:
+            self._terms.extend(self._pending)
+            self._terms.sort()
+            self._sets = [self.postings[term] for term in self._terms]
+        self._pending.clear()
+
+    def matches(self, prefix: str) -> Set[int]:
+        """IDs com algum termo que começa com prefix"""
+        self._sorted()
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + _LAST_CHAR, start)
+        return set().union(*self._sets[start:end])
+
+class SearchIndex:
+    """
+    Índice em memória (por worker) para busca por prefixo em full_name e email
+
+    Cada palavra do nome, o email completo e as palavras da parte local do email são
+    guardados normalizados (sem acentos e maiúsculas); uma consulta com várias palavras
+    exige que cada uma seja prefixo de algum desses termos. A relevância soma, por palavra
+    da consulta, 1 ponto, mais 1 se ela inicia o nome ou o email e mais 2 se é uma palavra
+    completa; empates saem por ID. Os níveis de relevância são separados com operações de
+    conjunto, sem percorrer os candidatos em Python.
+    O índice é carregado da tabela em páginas e mantido pelos cadastros, atualizações e exclusões
+    do worker; as alterações feitas por outros workers chegam pelo feed de alterações (updated_at
+    e user_tombstones), lido a cada refresh_interval segundos.
+    """
+    def __init__(self, enabled: bool = True, page_size: int = 1000, refresh_interval: float = 5.0):
+        self.enabled = enabled
+        self.page_size = page_size
+        self.refresh_interval = refresh_interval
+        self._words = _PrefixIndex()
+        self._leads = _PrefixIndex()
+        self._docs: Dict[int, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+        self._removed: Set[int] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._last_id: Optional[int] = None
+        # Posição no feed de alterações (usuários alterados e excluídos)
+        self._changes_after: Optional[ChangeCursor] = None
+        self._tombstones_after: Optional[ChangeCursor] = None
+        self._wakeup = threading.Event()
+        self.warmed = False
+        self.queries = 0
+        self.refreshes = 0
+
+    @staticmethod
+    def _document(row: Dict[str, Any]) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """Termos de uma linha (palavras do nome e do email) e os que iniciam o nome ou o email"""
+        name_words = words(normalize(row.get('full_name')))
+        email = normalize(row.get('email'))
+        terms = set(name_words)
+        leads = set(name_words[:1])
+        if email:
+            terms.add(email)
+            terms.update(words(email.split('@', 1)[0]))
+            leads.add(email)
+        return frozenset(terms), frozenset(leads)
+
+    def _put(self, user_id: int, doc: Tuple[FrozenSet[str], FrozenSet[str]]) -> None:
+        previous = self._docs.get(user_id, (frozenset(), frozenset()))
+        for index, old, new in ((self._words, previous[0], doc[0]), (self._leads, previous[1], doc[1])):
+            index.unlink(user_id, old - new)
+            index.link(user_id, new - old)
+        self._docs[user_id] = doc
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Indexa (ou reindexa) uma linha criada ou atualizada"""
+        if not self.enabled or row.get('id') is None:
+            return
+        user_id = int(row['id'])
+        doc = self._document(row)
+        with self._lock:
+            self._removed.discard(user_id)
+            self._put(user_id, doc)
+
+    def remove(self, user_id: int) -> None:
+        """Retira do índice um usuário excluído"""
+        if not self.enabled:
+            return
+        with self._lock:
+            doc = self._docs.pop(user_id, None)
+            if doc is not None:
+                self._words.unlink(user_id, doc[0])
+                self._leads.unlink(user_id, doc[1])
+            if not self.warmed:
+                # Uma página lida antes da exclusão não deve trazer a linha de volta
+                self._removed.add(user_id)
+
+    def _rank(self, prefixes: List[str], candidates: Set[int], count: int) -> List[int]:
+        """Os count primeiros candidatos por relevância e ID"""
+        # Níveis de pontos extras, separados com operações de conjunto (sem laço Python por ID)
+        levels: Dict[int, Set[int]] = {0: candidates}
+        for prefix in prefixes:
+            leads = self._leads.matches(prefix)
+            exact = self._words.postings.get(prefix, set())
+            split: Dict[int, Set[int]] = defaultdict(set)
+            for points, ids in levels.items():
+                lead_ids = ids & leads
+                exact_ids = ids & exact
+                split[points + 3] |= lead_ids & exact_ids
+                split[points + 2] |= exact_ids - lead_ids
+                split[points + 1] |= lead_ids - exact_ids
+                split[points] |= ids - lead_ids - exact_ids
+            levels = {points: ids for points, ids in split.items() if ids}
+
+        ranked: List[int] = []
+        for points in sorted(levels, reverse=True):
+            ranked += heapq.nsmallest(count - len(ranked), levels[points])
+            if len(ranked) >= count:
+                break
+        return ranked
+
+    def search(self, query: str, limit: int, offset: int = 0) -> Tuple[List[int], int]:
+        """
+        IDs da página pedida, ordenados por relevância e ID, e o total de resultados
+        """
+        self.start()
+        # Do prefixo mais longo (em geral o mais seletivo) para o mais curto
+        prefixes = sorted(set(normalize(query).split()), key=len, reverse=True)
+        if not prefixes:
+            return [], 0
+        with self._lock:
+            self.queries += 1
+            candidates: Optional[Set[int]] = None
+            for prefix in prefixes:
+                matches = self._words.matches(prefix)
+                candidates = matches if candidates is None else candidates & matches
+                if not candidates:
+                    return [], 0
+            ranked = self._rank(prefixes, candidates, offset + limit)
+        return ranked[offset:], len(candidates)
+
+    def start(self) -> None:
+        """Inicia o carregamento em segundo plano (uma vez por processo, seguro após fork)"""
+        pid = os.getpid()
+        if not self.enabled or self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            self._wakeup = threading.Event()
+            self._thread = threading.Thread(target=self._run, name='search-index', daemon=True)
+            self._thread.start()
+
+    def warm(self) -> int:
+        """
+        Carrega nome e email da tabela, página por página
+        Continua a partir do último ID carregado por este processo
+        """
+        loaded = 0
+        repository = get_user_repository()
+        if self._changes_after is None:
+            # O feed cobre o que mudar durante o carregamento (com a margem das transações em andamento)
+            start = (now_timestamp(Config.CHANGE_FEED_SAFETY_LAG), 0)
+            self._changes_after = self._tombstones_after = start
+        after = self._last_id
+        while True:
+            page = repository.list_page(self.page_size, after, SEARCH_COLUMNS)
+            docs = [(int(row['id']), self._document(row)) for row in page]
+            with self._lock:
+                for user_id, doc in docs:
+                    # Linhas já mantidas pelos cadastros e atualizações têm dados mais recentes
+                    if user_id not in self._docs and user_id not in self._removed:
+                        self._put(user_id, doc)
+            loaded += len(page)
+            if page:
+                after = self._last_id = page[-1]['id']
+            if len(page) < self.page_size:
+                with self._lock:
+                    self._removed.clear()
+                    self.warmed = True
+                return loaded
+
+    def refresh(self) -> int:
+        """
+        Aplica as alterações do feed desde a última leitura (inclusive as feitas por outros workers)
+        Retorna a quantidade de alterações lidas
+        """
+        if self._changes_after is None:
+            return 0
+        repository = get_user_repository()
+        until = now_timestamp(Config.CHANGE_FEED_SAFETY_LAG)
+        applied = 0
+        # Alterados antes de excluídos: uma linha lida aqui e excluída em seguida sai na leitura das exclusões
+        while True:
+            page = repository.list_changes(self._changes_after, until, self.page_size)
+            for row in page:
+                self.add(row)
+            applied += len(page)
+            if page:
+                self._changes_after = (page[-1]['updated_at'], page[-1]['id'])
+            if len(page) < self.page_size:
+                break
+        while True:
+            page = repository.list_tombstones(self._tombstones_after, until, self.page_size)
+            for row in page:
+                self.remove(int(row['id']))
+            applied += len(page)
+            if page:
+                self._tombstones_after = (page[-1]['deleted_at'], page[-1]['id'])
+            if len(page) < self.page_size:
+                break
+        self.refreshes += 1
+        return applied
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna o tamanho e o estado do índice"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'warmed': self.warmed,
+                'users': len(self._docs),
+                'terms': len(self._words.postings),
+                'queries': self.queries,
+                'refreshes': self.refreshes
+            }
+
+    def reset_after_fork(self) -> None:
+        """
+        Recria no processo filho o lock e as threads e inicia o carregamento do worker
+        O master não carrega o índice (create_app não inicia threads): cada worker lê a
+        tabela inteira ao iniciar, inclusive os reciclados por GUNICORN_MAX_REQUESTS
+        """
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.queries = 0
+        self.start()
+
+    def reset(self) -> None:
+        """Descarta o conteúdo (o carregamento recomeça no próximo uso)"""
+        with self._lock:
+            self._words = _PrefixIndex()
+            self._leads = _PrefixIndex()
+            self._docs = {}
+            self._removed = set()
+            self._pid = None
+            self._wakeup.set()
+            self._last_id = None
+            self._changes_after = self._tombstones_after = None
+            self.warmed = False
+            self.queries = 0
+            self.refreshes = 0
+
+    def _run(self) -> None:
+        pid = os.getpid()
+        wakeup = self._wakeup
+        start = time.perf_counter()
+        try:
+            loaded = self.warm()
+        except Exception as e:
+            logger.warning(f"Erro ao carregar o índice de busca: {e}")
+            return
+        logger.info(f"Índice de busca carregado: {loaded} usuários em {time.perf_counter() - start:.2f}s")
+
+        while not wakeup.wait(self.refresh_interval) and self.enabled and self._pid == pid:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Erro ao atualizar o índice de busca: {e}")
+
+# Índice de busca do processo
+search_index = SearchIndex(
+    enabled=Config.SEARCH_INDEX_ENABLED,
+    page_size=Config.SEARCH_INDEX_PAGE_SIZE,
+    refresh_interval=Config.SEARCH_INDEX_REFRESH_INTERVAL
+)
+
+def init_search_index(app) -> None:
+    """
+    Ativa o índice conforme a configuração da aplicação
+    O carregamento em segundo plano começa na primeira requisição do processo
+    """
+    search_index.enabled = app.config.get('SEARCH_INDEX_ENABLED', True)
+
+    @app.before_request
+    def _start_search_index():
+        search_index.start()
+
+# Expõe o tamanho do índice em /api/metrics
+metrics.register_collector(lambda: {
+    f'search_index_{name}': float(value) for name, value in search_index.stats().items()
+})
@@ -0,0 +1,128 @@
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+from app.utils.metrics import metrics
+from config.config import Config
+
+class _Call:
+    """Chamada em andamento compartilhada pelos threads que pediram a mesma chave"""
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes com a mesma chave em uma única execução (single-flight)
+    Quem chega enquanto a chamada está em andamento espera e recebe o mesmo resultado
+    (ou a mesma exceção); a chave é liberada assim que a chamada termina
+    """
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Tuple[int, Hashable], 'asyncio.Task'] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Executa fn uma vez por chave entre os threads concorrentes"""
+        if not self.enabled:
+            return fn()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Executa a corrotina fn uma vez por chave entre as tarefas concorrentes do event loop"""
+        import asyncio
+
+        if not self.enabled:
+            return await fn()
+
+        task_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            if task is not None:
+                self.coalesced += 1
+            else:
+                task = self._tasks[task_key] = asyncio.ensure_future(fn())
+                self.calls += 1
+                task.add_done_callback(lambda finished: self._task_done(task_key, finished))
+
+        # shield: o cancelamento de uma requisição não cancela a chamada das demais
+        return await asyncio.shield(task)
+
+    def forget(self, key: Hashable) -> None:
+        """
+        Desvincula a chamada em andamento da chave (ex.: após uma escrita)
+        Novas chamadas não reaproveitam um resultado que pode estar desatualizado
+        """
+        with self._lock:
+            self._calls.pop(key, None)
+            for task_key in [task_key for task_key in self._tasks if task_key[1] == key]:
+                del self._tasks[task_key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna chamadas executadas, requisições agrupadas e chamadas em andamento"""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'errors': self.errors,
+                'in_flight': len(self._calls) + len(self._tasks)
+            }
+
+    def reset_after_fork(self) -> None:
+        """Descarta no processo filho as chamadas em andamento herdadas (nenhuma thread as concluiria)"""
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = {}
+
+    def reset(self) -> None:
+        """Zera os contadores"""
+        with self._lock:
+            self.calls = self.coalesced = self.errors = 0
+
+    def _task_done(self, task_key: Tuple[int, Hashable], task: 'asyncio.Task') -> None:
+        with self._lock:
+            if self._tasks.get(task_key) is task:
+                del self._tasks[task_key]
+            if task.cancelled() or task.exception() is not None:
+                self.errors += 1
+
+# Agrupamento das buscas de usuário por ID do processo
+user_lookups = SingleFlight(enabled=Config.SINGLE_FLIGHT_ENABLED)
+
+# Expõe os contadores em /api/metrics
+metrics.register_collector(lambda: {
+    f'user_lookup_{name}': value for name, value in user_lookups.stats().items()
+})
@@ -0,0 +1,214 @@
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+from app.models.user_model import USER_FIELDS, now_timestamp
+from app.services.user_repository import ChangeCursor, UserRepository
+
+# Esquema local da tabela users, equivalente ao do Supabase
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL,
+    full_name TEXT,
+    cpf TEXT,
+    birth_date TEXT,
+    status TEXT NOT NULL DEFAULT 'active',
+    role TEXT NOT NULL DEFAULT 'user',
+    last_login TEXT,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users (email);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_cpf ON users (cpf);
+CREATE INDEX IF NOT EXISTS idx_users_updated_at ON users (updated_at, id);
+CREATE TABLE IF NOT EXISTS user_tombstones (
+    id INTEGER PRIMARY KEY,
+    deleted_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_user_tombstones_deleted_at ON user_tombstones (deleted_at, id);
+'''
+
+class SqliteUserRepository(UserRepository):
+    """
+    Repositório local em SQLite com índices em id, email e cpf
+    Usa WAL para permitir leitores concorrentes e uma conexão por thread
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Conexões não são reaproveitadas entre threads nem após um fork
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def _columns(columns: Optional[Sequence[str]]) -> str:
+        if not columns:
+            return '*'
+        invalid = [column for column in columns if column not in USER_FIELDS]
+        if invalid:
+            raise Exception(f"Colunas inválidas: {', '.join(invalid)}")
+        return ', '.join(columns)
+
+    def _insert_rows(self, connection: sqlite3.Connection, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        now = now_timestamp()
+        created = []
+        for row in rows:
+            values = {'created_at': now, 'updated_at': now, **row}
+            columns = self._columns(list(values))
+            placeholders = ', '.join('?' for _ in values)
+            cursor = connection.execute(
+                f'INSERT INTO users ({columns}) VALUES ({placeholders})', list(values.values())
+            )
+            created.append(cursor.lastrowid)
+        placeholders = ', '.join('?' for _ in created)
+        result = connection.execute(f'SELECT * FROM users WHERE id IN ({placeholders})', created).fetchall()
+        by_id = {row['id']: dict(row) for row in result}
+        return [by_id[user_id] for user_id in created]
+
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return self.insert_many([row])[0]
+
+    def insert_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        connection = self._connection()
+        with self._write_lock:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                created = self._insert_rows(connection, rows)
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+        return created
+
+    def get_by_id(self, user_id: int, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            f'SELECT {self._columns(columns)} FROM users WHERE id = ?', (user_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def get_many(self, user_ids: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        if not user_ids:
+            return []
+        placeholders = ', '.join('?' for _ in user_ids)
+        rows = self._connection().execute(
+            f'SELECT {self._columns(columns)} FROM users WHERE id IN ({placeholders})', list(user_ids)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_by_credentials(self, email: str, birth_date: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            'SELECT * FROM users WHERE email = ? AND birth_date = ?', (email, birth_date)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def find_existing(self, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        self._columns(list(values))
+        conditions = ' OR '.join(f'{field} = ?' for field in values)
+        rows = self._connection().execute(
+            f'SELECT email, cpf FROM users WHERE {conditions} LIMIT ?', [*values.values(), len(values)]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def list_page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            f'SELECT {self._columns(columns)} FROM users WHERE id > ? ORDER BY id LIMIT ?',
+            (after if after is not None else 0, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search(self, terms: Sequence[str], limit: int, after: Optional[int] = None) -> List[Dict[str, Any]]:
+        # LIKE do SQLite não diferencia maiúsculas (apenas ASCII)
+        conditions = ''
+        params: List[Any] = [after if after is not None else 0]
+        for term in terms:
+            pattern = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            conditions += (
+                " AND (email LIKE ? ESCAPE '\\' OR full_name LIKE ? ESCAPE '\\' OR full_name LIKE ? ESCAPE '\\')"
+            )
+            params += [f'{pattern}%', f'{pattern}%', f'% {pattern}%']
+        rows = self._connection().execute(
+            f'SELECT * FROM users WHERE id > ?{conditions} ORDER BY id LIMIT ?', [*params, limit]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _changes(
+        self,
+        sql: str,
+        column: str,
+        after: Optional[ChangeCursor],
+        until: str,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        # (column, id) > after sem comparação de tuplas, para que o índice (column, id) seja usado
+        timestamp, user_id = after if after is not None else ('', 0)
+        rows = self._connection().execute(
+            f'{sql} WHERE {column} <= ? AND ({column} > ? OR ({column} = ? AND id > ?)) '
+            f'ORDER BY {column}, id LIMIT ?',
+            (until, timestamp, timestamp, user_id, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def list_changes(self, after: Optional[ChangeCursor], until: str, limit: int) -> List[Dict[str, Any]]:
+        return self._changes('SELECT * FROM users', 'updated_at', after, until, limit)
+
+    def list_tombstones(self, after: Optional[ChangeCursor], until: str, limit: int) -> List[Dict[str, Any]]:
+        return self._changes('SELECT id, deleted_at FROM user_tombstones', 'deleted_at', after, until, limit)
+
+    def update(self, user_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        connection = self._connection()
+        if values:
+            self._columns(list(values))
+            assignments = ', '.join(f'{column} = ?' for column in values)
+            with self._write_lock:
+                connection.execute(
+                    f'UPDATE users SET {assignments} WHERE id = ?', [*values.values(), user_id]
+                )
+        return self.get_by_id(user_id)
+
+    def update_many(self, user_ids: Sequence[int], values: Dict[str, Any]) -> None:
+        if not user_ids or not values:
+            return
+        self._columns(list(values))
+        assignments = ', '.join(f'{column} = ?' for column in values)
+        placeholders = ', '.join('?' for _ in user_ids)
+        with self._write_lock:
+            self._connection().execute(
+                f'UPDATE users SET {assignments} WHERE id IN ({placeholders})',
+                [*values.values(), *user_ids]
+            )
+
+    def delete(self, user_id: int) -> Optional[Dict[str, Any]]:
+        connection = self._connection()
+        with self._write_lock:
+            # A exclusão e o seu registro no feed de alterações na mesma transação
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                deleted = connection.execute('DELETE FROM users WHERE id = ? RETURNING *', (user_id,)).fetchone()
+                if deleted is not None:
+                    connection.execute(
+                        'INSERT OR REPLACE INTO user_tombstones (id, deleted_at) VALUES (?, ?)',
+                        (user_id, now_timestamp())
+                    )
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+        return dict(deleted) if deleted else None
@@ -0,0 +1,236 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from app.models.user_model import User
+from app.utils.metrics import metrics
+from config.config import Config
+
+class LocalSharedBackend:
+    """
+    Backend compartilhado em memória (substituto local do Redis, usado em testes e desenvolvimento)
+    """
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+class RedisSharedBackend:
+    """
+    Backend compartilhado entre processos usando Redis (dependência opcional)
+    """
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("O pacote redis é necessário para USER_CACHE_BACKEND=redis")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._client.get(key)
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._client.set(key, value, px=int(ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter('user:*'):
+            self._client.delete(key)
+
+class UserCache:
+    """
+    Cache read-through de usuários em memória com TTL e despejo LRU
+    Opcionalmente consulta um backend compartilhado antes de ir ao banco
+
+    Cada escrita (set sem read_token ou invalidate) recebe um número crescente, guardado por ID.
+    Uma leitura do banco pega read_token() antes da consulta e só entra no cache se nenhuma
+    escrita no mesmo ID aconteceu depois disso: uma leitura lenta iniciada antes de uma
+    atualização não sobrescreve a linha nova com a antiga.
+    """
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0, shared_backend=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared_backend = shared_backend
+        self._entries: 'OrderedDict[int, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        # Número da última escrita por ID (os mais antigos são descartados e viram _floor)
+        self._writes = 0
+        self._written: 'OrderedDict[int, int]' = OrderedDict()
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f'user:{user_id}'
+
+    def get(self, user_id: int) -> Optional[User]:
+        """Retorna o usuário em cache ou None"""
+        if self.max_size <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                user, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    return user
+                del self._entries[user_id]
+
+        if self.shared_backend is not None:
+            value = self.shared_backend.get(self._key(user_id))
+            if value is not None:
+                user = User.from_dict(json.loads(value))
+                self._store(user_id, user, now)
+                with self._lock:
+                    self.hits += 1
+                return user
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def read_token(self) -> int:
+        """Marca o início de uma leitura do banco (passado depois para set)"""
+        with self._lock:
+            return self._writes
+
+    def get_shared(self, user_id: int) -> Optional[User]:
+        """
+        Usuário lido só do backend compartilhado, sem a camada local do worker
+        O backend compartilhado é atualizado pelas escritas de todos os workers; a camada local
+        só pelas deste, e pode ficar até ttl segundos atrás de uma escrita feita em outro worker
+        Retorna None sem backend compartilhado ou se o usuário não estiver nele
+        """
+        if self.max_size <= 0 or self.shared_backend is None:
+            return None
+        value = self.shared_backend.get(self._key(int(user_id)))
+        return User.from_dict(json.loads(value)) if value is not None else None
+
+    def set(self, user: User, read_token: Optional[int] = None) -> None:
+        """
+        Armazena (ou atualiza) um usuário no cache
+        Com read_token (resultado de uma leitura), descarta a linha se o ID foi escrito depois
+        do início da leitura; sem ele (resultado de uma escrita), registra a escrita
+        """
+        if self.max_size <= 0 or user is None or user.id is None:
+            return
+        user_id = int(user.id)
+        with self._lock:
+            if read_token is None:
+                self._mark_written(user_id)
+            elif read_token < self._floor or read_token < self._written.get(user_id, 0):
+                self.stale += 1
+                return
+        self._store(user_id, user, time.monotonic())
+        if self.shared_backend is not None:
+            self.shared_backend.set(self._key(user_id), json.dumps(user.to_dict(), default=str), self.ttl)
+
+    def invalidate(self, user_id: int) -> None:
+        """Remove um usuário do cache"""
+        user_id = int(user_id)
+        with self._lock:
+            self._mark_written(user_id)
+            self._entries.pop(user_id, None)
+        if self.shared_backend is not None:
+            self.shared_backend.delete(self._key(user_id))
+
+    def clear(self) -> None:
+        """Esvazia o cache e zera os contadores"""
+        with self._lock:
+            self._entries.clear()
+            # Leituras em andamento não repovoam o cache esvaziado
+            self._written.clear()
+            self._floor = self._writes
+            self.hits = self.misses = self.evictions = self.stale = 0
+        if self.shared_backend is not None:
+            self.shared_backend.clear()
+
+    def reset_after_fork(self) -> None:
+        """Começa o processo filho com o cache local vazio e um lock novo"""
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._writes = self._floor = 0
+        self._written = OrderedDict()
+        self.hits = self.misses = self.evictions = self.stale = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna os contadores de uso do cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'stale': self.stale,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def _mark_written(self, user_id: int) -> None:
+        # Chamado com o lock; guarda no máximo max_size IDs, o descarte recusa leituras mais antigas
+        self._writes += 1
+        self._written[user_id] = self._writes
+        self._written.move_to_end(user_id)
+        while len(self._written) > max(self.max_size, 1):
+            _, self._floor = self._written.popitem(last=False)
+
+    def _store(self, user_id: int, user: User, now: float) -> None:
+        with self._lock:
+            self._entries[user_id] = (user, now + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+def _create_shared_backend():
+    """Cria o backend compartilhado configurado (ou None)"""
+    if Config.USER_CACHE_BACKEND == 'redis':
+        return RedisSharedBackend(Config.USER_CACHE_REDIS_URL)
+    if Config.USER_CACHE_BACKEND == 'local':
+        return LocalSharedBackend()
+    return None
+
+# Cache de usuários do processo
+user_cache = UserCache(
+    max_size=Config.USER_CACHE_MAX_SIZE,
+    ttl=Config.USER_CACHE_TTL,
+    shared_backend=_create_shared_backend()
+)
+
+# Expõe os contadores do cache em /api/metrics
+metrics.register_collector(lambda: {
+    f'user_cache_{name}': value for name, value in user_cache.stats().items()
+})
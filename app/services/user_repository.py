@@ -0,0 +1,240 @@
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.models.user_model import now_timestamp
+from config.config import Config
+
+# Posição no feed de alterações: (horário, id) da última linha lida
+ChangeCursor = Tuple[str, int]
+
+# Função do banco que exclui o usuário e grava o registro da exclusão na mesma transação
+# (criada por config/supabase_change_feed.sql)
+DELETE_USER_FUNCTION = 'delete_user_with_tombstone'
+
+class UserRepository(ABC):
+    """
+    Interface de acesso à tabela users
+    Todas as linhas são trocadas como dicionários com as colunas de User.FIELDS
+    """
+
+    @abstractmethod
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Insere um usuário e retorna a linha criada"""
+
+    @abstractmethod
+    def insert_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insere vários usuários em uma única operação e retorna as linhas criadas, na mesma ordem"""
+
+    @abstractmethod
+    def get_by_id(self, user_id: int, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """Retorna o usuário com o ID informado (apenas as colunas pedidas, se informadas) ou None"""
+
+    @abstractmethod
+    def get_many(self, user_ids: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Retorna os usuários existentes entre os IDs informados, em uma única consulta (ordem não garantida)"""
+
+    @abstractmethod
+    def get_by_credentials(self, email: str, birth_date: str) -> Optional[Dict[str, Any]]:
+        """Retorna o usuário com o email e data de nascimento informados ou None"""
+
+    @abstractmethod
+    def find_existing(self, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Retorna as linhas (colunas email e cpf) em que algum dos campos informados tem o valor informado"""
+
+    @abstractmethod
+    def list_page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Retorna até limit usuários com ID maior que after, ordenados por ID"""
+
+    @abstractmethod
+    def search(self, terms: Sequence[str], limit: int, after: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Retorna até limit usuários com ID maior que after, ordenados por ID, em que cada termo
+        é prefixo (sem diferenciar maiúsculas) do email ou de uma palavra do nome
+        """
+
+    @abstractmethod
+    def list_changes(self, after: Optional[ChangeCursor], until: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Retorna até limit usuários com (updated_at, id) maior que after e updated_at até until,
+        ordenados por (updated_at, id)
+        """
+
+    @abstractmethod
+    def list_tombstones(self, after: Optional[ChangeCursor], until: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Retorna até limit registros de exclusão (colunas id e deleted_at) com (deleted_at, id) maior
+        que after e deleted_at até until, ordenados por (deleted_at, id)
+        """
+
+    @abstractmethod
+    def update(self, user_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Atualiza um usuário e retorna a linha atualizada ou None se não existir"""
+
+    @abstractmethod
+    def update_many(self, user_ids: Sequence[int], values: Dict[str, Any]) -> None:
+        """Aplica os mesmos valores a vários usuários"""
+
+    @abstractmethod
+    def delete(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Exclui um usuário, registra a exclusão em user_tombstones e retorna a linha excluída ou None se não existir"""
+
+class SupabaseUserRepository(UserRepository):
+    """
+    Repositório sobre o cliente Supabase (PostgREST) compartilhado pelo processo
+
+    O feed de alterações precisa, no banco, da tabela user_tombstones, dos índices
+    (updated_at, id) e (deleted_at, id), de updated_at preenchido nas linhas antigas e da
+    função delete_user_with_tombstone: config/supabase_change_feed.sql
+    """
+
+    @staticmethod
+    def _table(name: str = 'users'):
+        return Config.get_supabase_client().table(name)
+
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        response = self._table().insert(row).execute()
+
+        # Verifica erros
+        if 'error' in response:
+            raise Exception(response['error']['message'])
+
+        return response.data[0]
+
+    def insert_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        response = self._table().insert(rows).execute()
+        return response.data
+
+    def get_by_id(self, user_id: int, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        response = self._table().select(','.join(columns) if columns else '*').eq('id', user_id).execute()
+        return response.data[0] if response.data else None
+
+    def get_many(self, user_ids: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        if not user_ids:
+            return []
+        return self._table().select(','.join(columns) if columns else '*').in_('id', list(user_ids)).execute().data
+
+    def get_by_credentials(self, email: str, birth_date: str) -> Optional[Dict[str, Any]]:
+        response = self._table().select('*').eq('email', email).eq('birth_date', birth_date).execute()
+        return response.data[0] if response.data else None
+
+    def find_existing(self, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        query = self._table().select('email,cpf')
+        if len(values) == 1:
+            (field, value), = values.items()
+            query = query.eq(field, value)
+        else:
+            query = _logical(query, 'or', [f'{field}.eq.{_quote(value)}' for field, value in values.items()])
+        return query.limit(len(values)).execute().data
+
+    def list_page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        query = self._table().select(','.join(columns) if columns else '*').order('id')
+        if after is not None:
+            query = query.gt('id', after)
+        return query.limit(limit).execute().data
+
+    def search(self, terms: Sequence[str], limit: int, after: Optional[int] = None) -> List[Dict[str, Any]]:
+        query = self._table().select('*').order('id')
+        if after is not None:
+            query = query.gt('id', after)
+        query = _logical(query, 'and', [_prefix_condition(term) for term in terms])
+        return query.limit(limit).execute().data
+
+    def list_changes(self, after: Optional[ChangeCursor], until: str, limit: int) -> List[Dict[str, Any]]:
+        query = self._table().select('*').order('updated_at,id').lte('updated_at', until)
+        return _after_cursor(query, 'updated_at', after).limit(limit).execute().data
+
+    def list_tombstones(self, after: Optional[ChangeCursor], until: str, limit: int) -> List[Dict[str, Any]]:
+        query = self._table('user_tombstones').select('id,deleted_at').order('deleted_at,id').lte('deleted_at', until)
+        return _after_cursor(query, 'deleted_at', after).limit(limit).execute().data
+
+    def update(self, user_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        response = self._table().update(values).eq('id', user_id).execute()
+        return response.data[0] if response.data else None
+
+    def update_many(self, user_ids: Sequence[int], values: Dict[str, Any]) -> None:
+        self._table().update(values).in_('id', list(user_ids)).execute()
+
+    def delete(self, user_id: int) -> Optional[Dict[str, Any]]:
+        # Uma única chamada: exclusão e registro em user_tombstones na mesma transação
+        params = {'p_user_id': user_id, 'p_deleted_at': now_timestamp()}
+        response = Config.get_supabase_client().rpc(DELETE_USER_FUNCTION, params).execute()
+        return response.data[0] if response.data else None
+
+def _quote(value: Any) -> str:
+    """Valor entre aspas para filtros or= do PostgREST (vírgulas e parênteses são reservados)"""
+    escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{escaped}"'
+
+def _logical(query, operator: str, conditions: Sequence[str]):
+    """Filtro lógico or=(...)/and=(...) do PostgREST (o postgrest-py 0.10 não tem or_())"""
+    query.params = query.params.add(operator, f"({','.join(conditions)})")
+    return query
+
+def _after_cursor(query, column: str, after: Optional[ChangeCursor]):
+    """Filtro (column, id) > after, para percorrer o feed de alterações na ordem (column, id)"""
+    if after is None:
+        return query
+    timestamp, user_id = after
+    return _logical(query, 'or', [
+        f'{column}.gt.{_quote(timestamp)}',
+        f'and({column}.eq.{_quote(timestamp)},id.gt.{int(user_id)})'
+    ])
+
+def _prefix_condition(term: str) -> str:
+    """Condição em que term é prefixo do email ou de uma palavra do nome (ilike usa * como curinga)"""
+    patterns = (('email', f'{term}*'), ('full_name', f'{term}*'), ('full_name', f'* {term}*'))
+    return f"or({','.join(f'{column}.ilike.{_quote(pattern)}' for column, pattern in patterns)})"
+
+def create_base_user_repository(config_class=Config) -> UserRepository:
+    """Cria o repositório configurado em USER_REPOSITORY (supabase ou sqlite), sem decoradores"""
+    backend = getattr(config_class, 'USER_REPOSITORY', 'supabase')
+    if backend == 'sqlite':
+        from app.services.sqlite_user_repository import SqliteUserRepository
+        return SqliteUserRepository(config_class.SQLITE_DATABASE_PATH)
+    if backend == 'supabase':
+        return SupabaseUserRepository()
+    raise ValueError(f"Repositório de usuários desconhecido: {backend}")
+
+def create_user_repository(config_class=Config) -> UserRepository:
+    """Cria o repositório configurado, com injeção de falhas e resiliência se ativadas"""
+    repository = create_base_user_repository(config_class)
+    if getattr(config_class, 'FAULT_INJECTION_ENABLED', False):
+        from app.services.fault_injection import FaultInjectingUserRepository, fault_options
+        repository = FaultInjectingUserRepository(repository, **fault_options(config_class))
+    if getattr(config_class, 'BACKEND_RESILIENCE_ENABLED', False):
+        from app.services.resilient_user_repository import ResilientUserRepository
+        repository = ResilientUserRepository(repository)
+    return repository
+
+# Repositório do processo (definido por create_app ou criado sob demanda)
+_user_repository: Optional[UserRepository] = None
+_user_repository_lock = threading.Lock()
+
+def get_user_repository() -> UserRepository:
+    """Retorna o repositório de usuários do processo"""
+    global _user_repository
+
+    repository = _user_repository
+    if repository is None:
+        with _user_repository_lock:
+            if _user_repository is None:
+                _user_repository = create_user_repository()
+            repository = _user_repository
+    return repository
+
+def set_user_repository(repository: Optional[UserRepository]) -> None:
+    """Define o repositório de usuários do processo (None volta ao padrão da configuração)"""
+    global _user_repository
+
+    with _user_repository_lock:
+        _user_repository = repository
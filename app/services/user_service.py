@@ -1,61 +1,336 @@
+import re
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
-from app.models.user_model import User
+from typing import Dict, List, Optional, Any, Tuple, Iterator
+from app.models.user_model import User, UserBatch, USER_EDITABLE_FIELDS, now_timestamp
+from app.services.duplicate_index import duplicate_index
+from app.services.resilience import BackendUnavailable
+from app.services.search_index import search_index
+from app.services.user_cache import user_cache
+from app.services.login_writer import last_login_writer
+from app.services.single_flight import user_lookups
+from app.services.user_repository import ChangeCursor, get_user_repository
+from app.services.user_stats import user_stats
 from app.utils.auth import validate_cpf, validate_birth_date
+from app.utils.batch_validation import validate_cpfs, validate_birth_dates
+from app.utils.metrics import metrics
+from app.utils.etag import user_etag
+from app.utils.cursor import SEARCH_CURSOR_INDEX, SEARCH_CURSOR_KEYSET, decode_search_cursor, encode_search_cursor
 from config.config import Config
 
+# Colunas que identificam a versão de uma linha (usadas nos ETags)
+VERSION_FIELDS = ('id', 'updated_at', 'last_login')
+
+# Cursor malformado ou que este worker não consegue continuar (respondido com 400)
+INVALID_CURSOR_ERROR = "Cursor de paginação inválido"
+
+# Mensagens de erro para emails e CPFs já cadastrados
+DUPLICATE_ERRORS = {'email': 'Email já cadastrado', 'cpf': 'CPF já cadastrado'}
+
+# Caracteres reservados nos filtros ilike/LIKE da busca enviada ao banco
+_SEARCH_RESERVED = re.compile(r'[%*,()"\\:]')
+
 class UserService:
     @staticmethod
-    def create_user(user_data: Dict[str, Any]) -> Tuple[User, Optional[str]]:
+    def _validate_user_data(
+        user_data: Dict[str, Any],
+        cpf_valid: Optional[bool] = None,
+        birth_date_valid: Optional[bool] = None
+    ) -> Optional[str]:
         """
-        Cria um novo usuário no banco de dados
-        Retorna o usuário criado ou uma mensagem de erro
+        Valida os dados de cadastro de um usuário
+        cpf_valid e birth_date_valid trazem o resultado já calculado em lote, se houver
+        Retorna a mensagem de erro ou None se os dados forem válidos
         """
+        if not isinstance(user_data, dict):
+            return "Dados do usuário inválidos"
+        
         # Valida campos obrigatórios
         required_fields = ['email', 'full_name', 'cpf', 'birth_date']
         for field in required_fields:
             if field not in user_data:
-                return None, f"Campo obrigatório ausente: {field}"
+                return f"Campo obrigatório ausente: {field}"
         
         # Valida o formato do CPF
-        if not validate_cpf(user_data['cpf']):
-            return None, "Formato de CPF inválido"
+        if not (cpf_valid if cpf_valid is not None else validate_cpf(user_data['cpf'])):
+            return "Formato de CPF inválido"
         
         # Valida o formato da data de nascimento
-        if not validate_birth_date(user_data['birth_date']):
-            return None, "Formato de data de nascimento inválido. Use AAAA-MM-DD"
+        if not (birth_date_valid if birth_date_valid is not None else validate_birth_date(user_data['birth_date'])):
+            return "Formato de data de nascimento inválido. Use AAAA-MM-DD"
+        
+        return None
+    
+    @staticmethod
+    def _insert_row(user: User) -> Dict[str, Any]:
+        """Monta a linha a ser inserida na tabela users"""
+        now = now_timestamp()
+        return {
+            'email': user.email,
+            'full_name': user.full_name,
+            'cpf': user.cpf,
+            'birth_date': user.birth_date,
+            'status': user.status,
+            'role': user.role,
+            'created_at': now,
+            'updated_at': now
+        }
+    
+    @staticmethod
+    def _prepare_new_user(user_data: Dict[str, Any]) -> Tuple[Optional[User], Optional[str]]:
+        """
+        Valida os dados de cadastro e cria o objeto User com os valores padrão
+        Retorna o usuário ou uma mensagem de erro
+        """
+        error = UserService._validate_user_data(user_data)
+        if error:
+            return None, error
         
         # Adiciona valores padrão se não fornecidos
         user_data['status'] = user_data.get('status', 'active')
         user_data['role'] = user_data.get('role', 'user')
         
-        # Cria objeto de usuário
-        user = User.from_dict(user_data)
+        return User.from_dict(user_data), None
+    
+    @staticmethod
+    def _duplicate_lookup(user: User) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Consulta o índice de duplicatas antes de um cadastro
+        Retorna o erro de uma duplicata já confirmada ou os valores que precisam ser confirmados no banco
+        """
+        values = {'email': user.email, 'cpf': user.cpf}
+        field, maybe = duplicate_index.lookup(values)
+        if field:
+            return DUPLICATE_ERRORS[field], {}
+        return None, {field: values[field] for field in maybe}
+    
+    @staticmethod
+    def _on_duplicates_checked(values: Dict[str, Any], rows: List[Dict[str, Any]]) -> Optional[str]:
+        """Registra no índice o resultado da confirmação no banco e retorna o erro de duplicata, se houver"""
+        for field, value in values.items():
+            if any(row.get(field) == value for row in rows):
+                duplicate_index.confirm(field, value)
+                return DUPLICATE_ERRORS[field]
+        duplicate_index.record_false_positive()
+        return None
+    
+    @staticmethod
+    def _check_duplicates(user: User) -> Optional[str]:
+        """Recusa emails e CPFs já cadastrados, indo ao banco apenas quando o índice responde 'talvez'"""
+        error, values = UserService._duplicate_lookup(user)
+        if error or not values:
+            return error
+        with metrics.time_backend('check_duplicates'):
+            rows = get_user_repository().find_existing(values)
+        return UserService._on_duplicates_checked(values, rows)
+    
+    @staticmethod
+    def _on_created(row: Dict[str, Any]) -> User:
+        """Atualiza os componentes em memória após um cadastro"""
+        created_user = User.from_dict(row)
+        user_cache.set(created_user)
+        duplicate_index.add(row)
+        search_index.add(row)
+        user_stats.record_change(row['id'], None, row)
+        return created_user
+    
+    @staticmethod
+    def _on_fetched(row: Dict[str, Any], read_token: int) -> User:
+        """
+        Atualiza os componentes em memória após uma leitura completa
+        read_token: user_cache.read_token() obtido antes da consulta
+        """
+        user = User.from_dict(row)
+        user_cache.set(user, read_token)
+        return user
+    
+    @staticmethod
+    def _load_user(user_id: int) -> Optional[User]:
+        """Busca um usuário no banco e armazena no cache (executado uma vez por grupo de buscas)"""
+        read_token = user_cache.read_token()
+        with metrics.time_backend('get_user_by_id'):
+            user_data = get_user_repository().get_by_id(user_id)
+        return UserService._on_fetched(user_data, read_token) if user_data else None
+    
+    @staticmethod
+    def _cached_users(user_ids: List[int]) -> Tuple[Dict[int, User], List[int]]:
+        """Separa os IDs encontrados no cache dos que precisam ser buscados no banco"""
+        found = {}
+        misses = []
+        for user_id in user_ids:
+            user = user_cache.get(user_id)
+            if user is not None:
+                found[user_id] = user
+            else:
+                misses.append(user_id)
+        return found, misses
+    
+    @staticmethod
+    def _page_fields(fields: Optional[List[str]]) -> Optional[List[str]]:
+        """
+        Colunas da consulta de uma página
+        (o ID é necessário para o cursor e as colunas de versão para o ETag da página)
+        """
+        if not fields:
+            return None
+        fields = ['id'] + [field for field in fields if field not in VERSION_FIELDS]
+        return fields + ['updated_at', 'last_login']
+    
+    @staticmethod
+    def _on_authenticated(row: Dict[str, Any]) -> User:
+        """Atualiza os componentes em memória após um login"""
+        # Login anterior: o ainda não gravado, se houver, é mais recente que o da linha
+        user_stats.record_login(row, last_login_writer.pending(row['id']) or row.get('last_login'))
+        # Enfileira a hora do último login (gravada em segundo plano)
+        last_login_writer.record(row['id'], datetime.now().isoformat(timespec='seconds'))
+        return User.from_dict(row)
+    
+    @staticmethod
+    def _update_changes(current: User, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Colunas editáveis cujo valor difere do usuário atual
+        Chaves desconhecidas e colunas mantidas pelo servidor são ignoradas
+        """
+        changes = {
+            field: user_data[field] for field in USER_EDITABLE_FIELDS
+            if field in user_data and user_data[field] != getattr(current, field)
+        }
+        metrics.inc('user_updates_total', (('result', 'written' if changes else 'skipped'),))
+        return changes
+    
+    @staticmethod
+    def _on_updated(user_id: int, row: Optional[Dict[str, Any]], previous: User) -> Optional[User]:
+        """Atualiza os componentes em memória após uma atualização (previous: usuário antes dela)"""
+        user_lookups.forget(user_id)
+        if not row:
+            user_cache.invalidate(user_id)
+            return None
+        user = User.from_dict(row)
+        user_cache.set(user)
+        duplicate_index.add(row)
+        search_index.add(row)
+        user_stats.record_change(user_id, previous.to_dict(), row)
+        return user
+    
+    @staticmethod
+    def _on_deleted(user_id: int, deleted: Optional[Dict[str, Any]]) -> None:
+        """Atualiza os componentes em memória após uma exclusão (deleted: linha excluída)"""
+        user_lookups.forget(user_id)
+        user_cache.invalidate(user_id)
+        if deleted:
+            duplicate_index.mark_deleted()
+            search_index.remove(user_id)
+            user_stats.record_change(user_id, deleted, None)
+    
+    @staticmethod
+    def create_user(user_data: Dict[str, Any]) -> Tuple[User, Optional[str]]:
+        """
+        Cria um novo usuário no banco de dados
+        Retorna o usuário criado ou uma mensagem de erro
+        """
+        # Valida e cria objeto de usuário
+        user, error = UserService._prepare_new_user(user_data)
+        if error:
+            return None, error
         
         try:
-            # Conecta ao Supabase
-            supabase = Config.get_supabase_client()
+            # Recusa duplicatas conhecidas antes do insert
+            error = UserService._check_duplicates(user)
+            if error:
+                return None, error
             
             # Insere usuário no banco de dados
-            response = supabase.table('users').insert({
-                'email': user.email,
-                'full_name': user.full_name,
-                'cpf': user.cpf,
-                'birth_date': user.birth_date,
-                'status': user.status,
-                'role': user.role
-            }).execute()
-            
-            # Verifica erros
-            if 'error' in response:
-                return None, response['error']['message']
+            with metrics.time_backend('create_user'):
+                row = get_user_repository().insert(UserService._insert_row(user))
             
             # Obtém o usuário criado
-            created_user = User.from_dict(response.data[0])
-            return created_user, None
+            return UserService._on_created(row), None
             
+        except BackendUnavailable:
+            raise
         except Exception as e:
             return None, str(e)
+    
+    @staticmethod
+    def _bulk_unavailable(results: List[Dict[str, Any]], remaining: List[Tuple[int, User]], error: Exception) -> None:
+        """Marca as linhas de um lote que não foram gravadas porque o banco ficou indisponível"""
+        for index, _ in remaining:
+            results[index] = {'index': index, 'error': str(error), 'unavailable': True}
+    
+    @staticmethod
+    def create_users_bulk(
+        users_data: List[Dict[str, Any]],
+        chunk_size: int = Config.USERS_BULK_CHUNK_SIZE
+    ) -> List[Dict[str, Any]]:
+        """
+        Cria vários usuários validando o lote inteiro e inserindo em blocos com múltiplas linhas
+        Retorna um resultado por linha, na ordem recebida
+        Com o banco indisponível o lote para: os blocos anteriores continuam gravados e as linhas
+        restantes voltam com o erro e unavailable=True (podem ser reenviadas)
+        """
+        results: List[Dict[str, Any]] = [None] * len(users_data)
+        pending: List[Tuple[int, User]] = []
+        seen_emails = set()
+        seen_cpfs = set()
+        
+        # Valida CPFs e datas do lote inteiro de uma vez
+        rows = [user_data if isinstance(user_data, dict) else {} for user_data in users_data]
+        cpfs_valid = validate_cpfs([row.get('cpf') for row in rows]).valid
+        birth_dates_valid = validate_birth_dates([row.get('birth_date') for row in rows]).valid
+        
+        # Valida todas as linhas antes de qualquer acesso ao banco
+        for index, user_data in enumerate(users_data):
+            error = UserService._validate_user_data(user_data, cpfs_valid[index], birth_dates_valid[index])
+            if not error and user_data['email'] in seen_emails:
+                error = "Email duplicado no lote"
+            if not error and user_data['cpf'] in seen_cpfs:
+                error = "CPF duplicado no lote"
+            if error:
+                results[index] = {'index': index, 'error': error}
+                continue
+            
+            seen_emails.add(user_data['email'])
+            seen_cpfs.add(user_data['cpf'])
+            user = User.from_dict(user_data)
+            pending.append((index, user))
+        
+        if not pending:
+            return results
+        
+        repository = get_user_repository()
+        
+        # Insere as linhas válidas em blocos
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            try:
+                with metrics.time_backend('create_users_bulk'):
+                    created = repository.insert_many([UserService._insert_row(user) for _, user in chunk])
+            except BackendUnavailable as e:
+                # Inserir linha a linha só falharia de novo (ou duplicaria linhas gravadas)
+                UserService._bulk_unavailable(results, pending[start:], e)
+                return results
+            except Exception:
+                # O bloco falhou por completo: insere linha a linha para isolar os erros
+                created = None
+            
+            if created is not None and len(created) == len(chunk):
+                for (index, _), row in zip(chunk, created):
+                    created_user = UserService._on_created(row)
+                    results[index] = {'index': index, 'user': created_user.to_response_dict()}
+                continue
+            
+            for offset, (index, user) in enumerate(chunk):
+                try:
+                    with metrics.time_backend('create_users_bulk'):
+                        row = repository.insert(UserService._insert_row(user))
+                    created_user = UserService._on_created(row)
+                    results[index] = {'index': index, 'user': created_user.to_response_dict()}
+                except BackendUnavailable as e:
+                    UserService._bulk_unavailable(results, pending[start + offset:], e)
+                    return results
+                except Exception as e:
+                    results[index] = {'index': index, 'error': str(e)}
+        
+        return results
         
     @staticmethod
     def authenticate_user(username: str, birth_date: str) -> Tuple[User, Optional[str]]:
@@ -68,24 +343,19 @@ class UserService:
             return None, "Formato de data de nascimento inválido. Use AAAA-MM-DD"
         
         try:
-            # Conecta ao Supabase
-            supabase = Config.get_supabase_client()
-            
             # Consulta o banco de dados (usando o email como username)
-            response = supabase.table('users').select('*').eq('email', username).eq('birth_date', birth_date).execute()
+            with metrics.time_backend('authenticate_user'):
+                user_data = get_user_repository().get_by_credentials(username, birth_date)
             
             # Verifica se o usuário existe
-            if not response.data:
+            if not user_data:
                 return None, "Credenciais inválidas"
             
-            user_data = response.data[0]
-            
-            # Atualiza hora do último login
-            supabase.table('users').update({'last_login': datetime.now().isoformat()}).eq('id', user_data['id']).execute()
-            
             # Retorna usuário
-            return User.from_dict(user_data), None
+            return UserService._on_authenticated(user_data), None
             
+        except BackendUnavailable:
+            raise
         except Exception as e:
             return None, str(e)
     
@@ -99,45 +369,242 @@ class UserService:
             # Converte para inteiro caso seja string
             user_id = int(user_id)
             
-            # Conecta ao Supabase
-            supabase = Config.get_supabase_client()
+            # Consulta o cache antes do banco de dados
+            user = user_cache.get(user_id)
+            if user is not None:
+                return user, None
             
-            # Consulta o banco de dados
-            response = supabase.table('users').select('*').eq('id', user_id).execute()
+            # Consulta o banco de dados (buscas simultâneas do mesmo ID compartilham a consulta)
+            user = user_lookups.do(user_id, lambda: UserService._load_user(user_id))
             
             # Verifica se o usuário existe
-            if not response.data:
+            if user is None:
                 return None, "Usuário não encontrado"
             
             # Retorna usuário
-            return User.from_dict(response.data[0]), None
+            return user, None
+            
+        except ValueError:
+            return None, "ID de usuário inválido"
+        except BackendUnavailable:
+            raise
+        except Exception as e:
+            return None, str(e)
+    
+    @staticmethod
+    def get_users_by_ids(user_ids: List[int]) -> Tuple[List[User], List[int], Optional[str]]:
+        """
+        Obtém vários usuários pelo ID com uma única consulta para os que não estão em cache
+        Retorna os usuários na ordem pedida (sem repetições), os IDs não encontrados e uma mensagem de erro
+        """
+        try:
+            # Remove repetições mantendo a ordem
+            user_ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+            
+            # Consulta o cache antes do banco de dados
+            found, misses = UserService._cached_users(user_ids)
+            
+            # Busca os demais em uma única consulta
+            if misses:
+                read_token = user_cache.read_token()
+                with metrics.time_backend('get_users_by_ids'):
+                    rows = get_user_repository().get_many(misses)
+                for row in rows:
+                    user = UserService._on_fetched(row, read_token)
+                    found[int(user.id)] = user
+            
+            users = [found[user_id] for user_id in user_ids if user_id in found]
+            missing = [user_id for user_id in user_ids if user_id not in found]
+            return users, missing, None
+            
+        except ValueError:
+            return [], [], "ID de usuário inválido"
+        except BackendUnavailable:
+            raise
+        except Exception as e:
+            return [], [], str(e)
+    
+    @staticmethod
+    def get_user_etag(user_id: int) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Obtém o ETag atual de um usuário sem buscar a linha completa
+        Usa o backend compartilhado do cache, quando configurado, ou uma consulta projetada apenas
+        nas colunas de versão; a camada local do cache não é usada porque pode estar atrasada em
+        relação a escritas de outros workers (304 para uma versão que já mudou)
+        Retorna o ETag ou uma mensagem de erro
+        """
+        try:
+            user_id = int(user_id)
+            
+            user = user_cache.get_shared(user_id)
+            if user is not None:
+                return user_etag(user.id, user.updated_at, user.last_login), None
+            
+            with metrics.time_backend('get_user_etag'):
+                version = get_user_repository().get_by_id(user_id, VERSION_FIELDS)
+            
+            if not version:
+                return None, "Usuário não encontrado"
+            
+            return user_etag(version['id'], version['updated_at'], version['last_login']), None
             
         except ValueError:
             return None, "ID de usuário inválido"
+        except BackendUnavailable:
+            raise
         except Exception as e:
             return None, str(e)
     
     @staticmethod
-    def get_all_users() -> Tuple[List[User], Optional[str]]:
+    def get_all_users(
+        limit: int = Config.USERS_PAGE_SIZE,
+        after: Optional[int] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[UserBatch, Optional[int], Optional[str]]:
         """
-        Obtém todos os usuários
-        Retorna uma lista de usuários ou uma mensagem de erro
+        Obtém uma página de usuários ordenada por ID (paginação por cursor)
+        Retorna o lote de usuários, o cursor da próxima página (ou None) e uma mensagem de erro
         """
         try:
-            # Conecta ao Supabase
-            supabase = Config.get_supabase_client()
+            if after is not None:
+                after = int(after)
             
-            # Consulta o banco de dados
-            response = supabase.table('users').select('*').execute()
+            # Seleciona apenas as colunas pedidas
+            fields = UserService._page_fields(fields)
             
-            # Converte para lista de objetos User
-            users = [User.from_dict(user_data) for user_data in response.data]
+            # Busca um registro a mais para saber se existe próxima página
+            with metrics.time_backend('get_all_users'):
+                page = get_user_repository().list_page(limit + 1, after, fields)
+            
+            rows = page[:limit]
+            next_cursor = rows[-1]['id'] if len(page) > limit else None
+            
+            # Converte para lote colunar (sem um objeto User por linha)
+            users = UserBatch.from_rows(rows, fields)
             
             # Retorna usuários
-            return users, None
+            return users, next_cursor, None
             
+        except ValueError:
+            return UserBatch.from_rows([]), None, INVALID_CURSOR_ERROR
+        except BackendUnavailable:
+            raise
         except Exception as e:
-            return [], str(e)
+            return UserBatch.from_rows([]), None, str(e)
+    
+    @staticmethod
+    def search_users(
+        query: str,
+        limit: int = Config.SEARCH_PAGE_SIZE,
+        after: Optional[str] = None
+    ) -> Tuple[List[User], Optional[str], Optional[str]]:
+        """
+        Busca usuários em que cada palavra da consulta é prefixo do email ou de uma palavra do nome
+        Com o índice em memória carregado: ordem por relevância, sem acentos (cursor com a posição no resultado)
+        Sem o índice (ou enquanto ele carrega): filtros ilike no banco, ordem por ID (cursor com o último ID)
+        O cursor guarda o modo que o gerou e a paginação continua nele, em qualquer worker: um cursor
+        do banco segue no banco mesmo com o índice carregado; um cursor do índice em um worker
+        sem o índice carregado é recusado (INVALID_CURSOR_ERROR)
+        Retorna os usuários, o cursor opaco da próxima página (ou None) e uma mensagem de erro
+        """
+        try:
+            mode, position = decode_search_cursor(after) if after else (None, None)
+            # Um índice parcial daria resultados incompletos: até carregar, a busca vai ao banco
+            use_index = search_index.enabled and search_index.warmed and mode != SEARCH_CURSOR_KEYSET
+            if mode == SEARCH_CURSOR_INDEX and not use_index:
+                return [], None, INVALID_CURSOR_ERROR
+            
+            if use_index:
+                offset = position or 0
+                user_ids, total = search_index.search(query, limit, offset)
+                next_cursor = encode_search_cursor(SEARCH_CURSOR_INDEX, offset + limit) if offset + limit < total else None
+                if not user_ids:
+                    return [], next_cursor, None
+                # Linhas completas do cache ou de uma única consulta (IDs já excluídos ficam de fora)
+                users, _, error = UserService.get_users_by_ids(user_ids)
+                return users, next_cursor, error
+            
+            terms = _SEARCH_RESERVED.sub(' ', query).split()
+            if not terms:
+                return [], None, None
+            read_token = user_cache.read_token()
+            with metrics.time_backend('search_users'):
+                page = get_user_repository().search(terms, limit + 1, position)
+            
+            rows = page[:limit]
+            next_cursor = encode_search_cursor(SEARCH_CURSOR_KEYSET, rows[-1]['id']) if len(page) > limit else None
+            return [UserService._on_fetched(row, read_token) for row in rows], next_cursor, None
+            
+        except ValueError:
+            return [], None, INVALID_CURSOR_ERROR
+        except BackendUnavailable:
+            raise
+        except Exception as e:
+            return [], None, str(e)
+    
+    @staticmethod
+    def iter_all_users(page_size: int = Config.USERS_EXPORT_PAGE_SIZE) -> Iterator[User]:
+        """
+        Percorre todos os usuários página por página (usado na exportação)
+        Apenas uma página é mantida em memória por vez
+        """
+        cursor = None
+        while True:
+            users, cursor, error = UserService.get_all_users(limit=page_size, after=cursor)
+            if error:
+                raise Exception(error)
+            
+            yield from users
+            
+            if cursor is None:
+                break
+    
+    @staticmethod
+    def get_changes(
+        after: Optional[ChangeCursor] = None,
+        limit: int = Config.CHANGE_FEED_PAGE_SIZE
+    ) -> Tuple[List[Dict[str, Any]], Optional[ChangeCursor], bool, Optional[str]]:
+        """
+        Usuários criados, atualizados ou excluídos depois do cursor, em ordem de (horário, id)
+        Cada página lê até limit + 1 linhas dos índices (updated_at, id) dos usuários e
+        (deleted_at, id) das exclusões: o custo depende das alterações, não do tamanho da tabela.
+        Alterações mais recentes que CHANGE_FEED_SAFETY_LAG ficam para a próxima leitura.
+        Retorna as alterações, o cursor da próxima leitura, se há mais páginas e uma mensagem de erro
+        """
+        try:
+            until = now_timestamp(Config.CHANGE_FEED_SAFETY_LAG)
+            repository = get_user_repository()
+            with metrics.time_backend('list_changes'):
+                updated = repository.list_changes(after, until, limit + 1)
+                deleted = repository.list_tombstones(after, until, limit + 1)
+            
+            # Intercala as duas listas ordenadas
+            merged = sorted(
+                [(row['updated_at'], row['id'], row) for row in updated] +
+                [(row['deleted_at'], row['id'], None) for row in deleted],
+                key=lambda change: change[:2]
+            )
+            page = merged[:limit]
+            
+            changes = []
+            for timestamp, user_id, row in page:
+                if row is None:
+                    changes.append({'op': 'delete', 'id': user_id, 'deleted_at': timestamp})
+                else:
+                    # Sem passar pelo cache: páginas grandes expulsariam os usuários mais acessados
+                    user = User.from_dict(row)
+                    changes.append({
+                        'op': 'upsert', 'id': user_id, 'updated_at': timestamp, 'user': user.to_response_dict()
+                    })
+            
+            # Página vazia: o cliente volta com o mesmo cursor
+            next_after = page[-1][:2] if page else after
+            return changes, next_after, len(merged) > limit, None
+            
+        except BackendUnavailable:
+            raise
+        except Exception as e:
+            return [], after, False, str(e)
     
     @staticmethod
     def update_user(user_id: int, user_data: Dict[str, Any]) -> Tuple[User, Optional[str]]:
@@ -149,24 +616,36 @@ class UserService:
             # Converte para inteiro caso seja string
             user_id = int(user_id)
             
-            # Conecta ao Supabase
-            supabase = Config.get_supabase_client()
+            # Linha atual lida do banco para calcular o que mudou: o cache pode estar
+            # desatualizado (escrita em outro worker) e esconder uma alteração real
+            current = UserService._load_user(user_id)
+            if current is None:
+                return None, "Usuário não encontrado"
+            
+            # Nada mudou: não grava nem altera updated_at
+            changes = UserService._update_changes(current, user_data or {})
+            if not changes:
+                return current, None
             
             # Adiciona timestamp de atualização
-            user_data['updated_at'] = datetime.now().isoformat()
+            changes['updated_at'] = now_timestamp()
             
-            # Atualiza usuário no banco de dados
-            response = supabase.table('users').update(user_data).eq('id', user_id).execute()
+            # Atualiza apenas as colunas alteradas
+            with metrics.time_backend('update_user'):
+                updated = get_user_repository().update(user_id, changes)
             
             # Verifica se o usuário existe
-            if not response.data:
+            user = UserService._on_updated(user_id, updated, current)
+            if user is None:
                 return None, "Usuário não encontrado"
             
             # Retorna usuário atualizado
-            return User.from_dict(response.data[0]), None
+            return user, None
             
         except ValueError:
             return None, "ID de usuário inválido"
+        except BackendUnavailable:
+            raise
         except Exception as e:
             return None, str(e)
     
@@ -180,14 +659,13 @@ class UserService:
             # Converte para inteiro caso seja string
             user_id = int(user_id)
             
-            # Conecta ao Supabase
-            supabase = Config.get_supabase_client()
-            
-            # Exclui usuário do banco de dados
-            response = supabase.table('users').delete().eq('id', user_id).execute()
+            # Exclui usuário do banco de dados (a linha excluída alimenta as estatísticas)
+            with metrics.time_backend('delete_user'):
+                deleted = get_user_repository().delete(user_id)
+            UserService._on_deleted(user_id, deleted)
             
             # Verifica se o usuário foi excluído
-            if not response.data:
+            if not deleted:
                 return False, "Usuário não encontrado"
             
             # Retorna sucesso
@@ -195,5 +673,7 @@ class UserService:
             
         except ValueError:
             return False, "ID de usuário inválido"
+        except BackendUnavailable:
+            raise
         except Exception as e:
             return False, str(e)
\ No newline at end of file
@@ -0,0 +1,280 @@
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from app.models.user_model import USER_DEFAULTS, now_timestamp
+from app.services.user_repository import get_user_repository
+from app.utils.metrics import metrics
+from config.config import Config
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Colunas lidas da tabela na reconciliação
+STATS_COLUMNS = ('id', 'status', 'role', 'created_at', 'last_login')
+
+# Períodos de atividade (em dias, contando hoje) informados na resposta
+ACTIVITY_WINDOWS = {'today': 1, 'last_7_days': 7, 'last_30_days': 30}
+_ACTIVITY_DAYS = max(ACTIVITY_WINDOWS.values())
+
+# O que as estatísticas usam de um usuário: (status, role, dia do cadastro, dia do último login)
+Profile = Tuple[str, str, Optional[str], Optional[str]]
+
+def _day(timestamp: Any) -> Optional[str]:
+    """Dia (AAAA-MM-DD) de um horário ISO"""
+    return str(timestamp)[:10] if timestamp else None
+
+def profile(row: Mapping[str, Any]) -> Profile:
+    """Perfil de uma linha da tabela users"""
+    return (
+        row.get('status') or USER_DEFAULTS['status'],
+        row.get('role') or USER_DEFAULTS['role'],
+        _day(row.get('created_at')),
+        _day(row.get('last_login'))
+    )
+
+class _Counters:
+    """
+    Contadores por status, por papel e por dia de cadastro e de último login
+    Dias anteriores a cutoff não são guardados (ficam fora de todos os períodos)
+    """
+    def __init__(self, cutoff: str):
+        self.cutoff = cutoff
+        self.total = 0
+        self.status: Counter = Counter()
+        self.role: Counter = Counter()
+        self.signups: Counter = Counter()
+        self.logins: Counter = Counter()
+
+    def apply(self, old: Optional[Profile], new: Optional[Profile]) -> None:
+        """Troca o perfil old (None em um cadastro) por new (None em uma exclusão)"""
+        for values, sign in ((old, -1), (new, 1)):
+            if values is None:
+                continue
+            status, role, signup_day, login_day = values
+            self.total += sign
+            self.status[status] += sign
+            self.role[role] += sign
+            if signup_day and signup_day >= self.cutoff:
+                self.signups[signup_day] += sign
+            if login_day and login_day >= self.cutoff:
+                self.logins[login_day] += sign
+
+class UserStats:
+    """
+    Estatísticas de usuários (em memória, por worker) mantidas de forma incremental
+
+    Cadastros, atualizações, exclusões e logins aplicam a diferença entre o perfil anterior
+    e o novo (O(1)); a leitura soma no máximo 30 contadores diários, sem consultar o banco.
+    Uma reconciliação periódica recalcula tudo percorrendo a tabela em páginas e corrige
+    desvios: alterações feitas por outros workers, falhas entre a gravação e o hook e logins
+    repetidos antes de o last_login ser gravado. Alterações feitas durante a reconciliação
+    em linhas já lidas são reaplicadas ao resultado.
+    """
+    def __init__(self, enabled: bool = True, page_size: int = 1000, reconcile_interval: float = 300.0):
+        self.enabled = enabled
+        self.page_size = page_size
+        self.reconcile_interval = reconcile_interval
+        self._counters: Optional[_Counters] = None
+        # Durante uma reconciliação: até qual ID a tabela já foi lida e as alterações a reaplicar
+        self._scan_position: Optional[float] = None
+        self._journal: List[Tuple[Optional[Profile], Optional[Profile]]] = []
+        self._lock = threading.Lock()
+        self._reconcile_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self.reconciled_at: Optional[str] = None
+        self.updated_at: Optional[str] = None
+        self.changes = 0
+        self.reconciles = 0
+        self.last_drift = 0
+        self.last_reconcile_seconds = 0.0
+
+    def record_change(self, user_id: int, old: Optional[Mapping[str, Any]], new: Optional[Mapping[str, Any]]) -> None:
+        """Aplica um cadastro (old=None), atualização ou exclusão (new=None)"""
+        if not self.enabled:
+            return
+        self._apply(int(user_id), profile(old) if old else None, profile(new) if new else None)
+
+    def record_login(self, row: Mapping[str, Any], previous_login: Any) -> None:
+        """Move o usuário para o dia de hoje na contagem de último login"""
+        if not self.enabled:
+            return
+        old = profile({**row, 'last_login': previous_login})
+        self._apply(int(row['id']), old, old[:3] + (date.today().isoformat(),))
+
+    def _apply(self, user_id: int, old: Optional[Profile], new: Optional[Profile]) -> None:
+        if old == new:
+            return
+        with self._lock:
+            if self._counters is not None:
+                self._counters.apply(old, new)
+            if self._scan_position is not None and user_id <= self._scan_position:
+                # A reconciliação em andamento já leu esta linha: a alteração é reaplicada ao resultado
+                self._journal.append((old, new))
+            self.changes += 1
+            self.updated_at = now_timestamp()
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Contagens atuais e o horário da última reconciliação e da última alteração aplicada
+        Retorna None antes da primeira reconciliação
+        """
+        self.start()
+        today = date.today()
+        days = [(today - timedelta(days=offset)).isoformat() for offset in range(_ACTIVITY_DAYS)]
+        with self._lock:
+            counters = self._counters
+            if counters is None:
+                return None
+            return {
+                'total': counters.total,
+                'by_status': {key: count for key, count in counters.status.items() if count > 0},
+                'by_role': {key: count for key, count in counters.role.items() if count > 0},
+                'signups': {
+                    name: sum(counters.signups.get(day, 0) for day in days[:size])
+                    for name, size in ACTIVITY_WINDOWS.items()
+                },
+                'active_users': {
+                    name: sum(counters.logins.get(day, 0) for day in days[:size])
+                    for name, size in ACTIVITY_WINDOWS.items()
+                },
+                'reconciled_at': self.reconciled_at,
+                'updated_at': self.updated_at or self.reconciled_at
+            }
+
+    def reconcile(self) -> int:
+        """
+        Recalcula os contadores percorrendo a tabela em páginas e substitui os atuais
+        Retorna a quantidade de usuários lidos
+        """
+        with self._reconcile_lock:
+            start = time.perf_counter()
+            cutoff = (date.today() - timedelta(days=_ACTIVITY_DAYS - 1)).isoformat()
+            counters = _Counters(cutoff)
+            repository = get_user_repository()
+            after = None
+            with self._lock:
+                self._scan_position = 0
+                self._journal = []
+            try:
+                while True:
+                    page = repository.list_page(self.page_size, after, STATS_COLUMNS)
+                    for row in page:
+                        counters.apply(None, profile(row))
+                    if page:
+                        after = page[-1]['id']
+                    final = len(page) < self.page_size
+                    with self._lock:
+                        # Após a última página, qualquer alteração é posterior à leitura
+                        self._scan_position = math.inf if final else after
+                    if final:
+                        break
+
+                with self._lock:
+                    for old, new in self._journal:
+                        counters.apply(old, new)
+                    if self._counters is not None:
+                        self.last_drift = abs(self._counters.total - counters.total)
+                    self._counters = counters
+                    self.reconciled_at = now_timestamp()
+                    self.reconciles += 1
+            finally:
+                with self._lock:
+                    self._scan_position = None
+                    self._journal = []
+            self.last_reconcile_seconds = time.perf_counter() - start
+            return counters.total
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna o estado da manutenção das estatísticas"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'ready': self._counters is not None,
+                'users': self._counters.total if self._counters is not None else 0,
+                'changes': self.changes,
+                'reconciles': self.reconciles,
+                'last_drift': self.last_drift,
+                'last_reconcile_seconds': self.last_reconcile_seconds
+            }
+
+    def start(self) -> None:
+        """Inicia a reconciliação periódica em segundo plano (uma vez por processo, seguro após fork)"""
+        pid = os.getpid()
+        if not self.enabled or self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            self._wakeup = threading.Event()
+            self._thread = threading.Thread(target=self._run, name='user-stats', daemon=True)
+            self._thread.start()
+
+    def reset_after_fork(self) -> None:
+        """
+        Recria no processo filho os locks e as threads e inicia a reconciliação do worker
+        O master não reconcilia (create_app não inicia threads): cada worker lê a tabela
+        inteira ao iniciar e /api/users/stats responde 503 até a primeira reconciliação
+        """
+        self._lock = threading.Lock()
+        self._reconcile_lock = threading.Lock()
+        self._scan_position = None
+        self._journal = []
+        self._thread = None
+        self._pid = None
+        self.changes = 0
+        self.start()
+
+    def reset(self) -> None:
+        """Descarta os contadores (recalculados na próxima reconciliação)"""
+        with self._lock:
+            self._counters = None
+            self._pid = None
+            self._wakeup.set()
+            self.reconciled_at = None
+            self.updated_at = None
+            self.changes = 0
+            self.reconciles = 0
+            self.last_drift = 0
+
+    def _run(self) -> None:
+        pid = os.getpid()
+        wakeup = self._wakeup
+        while self.enabled and self._pid == pid:
+            try:
+                total = self.reconcile()
+                logger.info(f"Estatísticas de usuários reconciliadas: {total} usuários em {self.last_reconcile_seconds:.2f}s")
+            except Exception as e:
+                logger.warning(f"Erro ao reconciliar as estatísticas de usuários: {e}")
+            if wakeup.wait(self.reconcile_interval):
+                return
+
+# Estatísticas de usuários do processo
+user_stats = UserStats(
+    enabled=Config.USER_STATS_ENABLED,
+    page_size=Config.USER_STATS_PAGE_SIZE,
+    reconcile_interval=Config.USER_STATS_RECONCILE_INTERVAL
+)
+
+def init_user_stats(app) -> None:
+    """
+    Ativa as estatísticas conforme a configuração da aplicação
+    A reconciliação periódica começa na primeira requisição do processo
+    """
+    user_stats.enabled = app.config.get('USER_STATS_ENABLED', True)
+
+    @app.before_request
+    def _start_user_stats():
+        user_stats.start()
+
+# Expõe o estado das estatísticas em /api/metrics
+metrics.register_collector(lambda: {
+    f'user_stats_{name}': float(value) for name, value in user_stats.stats().items()
+})
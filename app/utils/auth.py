@@ -1,14 +1,21 @@
 from datetime import datetime, timedelta
+from collections import OrderedDict
+import hashlib
+import threading
+import time
 import pytz
-import jwt
 from functools import wraps
 from flask import request, jsonify, current_app
 from typing import Callable, Dict, Any, Optional
+from config.config import Config
 
 def generate_token(user_data: Dict[str, Any], secret_key: str, expiry_hours: int = 1) -> str:
     """
     Gera um token JWT para o usuário
     """
+    # PyJWT (e cryptography) só é importado no primeiro uso
+    import jwt
+    
     payload = {
         'exp': datetime.now(pytz.UTC) + timedelta(hours=expiry_hours),
         'iat': datetime.now(pytz.UTC),
@@ -22,6 +29,8 @@ def decode_token(token: str, secret_key: str) -> Dict[str, Any]:
     """
     Decodifica um token JWT
     """
+    import jwt
+    
     try:
         decoded = jwt.decode(token, secret_key, algorithms=['HS256'])
         return decoded
@@ -32,32 +41,84 @@ def decode_token(token: str, secret_key: str) -> Dict[str, Any]:
     except Exception as e:
         raise Exception(f'Erro ao processar token: {str(e)}')
 
+# Cache de payloads já verificados, indexado pelo hash do token
+_token_cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+def verify_token(token: str, secret_key: str) -> Dict[str, Any]:
+    """
+    Verifica um token JWT reaproveitando payloads já validados
+    A entrada expira junto com o próprio token (campo exp)
+    """
+    digest = hashlib.sha256(f'{secret_key}:{token}'.encode()).hexdigest()
+    now = time.time()
+    
+    with _token_cache_lock:
+        payload = _token_cache.get(digest)
+        if payload is not None:
+            if payload['exp'] > now:
+                _token_cache.move_to_end(digest)
+                return payload
+            del _token_cache[digest]
+            raise Exception('Token expirado. Por favor, faça login novamente.')
+    
+    payload = decode_token(token, secret_key)
+    
+    if Config.TOKEN_CACHE_MAX_SIZE > 0 and 'exp' in payload:
+        with _token_cache_lock:
+            _token_cache[digest] = payload
+            while len(_token_cache) > Config.TOKEN_CACHE_MAX_SIZE:
+                _token_cache.popitem(last=False)
+    
+    return payload
+
+def clear_token_cache() -> None:
+    """Esvazia o cache de tokens verificados"""
+    with _token_cache_lock:
+        _token_cache.clear()
+
+def _authenticate_request(admin: bool = False):
+    """
+    Extrai e verifica o token do cabeçalho Authorization
+    Retorna None em caso de sucesso ou a resposta de erro
+    """
+    token = None
+    auth_header = request.headers.get('Authorization')
+    
+    if auth_header and auth_header.startswith('Bearer '):
+        token = auth_header.split(' ')[1]
+    
+    if not token:
+        return jsonify({'message': 'Token não fornecido!'}), 401
+    
+    try:
+        secret_key = current_app.config['SECRET_KEY']
+        payload = verify_token(token, secret_key)
+        user_id = payload['sub']
+        role = payload['role']
+    except KeyError:
+        # Assinatura válida, mas sem as claims que a API emite
+        return jsonify({'message': 'Token inválido. Por favor, faça login novamente.'}), 401
+    except Exception as e:
+        return jsonify({'message': str(e)}), 401
+    
+    if admin and role != 'admin':
+        return jsonify({'message': 'Privilégios de administrador necessários!'}), 403
+    
+    request.user_id = user_id
+    request.user_role = role
+    return None
+
 def token_required(f: Callable) -> Callable:
     """
     Decorador para exigir autenticação de token
     """
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        # Verifica se o token está no cabeçalho
-        auth_header = request.headers.get('Authorization')
-        
-        if auth_header:
-            if (auth_header.startswith('Bearer ')):
-                token = auth_header.split(' ')[1]
+        error = _authenticate_request()
+        if error:
+            return error
         
-        if not token:
-            return jsonify({'message': 'Token não fornecido!'}), 401
-        
-        try:
-            # Decodifica o token
-            secret_key = current_app.config['SECRET_KEY']
-            payload = decode_token(token, secret_key)
-            request.user_id = payload['sub']
-            request.user_role = payload['role']
-        except Exception as e:
-            return jsonify({'message': str(e)}), 401
-            
         return f(*args, **kwargs)
     
     return decorated
@@ -68,26 +129,10 @@ def admin_required(f: Callable) -> Callable:
     """
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        auth_header = request.headers.get('Authorization')
-        
-        if auth_header and auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
-        
-        if not token:
-            return jsonify({'message': 'Token não fornecido!'}), 401
+        error = _authenticate_request(admin=True)
+        if error:
+            return error
         
-        try:
-            secret_key = current_app.config['SECRET_KEY']
-            payload = decode_token(token, secret_key)
-            if payload['role'] != 'admin':
-                return jsonify({'message': 'Privilégios de administrador necessários!'}), 403
-            
-            request.user_id = payload['sub']
-            request.user_role = payload['role']
-        except Exception as e:
-            return jsonify({'message': str(e)}), 401
-            
         return f(*args, **kwargs)
     
     return decorated
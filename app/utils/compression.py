@@ -0,0 +1,115 @@
+import zlib
+from typing import Iterable, Iterator, Optional
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele apenas gzip é negociado
+    brotli = None
+
+# Tipos de conteúdo que valem a pena comprimir
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html'
+}
+
+# Sufixo adicionado ao ETag de cada representação comprimida
+ETAG_SUFFIXES = {'gzip': '-gzip', 'br': '-br'}
+
+class _Compressor:
+    """Compressor incremental para gzip ou brotli"""
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        # Esvazia o buffer sem encerrar o fluxo (para streaming)
+        if self.encoding == 'br':
+            return self._compressor.flush()
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+def compress_bytes(data: bytes, encoding: str, level: int) -> bytes:
+    """Comprime um corpo completo"""
+    compressor = _Compressor(encoding, level)
+    return compressor.compress(data) + compressor.finish()
+
+def _compress_stream(chunks: Iterable[bytes], compressor: _Compressor, flush_bytes: int) -> Iterator[bytes]:
+    """Comprime um corpo em streaming, liberando dados a cada flush_bytes de entrada"""
+    pending = 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        output = compressor.compress(chunk)
+        pending += len(chunk)
+        if pending >= flush_bytes:
+            output += compressor.flush()
+            pending = 0
+        if output:
+            yield output
+    yield compressor.finish()
+
+def negotiate_encoding(accept_encodings) -> Optional[str]:
+    """Escolhe a codificação aceita pelo cliente (brotli tem preferência quando disponível)"""
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best = accept_encodings.best_match(offered)
+    if best and accept_encodings[best] > 0:
+        return best
+    return None
+
+def init_compression(app) -> None:
+    """
+    Registra a compressão negociada (gzip/brotli) das respostas grandes
+    """
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 6)
+    brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+    flush_bytes = app.config.get('COMPRESS_STREAM_FLUSH_BYTES', 65536)
+
+    @app.after_request
+    def _compress_response(response):
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        # Respostas pequenas não compensam o custo de CPU
+        if not response.is_streamed and response.content_length is not None and response.content_length < min_size:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        level = brotli_quality if encoding == 'br' else gzip_level
+        if response.is_streamed:
+            compressor = _Compressor(encoding, level)
+            response.response = _compress_stream(response.response, compressor, flush_bytes)
+            response.headers.pop('Content-Length', None)
+        else:
+            response.set_data(compress_bytes(response.get_data(), encoding, level))
+
+        response.headers['Content-Encoding'] = encoding
+
+        # Cada representação comprimida tem seu próprio ETag forte
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag + ETAG_SUFFIXES[encoding])
+
+        return response
@@ -0,0 +1,46 @@
+import base64
+import binascii
+from typing import Tuple
+
+# Modos do cursor da busca: posição no resultado do índice em memória ou último ID lido no banco
+SEARCH_CURSOR_INDEX = 'i'
+SEARCH_CURSOR_KEYSET = 'k'
+
+def _encode(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip('=')
+
+def _decode(cursor: str) -> str:
+    return base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+
+def encode_cursor(timestamp: str, user_id: int) -> str:
+    """Cursor opaco do feed de alterações a partir do horário e do ID da última alteração lida"""
+    return _encode(f'{timestamp}|{int(user_id)}')
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Horário e ID de um cursor gerado por encode_cursor
+    Lança ValueError se o cursor for inválido
+    """
+    try:
+        timestamp, user_id = _decode(cursor).rsplit('|', 1)
+        return timestamp, int(user_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Cursor inválido: {cursor}")
+
+def encode_search_cursor(mode: str, position: int) -> str:
+    """Cursor opaco da busca: o modo que gerou a página e a posição (offset ou último ID)"""
+    return _encode(f'{mode}:{int(position)}')
+
+def decode_search_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Modo e posição de um cursor gerado por encode_search_cursor
+    Lança ValueError se o cursor for inválido
+    """
+    try:
+        mode, position = _decode(cursor).split(':', 1)
+        position = int(position)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Cursor inválido: {cursor}")
+    if mode not in (SEARCH_CURSOR_INDEX, SEARCH_CURSOR_KEYSET) or position < 0:
+        raise ValueError(f"Cursor inválido: {cursor}")
+    return mode, position
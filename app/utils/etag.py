@@ -0,0 +1,34 @@
+import hashlib
+from typing import Any, Iterable, Optional
+from flask import Response, request
+
+def user_etag(user_id: Any, updated_at: Any, last_login: Any = None) -> str:
+    """
+    Gera o ETag forte de um usuário a partir do ID e da versão (updated_at)
+    last_login entra no cálculo porque também faz parte da resposta
+    """
+    version = hashlib.sha1(f'{updated_at}|{last_login}'.encode()).hexdigest()[:16]
+    return f'u{user_id}-{version}'
+
+def list_etag(versions: Iterable[str], *extra: Any) -> str:
+    """Gera o ETag de uma listagem a partir dos ETags das linhas e dos parâmetros da página"""
+    digest = hashlib.sha1()
+    for value in extra:
+        digest.update(f'{value}|'.encode())
+    for version in versions:
+        digest.update(version.encode())
+        digest.update(b',')
+    return f'l-{digest.hexdigest()[:24]}'
+
+def not_modified(etag: Optional[str]) -> Optional[Response]:
+    """Retorna uma resposta 304 se o If-None-Match da requisição contém o ETag"""
+    if etag is None:
+        return None
+    
+    # Aceita também os ETags das representações comprimidas (sufixos -gzip e -br)
+    candidates = (etag, f'{etag}-gzip', f'{etag}-br')
+    if not any(request.if_none_match.contains(candidate) for candidate in candidates):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
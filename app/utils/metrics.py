@@ -0,0 +1,324 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from flask import Response, g, request
+from config.config import Config
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Tipo e descrição de cada métrica exposta
+METRICS_HELP = {
+    'http_requests_total': ('counter', 'Total de requisições HTTP por endpoint, método e status'),
+    'http_request_duration_seconds': ('histogram', 'Latência das requisições HTTP por endpoint e método'),
+    'http_requests_in_flight': ('gauge', 'Requisições HTTP em andamento'),
+    'backend_call_duration_seconds': ('histogram', 'Latência das chamadas ao banco por método do UserService'),
+    'backend_call_errors_total': ('counter', 'Chamadas ao banco que falharam por método do UserService'),
+    'user_updates_total': ('counter', 'Atualizações de usuário gravadas ou descartadas por não alterarem nada')
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class MetricsRegistry:
+    """
+    Registro de métricas (contadores, gauges e histogramas) do processo
+    Cada operação é um incremento sob lock, barato o suficiente para produção
+    """
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._gauges: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        self._collectors: List[Callable[[], Dict[str, float]]] = []
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1.0) -> None:
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def add_gauge(self, name: str, labels: Labels = (), value: float = 1.0) -> None:
+        key = (name, labels)
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        # Layout: [contagem por bucket..., +Inf, soma]
+        key = (name, labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0.0] * (len(self.buckets) + 2)
+            histogram[index] += 1
+            histogram[-1] += value
+
+    def register_collector(self, collector: Callable[[], Dict[str, float]]) -> None:
+        """Registra uma função que retorna gauges calculados na hora da coleta"""
+        self._collectors.append(collector)
+
+    @contextmanager
+    def time_backend(self, method: str) -> Iterator[None]:
+        """Mede a duração de uma chamada ao banco feita por um método do UserService"""
+        labels = (('method', method),)
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc('backend_call_errors_total', labels)
+            raise
+        finally:
+            self.observe('backend_call_duration_seconds', labels, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retorna uma cópia serializável das métricas do processo"""
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'buckets': list(self.buckets),
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'gauges': [[name, list(labels), value] for (name, labels), value in self._gauges.items()],
+                'histograms': [[name, list(labels), list(values)] for (name, labels), values in self._histograms.items()]
+            }
+
+    def collect(self) -> Dict[str, float]:
+        """Executa os coletores registrados"""
+        values = {}
+        for collector in self._collectors:
+            try:
+                values.update(collector())
+            except Exception:
+                continue
+        return values
+
+    def reset_after_fork(self) -> None:
+        """Começa o processo filho com um lock novo e sem as métricas do processo pai"""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+def merge_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Soma os snapshots de vários workers em uma única visão
+    Gauges de processos que não existem mais são descartados; os valores dos coletores
+    (estado de cada worker, sem soma que faça sentido) ficam separados pelo rótulo pid
+    """
+    counters: Dict[Tuple[str, Labels], float] = {}
+    gauges: Dict[Tuple[str, Labels], float] = {}
+    collected: Dict[Tuple[str, Labels], float] = {}
+    histograms: Dict[Tuple[str, Labels], List[float]] = {}
+    buckets = list(DEFAULT_BUCKETS)
+
+    for snapshot in snapshots:
+        buckets = snapshot['buckets']
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(tuple(label) for label in labels))
+            counters[key] = counters.get(key, 0.0) + value
+        if _process_alive(snapshot['pid']):
+            for name, labels, value in snapshot['gauges']:
+                key = (name, tuple(tuple(label) for label in labels))
+                gauges[key] = gauges.get(key, 0.0) + value
+            for name, value in snapshot.get('collected', {}).items():
+                collected[(name, (('pid', str(snapshot['pid'])),))] = value
+        for name, labels, values in snapshot['histograms']:
+            key = (name, tuple(tuple(label) for label in labels))
+            merged = histograms.setdefault(key, [0.0] * len(values))
+            for index, value in enumerate(values):
+                merged[index] += value
+
+    return {'buckets': buckets, 'counters': counters, 'gauges': gauges, 'collected': collected, 'histograms': histograms}
+
+def render_prometheus(merged: Dict[str, Any], extra_gauges: Optional[Dict[str, float]] = None) -> str:
+    """Converte métricas agregadas para o formato texto do Prometheus"""
+    lines: List[str] = []
+    declared = set()
+
+    def declare(name: str) -> None:
+        if name in declared:
+            return
+        declared.add(name)
+        kind, description = METRICS_HELP.get(name, ('gauge', name))
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    for (name, labels), value in sorted(merged['counters'].items()):
+        declare(name)
+        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+    for (name, labels), value in sorted(merged['gauges'].items()):
+        declare(name)
+        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+    for (name, labels), value in sorted(merged.get('collected', {}).items()):
+        declare(name)
+        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+    for name, value in sorted((extra_gauges or {}).items()):
+        declare(name)
+        lines.append(f'{name} {_format_value(value)}')
+
+    buckets = merged['buckets']
+    for (name, labels), values in sorted(merged['histograms'].items()):
+        declare(name)
+        cumulative = 0.0
+        for bound, count in zip(list(buckets) + ['+Inf'], values[:-1]):
+            cumulative += count
+            bucket_labels = labels + (('le', str(bound)),)
+            lines.append(f'{name}_bucket{_format_labels(bucket_labels)} {_format_value(cumulative)}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {values[-1]}')
+        lines.append(f'{name}_count{_format_labels(labels)} {_format_value(cumulative)}')
+
+    return '\n'.join(lines) + '\n'
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+def _process_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+class MultiprocessExporter:
+    """
+    Grava periodicamente o snapshot do worker em um diretório compartilhado
+    para que qualquer worker do gunicorn responda com a visão agregada
+    O snapshot gravado inclui os valores dos coletores registrados (campo collected)
+    """
+    def __init__(self, registry: MetricsRegistry, directory: Optional[str], interval: float = 5.0):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Inicia a thread de gravação do processo atual (idempotente, seguro após fork)"""
+        if not self.directory:
+            return
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name='metrics-exporter', daemon=True)
+            self._thread.start()
+
+    def reset_after_fork(self) -> None:
+        """Descarta no processo filho a thread herdada (reiniciada na primeira requisição)"""
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def write(self) -> None:
+        """Grava o snapshot do processo atual de forma atômica"""
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f'metrics_{os.getpid()}.json')
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(self._snapshot(), f)
+        os.replace(temporary, path)
+
+    def snapshots(self) -> List[Dict[str, Any]]:
+        """Lê os snapshots de todos os workers (o do processo atual é lido da memória)"""
+        if not self.directory:
+            return [self.registry.snapshot()]
+        snapshots = [self._snapshot()]
+        own = os.path.join(self.directory, f'metrics_{os.getpid()}.json')
+        for path in glob.glob(os.path.join(self.directory, 'metrics_*.json')):
+            if path == own:
+                continue
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def _snapshot(self) -> Dict[str, Any]:
+        snapshot = self.registry.snapshot()
+        snapshot['collected'] = self.registry.collect()
+        return snapshot
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.write()
+            except OSError:
+                continue
+
+# Registro de métricas do processo
+metrics = MetricsRegistry()
+
+# Exportação para o diretório compartilhado entre workers (desativada sem METRICS_MULTIPROC_DIR)
+exporter = MultiprocessExporter(metrics, Config.METRICS_MULTIPROC_DIR, Config.METRICS_FLUSH_INTERVAL)
+atexit.register(exporter.write)
+
+def init_metrics(app) -> None:
+    """
+    Registra os hooks de instrumentação e a rota /api/metrics na aplicação
+    """
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    @app.before_request
+    def _start_request_timer():
+        exporter.start()
+        g._metrics_start = time.perf_counter()
+        metrics.add_gauge('http_requests_in_flight')
+
+    @app.after_request
+    def _record_status(response):
+        g._metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _record_request(error=None):
+        start = g.pop('_metrics_start', None)
+        if start is None:
+            return
+        metrics.add_gauge('http_requests_in_flight', value=-1)
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        status = g.pop('_metrics_status', 500)
+        metrics.inc('http_requests_total', (('endpoint', endpoint), ('method', request.method), ('status', str(status))))
+        metrics.observe('http_request_duration_seconds', (('endpoint', endpoint), ('method', request.method)),
+                        time.perf_counter() - start)
+
+    @app.route('/api/metrics')
+    def prometheus_metrics():
+        merged = merge_snapshots(exporter.snapshots())
+        # Com vários workers os coletores vêm dos snapshots, um valor por pid
+        extra_gauges = None if exporter.directory else metrics.collect()
+        return Response(render_prometheus(merged, extra_gauges),
+                        mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,5 @@
+from app.asgi import create_asgi_app
+from config.config import app_config
+
+# Cria a aplicação ASGI (uvicorn asgi:application)
+application = create_asgi_app(app_config)
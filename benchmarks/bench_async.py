@@ -0,0 +1,120 @@
+"""
+Modo WSGI com threads x modo ASGI sob concorrência
+
+Simula um banco com latência fixa e mede GET /api/users/<id> (sem cache) com
+N requisições simultâneas:
+  - wsgi: aplicação Flask atendida por um pool de threads (como um worker gthread do gunicorn)
+  - asgi: create_asgi_app com o repositório assíncrono, tudo em um único event loop
+
+Para comparar com servidores reais:
+    gunicorn -w 1 --threads 8 wsgi:app
+    uvicorn asgi:application --workers 1
+
+Uso: python benchmarks/bench_async.py [--latency 0.02] [--threads 8] [--requests 400]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.asgi import create_asgi_app
+from app.services.async_user_repository import set_async_user_repository
+from app.services.user_cache import user_cache
+from app.services.user_repository import set_user_repository
+from benchmarks.bench_hot_paths import make_row, percentile
+from benchmarks.fake_repository import AsyncSlowUserRepository, SlowUserRepository
+from config.config import config_by_name
+
+SEED_USERS = 100
+
+def summarize(samples, elapsed):
+    samples.sort()
+    return {
+        'req_per_sec': len(samples) / elapsed,
+        'p50_ms': percentile(samples, 0.50) * 1e3,
+        'p99_ms': percentile(samples, 0.99) * 1e3
+    }
+
+def run_wsgi(repository, total, concurrency, threads):
+    """Requisições concorrentes atendidas por um pool de threads limitado"""
+    app = create_app(config_by_name['testing'])
+    set_user_repository(repository)
+    client = app.test_client()
+    pool = ThreadPoolExecutor(max_workers=threads)
+
+    def request(i):
+        client.get(f'/api/users/{i % SEED_USERS + 1}')
+        return time.perf_counter()
+
+    # Os clientes disparam em ondas de `concurrency`; a latência inclui a espera por uma thread livre
+    samples = []
+    start = time.perf_counter()
+    for offset in range(0, total, concurrency):
+        wave_start = time.perf_counter()
+        futures = [pool.submit(request, i) for i in range(offset, min(total, offset + concurrency))]
+        samples += [future.result() - wave_start for future in futures]
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+    return summarize(samples, elapsed)
+
+async def run_asgi(repository, latency, total, concurrency):
+    """Requisições concorrentes atendidas pelo event loop"""
+    application = create_asgi_app(config_by_name['testing'])
+    set_user_repository(repository)
+    set_async_user_repository(AsyncSlowUserRepository(repository, latency))
+
+    async with httpx.AsyncClient(app=application, base_url='http://bench') as client:
+        async def request(i):
+            await client.get(f'/api/users/{i % SEED_USERS + 1}')
+            return time.perf_counter()
+
+        samples = []
+        start = time.perf_counter()
+        for offset in range(0, total, concurrency):
+            wave_start = time.perf_counter()
+            finished = await asyncio.gather(*[
+                request(i) for i in range(offset, min(total, offset + concurrency))
+            ])
+            samples += [end - wave_start for end in finished]
+        elapsed = time.perf_counter() - start
+
+    set_async_user_repository(None)
+    return summarize(samples, elapsed)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='WSGI com threads x ASGI sob concorrência')
+    parser.add_argument('--latency', type=float, default=0.02, help='latência simulada do banco (s)')
+    parser.add_argument('--threads', type=int, default=8, help='threads do worker WSGI')
+    parser.add_argument('--requests', type=int, default=400, help='requisições por rodada')
+    parser.add_argument('--concurrency', default='1,8,32,128', help='níveis de concorrência')
+    args = parser.parse_args()
+
+    repository = SlowUserRepository(args.latency)
+    for i in range(SEED_USERS):
+        repository.insert(make_row(i))
+
+    # Mede o caminho até o banco, não o cache
+    user_cache.max_size = 0
+
+    print(f'latência do banco: {args.latency * 1e3:.0f} ms, threads WSGI: {args.threads}')
+    print(f"{'concorrência':>12} {'modo':>6} {'req/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for concurrency in (int(value) for value in args.concurrency.split(',')):
+        results = {
+            'wsgi': run_wsgi(repository, args.requests, concurrency, args.threads),
+            'asgi': asyncio.run(run_asgi(repository, args.latency, args.requests, concurrency))
+        }
+        for mode, result in results.items():
+            print(f"{concurrency:>12} {mode:>6} {result['req_per_sec']:>10,.0f} "
+                  f"{result['p50_ms']:>10.1f} {result['p99_ms']:>10.1f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
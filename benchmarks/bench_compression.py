@@ -0,0 +1,63 @@
+"""
+Custo de CPU x bytes economizados na compressão de listagens de usuários
+
+Uso: python benchmarks/bench_compression.py
+"""
+import json
+import os
+import sys
+import time
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.user_model import UserBatch
+from app.utils.compression import brotli, compress_bytes
+
+def make_rows(count):
+    """Gera linhas parecidas com as da tabela users"""
+    return [{
+        'id': i,
+        'email': f'usuario.{i}@example.com.br',
+        'full_name': f'Usuário de Teste Número {i}',
+        'cpf': f'{(i * 7919) % 10 ** 11:011d}',
+        'birth_date': f'19{60 + i % 40}-{1 + i % 12:02d}-{1 + i % 28:02d}',
+        'status': 'active' if i % 10 else 'inactive',
+        'role': 'user' if i % 50 else 'admin',
+        'last_login': f'2024-0{1 + i % 9}-1{i % 10}T10:{i % 60:02d}:00',
+        'created_at': '2023-10-10T10:10:10.123456+00:00',
+        'updated_at': f'2024-01-{1 + i % 28:02d}T08:00:00.000000+00:00'
+    } for i in range(1, count + 1)]
+
+def payload(count):
+    """Corpo JSON como o de GET /api/users/"""
+    users = UserBatch.from_rows(make_rows(count)).to_response_dicts()
+    body = {'message': 'Usuários recuperados com sucesso', 'users': users, 'next_cursor': None}
+    return json.dumps(body, separators=(',', ':'), ensure_ascii=False).encode()
+
+def measure(data, encoding, level, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        compressed = compress_bytes(data, encoding, level)
+    elapsed = (time.process_time() - start) / repeat
+    return len(compressed), elapsed
+
+def main():
+    variants = [('gzip', 1), ('gzip', 6), ('gzip', 9)]
+    if brotli is not None:
+        variants += [('br', 1), ('br', 4), ('br', 11)]
+    else:
+        print('pacote brotli não instalado: apenas gzip\n')
+
+    print(f"{'usuários':>9} {'codificação':>12} {'original':>11} {'comprimido':>11} {'taxa':>7} {'CPU (ms)':>9} {'MB/s':>8}")
+    for count in (50, 500, 5000):
+        data = payload(count)
+        repeat = max(3, 2000 // count)
+        for encoding, level in variants:
+            size, elapsed = measure(data, encoding, level, repeat)
+            throughput = len(data) / elapsed / 1e6 if elapsed else float('inf')
+            print(f"{count:>9} {f'{encoding}-{level}':>12} {len(data):>11,} {size:>11,} "
+                  f"{size / len(data):>7.1%} {elapsed * 1000:>9.2f} {throughput:>8.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Comparação de carga dos perfis do gunicorn (config/gunicorn_conf.py)
+
+Sobe o gunicorn de verdade para cada perfil, com o banco SQLite local e latência
+injetada (FAULT_INJECTION_LATENCY) no lugar do Supabase, e mede GET /api/users/<id>
+sem cache com N conexões simultâneas durante alguns segundos:
+  - req/s e latência p50/p99 vistas pelo cliente
+  - memória total (PSS, que divide as páginas compartilhadas copy-on-write) do master e workers
+
+Uso:
+    python benchmarks/bench_gunicorn.py [--profiles io cpu asgi] [--latency 0.02]
+                                        [--concurrency 64] [--duration 10] [--no-preload]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from app.services.sqlite_user_repository import SqliteUserRepository
+from benchmarks.bench_hot_paths import make_row, percentile
+
+SEED_USERS = 1000
+
+def process_tree(pid):
+    """PID do master e dos workers"""
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+    return pids
+
+def memory_mb(pids):
+    """Soma do PSS (ou RSS, se indisponível) dos processos, em MB"""
+    total = 0
+    for pid in pids:
+        for path, field in ((f'/proc/{pid}/smaps_rollup', 'Pss:'), (f'/proc/{pid}/status', 'VmRSS:')):
+            try:
+                with open(path) as f:
+                    values = [line.split()[1] for line in f if line.startswith(field)]
+            except OSError:
+                continue
+            if values:
+                total += int(values[0])
+                break
+    return total / 1024
+
+async def load(base_url, concurrency, duration):
+    """Mantém concurrency requisições em andamento por duration segundos"""
+    samples = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+
+        async def run(worker):
+            nonlocal errors
+            user_id = worker % SEED_USERS + 1
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(f'/api/users/{user_id}')
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    # Ex.: conexão encerrada na reciclagem de um worker (max_requests)
+                    ok = False
+                if not ok:
+                    errors += 1
+                samples.append(time.perf_counter() - start)
+                user_id = user_id % SEED_USERS + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run(worker) for worker in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    samples.sort()
+    return {
+        'rps': len(samples) / elapsed,
+        'p50_ms': percentile(samples, 0.5) * 1e3,
+        'p99_ms': percentile(samples, 0.99) * 1e3,
+        'errors': errors
+    }
+
+def wait_ready(base_url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f'{base_url}/api/health').status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError('gunicorn não respondeu a /api/health')
+
+def run_profile(profile, args, database, port):
+    base_url = f'http://127.0.0.1:{port}'
+    env = {
+        **os.environ,
+        'FLASK_ENV': 'local',
+        'SQLITE_DATABASE_PATH': database,
+        'FAULT_INJECTION_ENABLED': 'true',
+        'FAULT_INJECTION_LATENCY': str(args.latency),
+        'USER_CACHE_MAX_SIZE': '0',
+        'SINGLE_FLIGHT_ENABLED': 'false',
+        'GUNICORN_PROFILE': profile,
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'GUNICORN_PRELOAD': 'false' if args.no_preload else 'true',
+        'GUNICORN_ACCESS_LOG': ''
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'config', 'gunicorn_conf.py')],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(base_url)
+        asyncio.run(load(base_url, args.concurrency, 1.0))
+        result = asyncio.run(load(base_url, args.concurrency, args.duration))
+        pids = process_tree(server.pid)
+        result['workers'] = len(pids) - 1
+        result['memory_mb'] = memory_mb(pids)
+        return result
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Comparação de carga dos perfis do gunicorn')
+    parser.add_argument('--profiles', nargs='+', default=['io', 'cpu', 'asgi'])
+    parser.add_argument('--latency', type=float, default=0.02, help='latência simulada do banco (s)')
+    parser.add_argument('--concurrency', type=int, default=64, help='requisições simultâneas')
+    parser.add_argument('--duration', type=float, default=10.0, help='duração da medição (s)')
+    parser.add_argument('--no-preload', action='store_true', help='desativa o preload da aplicação')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        database = os.path.join(directory, 'users.db')
+        SqliteUserRepository(database).insert_many([{**make_row(i), 'cpf': f'{i:011d}'} for i in range(SEED_USERS)])
+
+        print(f'CPUs: {os.cpu_count()}, latência do banco: {args.latency * 1e3:.0f} ms, '
+              f'{args.concurrency} conexões, preload: {"não" if args.no_preload else "sim"}')
+        print(f"{'perfil':<8} {'workers':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'memória MB':>11} {'erros':>6}")
+        for index, profile in enumerate(args.profiles):
+            # Uma porta por perfil: a anterior pode continuar ocupada enquanto o master encerra
+            result = run_profile(profile, args, database, args.port + index)
+            print(f"{profile:<8} {result['workers']:>7} {result['rps']:>8.0f} {result['p50_ms']:>8.1f} "
+                  f"{result['p99_ms']:>8.1f} {result['memory_mb']:>11.1f} {result['errors']:>6}")
+    finally:
+        shutil.rmtree(directory)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Microbenchmarks dos caminhos críticos da API
+
+Mede validações, geração/decodificação de token, serialização de User e
+requisições completas pelo test client do Flask contra um repositório em memória.
+Reporta ops/s, p50 e p99, salva o resultado em JSON e compara com um baseline.
+
+Uso:
+    python benchmarks/bench_hot_paths.py                        # roda e compara com benchmarks/baseline.json
+    python benchmarks/bench_hot_paths.py --save-baseline        # regrava o baseline
+    python benchmarks/bench_hot_paths.py --filter route --output bench.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable, Dict, List
+
+# Adiciona o diretório raiz ao path para importações
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from app import create_app
+from app.models.user_model import User, UserBatch
+from app.services.user_cache import user_cache
+from app.services.user_repository import set_user_repository
+from app.utils.auth import generate_token, decode_token, verify_token, validate_cpf, validate_birth_date
+from benchmarks.fake_repository import InMemoryUserRepository
+from config.config import config_by_name
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+SECRET_KEY = 'chave-de-benchmark-com-tamanho-suficiente'
+SEED_USERS = 1000
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Percentil por posição em uma lista já ordenada"""
+    index = min(len(samples) - 1, int(round(fraction * (len(samples) - 1))))
+    return samples[index]
+
+def run_case(fn: Callable[[], object], duration: float, warmup: int = 50) -> Dict[str, float]:
+    """Executa fn repetidamente por duration segundos e mede cada chamada"""
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    clock = time.perf_counter
+    deadline = clock() + duration
+    while True:
+        start = clock()
+        fn()
+        end = clock()
+        samples.append(end - start)
+        if end >= deadline:
+            break
+
+    total = sum(samples)
+    samples.sort()
+    return {
+        'iterations': len(samples),
+        'ops_per_sec': len(samples) / total if total else 0.0,
+        'p50_us': percentile(samples, 0.50) * 1e6,
+        'p99_us': percentile(samples, 0.99) * 1e6
+    }
+
+def make_row(i: int) -> Dict[str, str]:
+    return {
+        'email': f'usuario{i}@example.com',
+        'full_name': f'Usuário {i}',
+        'cpf': '52998224725',
+        'birth_date': '1990-01-01'
+    }
+
+def build_cases() -> Dict[str, Callable[[], object]]:
+    """Monta os casos medidos (funções puras e rotas do user_bp)"""
+    config = config_by_name['testing']
+    app = create_app(config)
+    app.config['SECRET_KEY'] = SECRET_KEY
+
+    # Repositório em memória com usuários pré-carregados
+    repository = InMemoryUserRepository()
+    set_user_repository(repository)
+    for i in range(SEED_USERS):
+        repository.insert(make_row(i))
+
+    client = app.test_client()
+    admin_token = generate_token({'id': 1, 'cpf': '52998224725', 'role': 'admin'}, SECRET_KEY)
+    admin_headers = {'Authorization': f'Bearer {admin_token}'}
+    user_token = generate_token({'id': 2, 'cpf': '52998224725', 'role': 'user'}, SECRET_KEY)
+    row = repository.get_by_id(1)
+    rows = [repository.get_by_id(i) for i in range(1, 101)]
+    user = User.from_dict(row)
+    counter = itertools.count(SEED_USERS)
+
+    def register():
+        client.post('/api/users/register', json=make_row(next(counter)))
+
+    def register_bulk():
+        start = next(counter) * 100
+        client.post('/api/users/register/bulk', json={'users': [make_row(start + i) for i in range(100)]},
+                    headers=admin_headers)
+
+    def delete_user():
+        # Cria diretamente no repositório o usuário a ser excluído
+        user_id = repository.insert(make_row(next(counter)))['id']
+        client.delete(f'/api/users/{user_id}')
+
+    def get_user_uncached():
+        user_cache.invalidate(1)
+        client.get('/api/users/1')
+
+    return {
+        'validate_cpf': lambda: validate_cpf('529.982.247-25'),
+        'validate_birth_date': lambda: validate_birth_date('1990-01-01'),
+        'generate_token': lambda: generate_token(row, SECRET_KEY),
+        'decode_token': lambda: decode_token(user_token, SECRET_KEY),
+        'verify_token (cache)': lambda: verify_token(user_token, SECRET_KEY),
+        'User.from_dict': lambda: User.from_dict(row),
+        'User.to_response_dict': user.to_response_dict,
+        'UserBatch 100 linhas': lambda: UserBatch.from_rows(rows).to_response_dicts(),
+        'route POST /register': register,
+        'route POST /register/bulk (100)': register_bulk,
+        'route POST /login': lambda: client.post('/api/users/login', json={
+            'username': 'usuario1@example.com', 'birth_date': '1990-01-01'
+        }),
+        'route GET / (limit=50)': lambda: client.get('/api/users/?limit=50'),
+        'route GET /export (1000+)': lambda: client.get('/api/users/export', headers=admin_headers).get_data(),
+        'route GET /<id> (cache)': lambda: client.get('/api/users/1'),
+        'route GET /<id> (sem cache)': get_user_uncached,
+        'route GET /me': lambda: client.get('/api/users/me?id=1'),
+        'route PUT /<id>': lambda: client.put('/api/users/2', json={'full_name': 'Nome Atualizado'}),
+        'route DELETE /<id>': delete_user,
+        'route GET /cache/stats': lambda: client.get('/api/users/cache/stats', headers=admin_headers)
+    }
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """Retorna os casos cujo ops/s caiu mais que max_regression em relação ao baseline"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        change = result['ops_per_sec'] / reference['ops_per_sec'] - 1
+        result['change_vs_baseline'] = change
+        if change < -max_regression:
+            regressions.append(name)
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Microbenchmarks dos caminhos críticos da API')
+    parser.add_argument('--duration', type=float, default=0.5, help='segundos por caso')
+    parser.add_argument('--filter', default='', help='roda apenas casos que contêm este texto')
+    parser.add_argument('--output', help='arquivo JSON para salvar os resultados')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON para comparação')
+    parser.add_argument('--save-baseline', action='store_true', help='grava os resultados como novo baseline')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='queda máxima de ops/s tolerada (fração, padrão 0.25)')
+    args = parser.parse_args()
+
+    cases = {name: fn for name, fn in build_cases().items() if args.filter in name}
+    results = {}
+    for name, fn in cases.items():
+        results[name] = run_case(fn, args.duration)
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.max_regression)
+
+    print(f"{'caso':<34} {'ops/s':>12} {'p50 (µs)':>11} {'p99 (µs)':>11} {'vs baseline':>12}")
+    for name, result in results.items():
+        change = result.get('change_vs_baseline')
+        change = f'{change:+.1%}' if change is not None else '-'
+        flag = '  REGRESSÃO' if name in regressions else ''
+        print(f"{name:<34} {result['ops_per_sec']:>12,.0f} {result['p50_us']:>11.1f} {result['p99_us']:>11.1f} {change:>12}{flag}")
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'duration_per_case': args.duration,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Baseline salvo em {args.baseline}')
+
+    if regressions:
+        print(f"{len(regressions)} caso(s) abaixo do baseline em mais de {args.max_regression:.0%}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Tempo de inicialização da aplicação (cold start)
+
+Cada rodada é um processo Python novo, como o boot de um worker do gunicorn, e mede:
+  - import_ms: import de app e config
+  - create_app_ms: create_app()
+  - first_response_ms: primeira requisição (GET /api/health) pelo test client
+  - supabase_client_ms: primeiro Config.get_supabase_client() (carga tardia de supabase/httpx)
+  - process_ms: processo completo, do exec ao fim do script
+Reporta a mediana das rodadas, salva em JSON e compara com um baseline.
+
+Uso:
+    python benchmarks/bench_startup.py                      # compara com benchmarks/startup_baseline.json
+    python benchmarks/bench_startup.py --save-baseline
+    python benchmarks/bench_startup.py --runs 20 --output startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'startup_baseline.json')
+
+# Script executado em cada processo novo; imprime as medições em JSON
+PROBE = '''
+import json, os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from app import create_app
+from config.config import Config, config_by_name
+imported = time.perf_counter()
+app = create_app(config_by_name['testing'])
+created = time.perf_counter()
+app.test_client().get('/api/health')
+responded = time.perf_counter()
+os.environ.setdefault('SUPABASE_URL', 'https://bench.supabase.co')
+os.environ.setdefault('SUPABASE_KEY', 'aaa.bbb.ccc')
+Config.get_supabase_client()
+connected = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1e3,
+    'create_app_ms': (created - imported) * 1e3,
+    'first_response_ms': (responded - created) * 1e3,
+    'supabase_client_ms': (connected - responded) * 1e3
+}}))
+'''
+
+def run_once() -> Dict[str, float]:
+    """Executa o probe em um processo novo"""
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(root=ROOT)],
+        check=True, capture_output=True, text=True, cwd=ROOT
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result['process_ms'] = (time.perf_counter() - start) * 1e3
+    return result
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], max_regression: float) -> List[str]:
+    """Retorna as medições que ficaram mais lentas que o baseline além de max_regression"""
+    regressions = []
+    for name, value in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        if value / reference - 1 > max_regression:
+            regressions.append(name)
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Tempo de inicialização da aplicação')
+    parser.add_argument('--runs', type=int, default=10, help='processos medidos')
+    parser.add_argument('--output', help='arquivo JSON para salvar os resultados')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON para comparação')
+    parser.add_argument('--save-baseline', action='store_true', help='grava os resultados como novo baseline')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='aumento máximo de tempo tolerado (fração, padrão 0.25)')
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    results = {name: statistics.median(run[name] for run in runs) for name in runs[0]}
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.max_regression)
+
+    print(f"{'medição (mediana)':<22} {'ms':>9} {'baseline':>9}")
+    for name, value in results.items():
+        reference = baseline.get(name)
+        reference = f'{reference:.1f}' if reference else '-'
+        flag = '  REGRESSÃO' if name in regressions else ''
+        print(f'{name:<22} {value:>9.1f} {reference:>9}{flag}')
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': args.runs,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Baseline salvo em {args.baseline}')
+
+    if regressions:
+        print(f"{len(regressions)} medição(ões) acima do baseline em mais de {args.max_regression:.0%}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Comparação de memória e velocidade entre o modelo User antigo (com __dict__),
+o User com __slots__ e o lote colunar UserBatch
+
+Uso: python benchmarks/bench_user_model.py [quantidade_de_linhas]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.user_model import User, UserBatch
+
+class LegacyUser:
+    """Réplica do modelo anterior: objeto comum com __dict__ por instância"""
+    def __init__(self, id=None, email=None, full_name=None, cpf=None, birth_date=None,
+                 status='active', role='user', last_login=None, created_at=None, updated_at=None):
+        self.id = id
+        self.email = email
+        self.full_name = full_name
+        self.cpf = cpf
+        self.birth_date = birth_date
+        self.status = status
+        self.role = role
+        self.last_login = last_login
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            id=data.get('id'),
+            email=data.get('email'),
+            full_name=data.get('full_name'),
+            cpf=data.get('cpf'),
+            birth_date=data.get('birth_date'),
+            status=data.get('status', 'active'),
+            role=data.get('role', 'user'),
+            last_login=data.get('last_login'),
+            created_at=data.get('created_at'),
+            updated_at=data.get('updated_at')
+        )
+
+    def to_response_dict(self):
+        return {
+            'id': self.id,
+            'email': self.email,
+            'full_name': self.full_name,
+            'cpf': self.cpf,
+            'birth_date': self.birth_date,
+            'status': self.status,
+            'role': self.role,
+            'last_login': self.last_login,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+def make_rows(count):
+    """Gera linhas no formato retornado pelo Supabase"""
+    return [{
+        'id': i,
+        'email': f'usuario{i}@example.com',
+        'full_name': f'Usuário {i}',
+        'cpf': f'{i:011d}',
+        'birth_date': '1990-01-01',
+        'status': 'active',
+        'role': 'user',
+        'last_login': '2024-01-01T10:00:00',
+        'created_at': '2023-10-10T10:10:10Z',
+        'updated_at': '2023-10-10T10:10:10Z'
+    } for i in range(count)]
+
+def measure(label, build, serialize, rows):
+    """Mede pico de memória do resultado e tempo de construção + serialização"""
+    tracemalloc.start()
+    result = build(rows)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(5):
+        serialize(build(rows))
+    elapsed = (time.perf_counter() - start) / 5
+
+    print(f'{label:<14} memória retida: {retained / 1024:>10.1f} KiB   construir+serializar: {elapsed * 1000:>8.2f} ms')
+    return result
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows = make_rows(count)
+    print(f'{count} linhas')
+
+    measure('LegacyUser', lambda r: [LegacyUser.from_dict(d) for d in r],
+            lambda users: [u.to_response_dict() for u in users], rows)
+    measure('User (slots)', lambda r: [User.from_dict(d) for d in r],
+            lambda users: [u.to_response_dict() for u in users], rows)
+    measure('UserBatch', UserBatch.from_rows,
+            lambda batch: batch.to_response_dicts(), rows)
+
+if __name__ == '__main__':
+    main()
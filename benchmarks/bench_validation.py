@@ -0,0 +1,81 @@
+"""
+Validação de CPFs e datas: funções escalares x validação em lote
+
+Compara, para lotes de N itens:
+  - escalar: validate_cpf / validate_birth_date item a item
+  - lote (python): validate_cpfs / validate_birth_dates sem NumPy
+  - lote (numpy): validate_cpfs / validate_birth_dates vetorizados (se NumPy estiver instalado)
+
+Uso: python benchmarks/bench_validation.py [--size 100000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+# Adiciona o diretório raiz ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import batch_validation
+from app.utils.auth import validate_cpf, validate_birth_date
+from app.utils.batch_validation import validate_cpfs, validate_birth_dates
+
+def make_cpfs(count, rng):
+    """Mistura de CPFs válidos (com e sem máscara) e inválidos"""
+    cpfs = []
+    for _ in range(count):
+        digits = [rng.randrange(10) for _ in range(9)]
+        for size in (9, 10):
+            value = sum(digit * (size + 1 - position) for position, digit in enumerate(digits))
+            digits.append(value * 10 % 11 % 10)
+        if rng.random() < 0.1:
+            digits[10] = (digits[10] + 1) % 10
+        cpf = ''.join(map(str, digits))
+        cpfs.append(f'{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}' if rng.random() < 0.5 else cpf)
+    return cpfs
+
+def make_dates(count, rng):
+    """Datas AAAA-MM-DD, parte delas fora do calendário"""
+    return [f'{rng.randrange(1900, 2030)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 32):02d}' for _ in range(count)]
+
+def best_of(fn, repeat):
+    """Menor tempo de repeat execuções"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Validação escalar x em lote')
+    parser.add_argument('--size', type=int, default=100000, help='itens por lote')
+    parser.add_argument('--repeat', type=int, default=3, help='repetições (vale a melhor)')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    cpfs = make_cpfs(args.size, rng)
+    dates = make_dates(args.size, rng)
+
+    cases = {
+        'CPF': (lambda: [validate_cpf(cpf) for cpf in cpfs], lambda: validate_cpfs(cpfs)),
+        'data de nascimento': (lambda: [validate_birth_date(date) for date in dates], lambda: validate_birth_dates(dates))
+    }
+
+    print(f'{args.size:,} itens por lote, NumPy: {"sim" if batch_validation.np is not None else "não"}')
+    print(f"{'caso':<20} {'modo':<16} {'itens/s':>14} {'speedup':>9}")
+    for name, (scalar, batch) in cases.items():
+        reference = best_of(scalar, args.repeat)
+        timings = {'escalar': reference}
+        with patch.object(batch_validation, 'np', None):
+            timings['lote (python)'] = best_of(batch, args.repeat)
+        if batch_validation.np is not None:
+            timings['lote (numpy)'] = best_of(batch, args.repeat)
+        for mode, elapsed in timings.items():
+            print(f'{name:<20} {mode:<16} {args.size / elapsed:>14,.0f} {reference / elapsed:>8.1f}x')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
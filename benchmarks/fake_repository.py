@@ -0,0 +1,176 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Sequence
+from app.models.user_model import now_timestamp
+from app.services.user_repository import ChangeCursor, UserRepository
+from app.services.async_user_repository import AsyncUserRepository
+
+class InMemoryUserRepository(UserRepository):
+    """
+    Repositório em memória usado nos benchmarks (sem rede nem disco)
+    """
+    def __init__(self):
+        self.rows: Dict[int, Dict[str, Any]] = {}
+        self.by_email: Dict[str, int] = {}
+        self.tombstones: Dict[int, str] = {}
+        self.next_id = 1
+
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        now = now_timestamp()
+        created = {
+            'id': self.next_id, 'status': 'active', 'role': 'user', 'last_login': None,
+            'created_at': now, 'updated_at': now, **row
+        }
+        self.rows[self.next_id] = created
+        self.by_email[created['email']] = self.next_id
+        self.next_id += 1
+        return dict(created)
+
+    def insert_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.insert(row) for row in rows]
+
+    def get_by_id(self, user_id: int, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        row = self.rows.get(user_id)
+        if not row:
+            return None
+        return {column: row.get(column) for column in columns} if columns else dict(row)
+
+    def get_many(self, user_ids: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        rows = [self.rows[user_id] for user_id in user_ids if user_id in self.rows]
+        return [{column: row.get(column) for column in columns} if columns else dict(row) for row in rows]
+
+    def get_by_credentials(self, email: str, birth_date: str) -> Optional[Dict[str, Any]]:
+        row = self.rows.get(self.by_email.get(email))
+        if row and row['birth_date'] == birth_date:
+            return dict(row)
+        return None
+
+    def find_existing(self, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {'email': row['email'], 'cpf': row.get('cpf')} for row in self.rows.values()
+            if any(row.get(field) == value for field, value in values.items())
+        ][:len(values)]
+
+    def list_page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        after = after or 0
+        page = []
+        for user_id in sorted(self.rows):
+            if user_id > after:
+                row = self.rows[user_id]
+                page.append({column: row.get(column) for column in columns} if columns else dict(row))
+                if len(page) == limit:
+                    break
+        return page
+
+    def search(self, terms: Sequence[str], limit: int, after: Optional[int] = None) -> List[Dict[str, Any]]:
+        def matches(row, term):
+            term = term.lower()
+            name_words = (row.get('full_name') or '').lower().split()
+            return row['email'].lower().startswith(term) or any(word.startswith(term) for word in name_words)
+
+        page = []
+        for user_id in sorted(self.rows):
+            row = self.rows[user_id]
+            if user_id > (after or 0) and all(matches(row, term) for term in terms):
+                page.append(dict(row))
+                if len(page) == limit:
+                    break
+        return page
+
+    @staticmethod
+    def _changes(rows, column: str, after: Optional[ChangeCursor], until: str, limit: int) -> List[Dict[str, Any]]:
+        after = after or ('', 0)
+        selected = [row for row in rows if row.get(column) and after < (row[column], row['id']) and row[column] <= until]
+        return sorted(selected, key=lambda row: (row[column], row['id']))[:limit]
+
+    def list_changes(self, after: Optional[ChangeCursor], until: str, limit: int) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self._changes(self.rows.values(), 'updated_at', after, until, limit)]
+
+    def list_tombstones(self, after: Optional[ChangeCursor], until: str, limit: int) -> List[Dict[str, Any]]:
+        rows = [{'id': user_id, 'deleted_at': deleted_at} for user_id, deleted_at in self.tombstones.items()]
+        return self._changes(rows, 'deleted_at', after, until, limit)
+
+    def update(self, user_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        row = self.rows.get(user_id)
+        if row is None:
+            return None
+        row.update(values)
+        return dict(row)
+
+    def update_many(self, user_ids: Sequence[int], values: Dict[str, Any]) -> None:
+        for user_id in user_ids:
+            self.update(user_id, values)
+
+    def delete(self, user_id: int) -> Optional[Dict[str, Any]]:
+        row = self.rows.pop(user_id, None)
+        if row is None:
+            return None
+        self.by_email.pop(row['email'], None)
+        self.tombstones[user_id] = now_timestamp()
+        return dict(row)
+
+class SlowUserRepository(InMemoryUserRepository):
+    """
+    Repositório em memória que simula a latência de rede do banco (bloqueando a thread)
+    """
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    def get_by_id(self, user_id: int, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        time.sleep(self.latency)
+        return super().get_by_id(user_id, columns)
+
+    def get_many(self, user_ids: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        time.sleep(self.latency)
+        return super().get_many(user_ids, columns)
+
+class AsyncSlowUserRepository(AsyncUserRepository):
+    """
+    Versão assíncrona do SlowUserRepository (a latência não bloqueia o event loop)
+    """
+    def __init__(self, repository: InMemoryUserRepository, latency: float):
+        self.repository = repository
+        self.latency = latency
+
+    async def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        return self.repository.insert(row)
+
+    async def get_by_id(self, user_id: int, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        await asyncio.sleep(self.latency)
+        return InMemoryUserRepository.get_by_id(self.repository, user_id, columns)
+
+    async def get_many(self, user_ids: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        await asyncio.sleep(self.latency)
+        return InMemoryUserRepository.get_many(self.repository, user_ids, columns)
+
+    async def get_by_credentials(self, email: str, birth_date: str) -> Optional[Dict[str, Any]]:
+        await asyncio.sleep(self.latency)
+        return self.repository.get_by_credentials(email, birth_date)
+
+    async def find_existing(self, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        await asyncio.sleep(self.latency)
+        return self.repository.find_existing(values)
+
+    async def list_page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        await asyncio.sleep(self.latency)
+        return self.repository.list_page(limit, after, columns)
+
+    async def update(self, user_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        await asyncio.sleep(self.latency)
+        return self.repository.update(user_id, values)
+
+    async def delete(self, user_id: int) -> Optional[Dict[str, Any]]:
+        await asyncio.sleep(self.latency)
+        return self.repository.delete(user_id)
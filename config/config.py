@@ -1,14 +1,29 @@
 import os
+import threading
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from supabase import create_client, Client
 import logging
 
+# supabase, postgrest e httpx são importados apenas no primeiro uso do cliente
+# (o import custa centenas de ms em cada boot de worker, comando ou teste)
+if TYPE_CHECKING:
+    from supabase import Client
+
 # Configuração de logging
 logger = logging.getLogger(__name__)
 
 # Carrega variáveis de ambiente
 load_dotenv()
 
+# Cliente Supabase compartilhado pelo processo (reconstruído após fork)
+_supabase_client = None
+_supabase_client_pid = None
+_supabase_client_lock = threading.Lock()
+
+# Cliente PostgREST assíncrono (modo ASGI), um por processo e event loop
+_async_postgrest_client = None
+_async_postgrest_client_key = None
+
 class Config:
     """Configuração base"""
     SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'default-secret-key')
@@ -17,6 +32,130 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
     JWT_ACCESS_TOKEN_EXPIRES = int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 3600))
     
+    # Cache de tokens já verificados (0 desativa)
+    TOKEN_CACHE_MAX_SIZE = int(os.environ.get('TOKEN_CACHE_MAX_SIZE', 4096))
+    
+    # Pool de conexões HTTP do cliente Supabase
+    SUPABASE_POOL_MAX_CONNECTIONS = int(os.environ.get('SUPABASE_POOL_MAX_CONNECTIONS', 20))
+    SUPABASE_ASYNC_POOL_MAX_CONNECTIONS = int(os.environ.get('SUPABASE_ASYNC_POOL_MAX_CONNECTIONS', 200))
+    SUPABASE_POOL_MAX_KEEPALIVE = int(os.environ.get('SUPABASE_POOL_MAX_KEEPALIVE', 10))
+    SUPABASE_POOL_KEEPALIVE_EXPIRY = float(os.environ.get('SUPABASE_POOL_KEEPALIVE_EXPIRY', 30.0))
+    SUPABASE_CONNECT_TIMEOUT = float(os.environ.get('SUPABASE_CONNECT_TIMEOUT', 5.0))
+    SUPABASE_READ_TIMEOUT = float(os.environ.get('SUPABASE_READ_TIMEOUT', 10.0))
+    
+    # Repositório de usuários: supabase ou sqlite
+    USER_REPOSITORY = os.environ.get('USER_REPOSITORY', 'supabase')
+    SQLITE_DATABASE_PATH = os.environ.get('SQLITE_DATABASE_PATH', 'users.db')
+    
+    # Métricas (METRICS_MULTIPROC_DIR agrega os workers do gunicorn em /api/metrics)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')
+    METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5.0))
+    
+    # Compressão das respostas (gzip e, se o pacote brotli estiver instalado, br)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+    COMPRESS_STREAM_FLUSH_BYTES = int(os.environ.get('COMPRESS_STREAM_FLUSH_BYTES', 65536))
+    
+    # Paginação da listagem de usuários
+    USERS_PAGE_SIZE = int(os.environ.get('USERS_PAGE_SIZE', 50))
+    USERS_MAX_PAGE_SIZE = int(os.environ.get('USERS_MAX_PAGE_SIZE', 500))
+    USERS_EXPORT_PAGE_SIZE = int(os.environ.get('USERS_EXPORT_PAGE_SIZE', 500))
+    
+    # Busca de vários usuários por ID em uma requisição
+    USERS_BATCH_MAX_IDS = int(os.environ.get('USERS_BATCH_MAX_IDS', 100))
+    
+    # Cadastro em lote
+    USERS_BULK_CHUNK_SIZE = int(os.environ.get('USERS_BULK_CHUNK_SIZE', 500))
+    USERS_BULK_MAX_ROWS = int(os.environ.get('USERS_BULK_MAX_ROWS', 5000))
+    
+    # Gravação em segundo plano do last_login
+    LAST_LOGIN_FLUSH_SIZE = int(os.environ.get('LAST_LOGIN_FLUSH_SIZE', 100))
+    LAST_LOGIN_FLUSH_INTERVAL = float(os.environ.get('LAST_LOGIN_FLUSH_INTERVAL', 2.0))
+    
+    # Cache de usuários (USER_CACHE_MAX_SIZE=0 desativa; backend: none, local ou redis)
+    # A camada em memória é de cada worker: uma escrita feita em outro worker só aparece nela
+    # depois de USER_CACHE_TTL segundos (GET /api/users/<id> pode responder a linha anterior).
+    # A validação de If-None-Match (304) não usa essa camada: lê o redis ou as colunas de versão
+    USER_CACHE_MAX_SIZE = int(os.environ.get('USER_CACHE_MAX_SIZE', 1024))
+    USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', 60.0))
+    USER_CACHE_BACKEND = os.environ.get('USER_CACHE_BACKEND', 'none')
+    USER_CACHE_REDIS_URL = os.environ.get('USER_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    
+    # Índice em memória de emails e CPFs para recusar duplicatas no cadastro (filtro de Bloom por worker)
+    DUPLICATE_INDEX_ENABLED = os.environ.get('DUPLICATE_INDEX_ENABLED', 'true').lower() == 'true'
+    DUPLICATE_INDEX_CAPACITY = int(os.environ.get('DUPLICATE_INDEX_CAPACITY', 1000000))
+    DUPLICATE_INDEX_ERROR_RATE = float(os.environ.get('DUPLICATE_INDEX_ERROR_RATE', 0.01))
+    DUPLICATE_INDEX_PAGE_SIZE = int(os.environ.get('DUPLICATE_INDEX_PAGE_SIZE', 1000))
+    DUPLICATE_INDEX_CONFIRMED_SIZE = int(os.environ.get('DUPLICATE_INDEX_CONFIRMED_SIZE', 10000))
+    DUPLICATE_INDEX_CONFIRMED_TTL = float(os.environ.get('DUPLICATE_INDEX_CONFIRMED_TTL', 30.0))
+    
+    # Busca por prefixo de nome e email: índice em memória por worker, sem acentos e maiúsculas
+    # (com SEARCH_INDEX_ENABLED=false, ou até o índice terminar de carregar, a busca vai ao banco
+    # com filtros ilike, ordenada por ID)
+    SEARCH_INDEX_ENABLED = os.environ.get('SEARCH_INDEX_ENABLED', 'true').lower() == 'true'
+    SEARCH_INDEX_PAGE_SIZE = int(os.environ.get('SEARCH_INDEX_PAGE_SIZE', 1000))
+    # Intervalo da leitura do feed de alterações (cadastros, atualizações e exclusões de outros workers)
+    SEARCH_INDEX_REFRESH_INTERVAL = float(os.environ.get('SEARCH_INDEX_REFRESH_INTERVAL', 5.0))
+    SEARCH_PAGE_SIZE = int(os.environ.get('SEARCH_PAGE_SIZE', 20))
+    SEARCH_MAX_PAGE_SIZE = int(os.environ.get('SEARCH_MAX_PAGE_SIZE', 100))
+    SEARCH_MIN_QUERY_LENGTH = int(os.environ.get('SEARCH_MIN_QUERY_LENGTH', 2))
+    
+    # Feed de alterações (/api/users/changes): páginas ordenadas por (updated_at, id)
+    # CHANGE_FEED_SAFETY_LAG segura as alterações dos últimos segundos, que ainda podem ser
+    # ultrapassadas por transações com horário anterior que não terminaram de gravar
+    CHANGE_FEED_PAGE_SIZE = int(os.environ.get('CHANGE_FEED_PAGE_SIZE', 500))
+    CHANGE_FEED_MAX_PAGE_SIZE = int(os.environ.get('CHANGE_FEED_MAX_PAGE_SIZE', 5000))
+    CHANGE_FEED_SAFETY_LAG = float(os.environ.get('CHANGE_FEED_SAFETY_LAG', 5.0))
+    
+    # Estatísticas de usuários (/api/users/stats): contadores em memória por worker, mantidos
+    # pelas escritas e recalculados a cada USER_STATS_RECONCILE_INTERVAL segundos
+    USER_STATS_ENABLED = os.environ.get('USER_STATS_ENABLED', 'true').lower() == 'true'
+    USER_STATS_PAGE_SIZE = int(os.environ.get('USER_STATS_PAGE_SIZE', 1000))
+    USER_STATS_RECONCILE_INTERVAL = float(os.environ.get('USER_STATS_RECONCILE_INTERVAL', 300.0))
+    
+    # Resiliência das chamadas ao banco: prazo por leitura (escritas usam o timeout do cliente HTTP),
+    # novas tentativas de leituras, circuit breaker e hedge de get_user_by_id (BACKEND_HEDGE_DELAY=0 desativa o hedge)
+    BACKEND_RESILIENCE_ENABLED = os.environ.get('BACKEND_RESILIENCE_ENABLED', 'true').lower() == 'true'
+    BACKEND_DEADLINE = float(os.environ.get('BACKEND_DEADLINE', 2.0))
+    BACKEND_READ_RETRIES = int(os.environ.get('BACKEND_READ_RETRIES', 2))
+    BACKEND_RETRY_BASE_DELAY = float(os.environ.get('BACKEND_RETRY_BASE_DELAY', 0.05))
+    BACKEND_RETRY_MAX_DELAY = float(os.environ.get('BACKEND_RETRY_MAX_DELAY', 0.5))
+    BACKEND_HEDGE_DELAY = float(os.environ.get('BACKEND_HEDGE_DELAY', 0.0))
+    BACKEND_BREAKER_FAILURES = int(os.environ.get('BACKEND_BREAKER_FAILURES', 5))
+    BACKEND_BREAKER_RESET_TIMEOUT = float(os.environ.get('BACKEND_BREAKER_RESET_TIMEOUT', 10.0))
+    BACKEND_MAX_WORKERS = int(os.environ.get('BACKEND_MAX_WORKERS', 64))
+    
+    # Injeção de falhas no repositório (somente para testes locais de resiliência)
+    FAULT_INJECTION_ENABLED = os.environ.get('FAULT_INJECTION_ENABLED', 'false').lower() == 'true'
+    FAULT_INJECTION_LATENCY = float(os.environ.get('FAULT_INJECTION_LATENCY', 0.0))
+    FAULT_INJECTION_JITTER = float(os.environ.get('FAULT_INJECTION_JITTER', 0.0))
+    FAULT_INJECTION_FAILURE_RATE = float(os.environ.get('FAULT_INJECTION_FAILURE_RATE', 0.0))
+    FAULT_INJECTION_HANG_RATE = float(os.environ.get('FAULT_INJECTION_HANG_RATE', 0.0))
+    
+    # Agrupa buscas concorrentes do mesmo usuário em uma única consulta (single-flight)
+    SINGLE_FLIGHT_ENABLED = os.environ.get('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true'
+    
+    # Servidor gunicorn (config/gunicorn_conf.py); GUNICORN_WORKERS/THREADS=0 calcula pelo número de CPUs
+    GUNICORN_PROFILE = os.environ.get('GUNICORN_PROFILE', 'io')
+    GUNICORN_BIND = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', 5000)}")
+    GUNICORN_WORKERS = int(os.environ.get('GUNICORN_WORKERS', 0))
+    GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', 0))
+    GUNICORN_IO_WAIT_RATIO = float(os.environ.get('GUNICORN_IO_WAIT_RATIO', 0.9))
+    GUNICORN_PRELOAD = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+    GUNICORN_TIMEOUT = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+    GUNICORN_GRACEFUL_TIMEOUT = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+    GUNICORN_KEEPALIVE = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+    # Reciclagem dos workers: cada worker novo lê a tabela users três vezes (filtro de duplicatas,
+    # índice de busca, estatísticas); com algum desses índices ativo ela fica desativada (0) por padrão
+    GUNICORN_MAX_REQUESTS = int(os.environ.get(
+        'GUNICORN_MAX_REQUESTS',
+        0 if DUPLICATE_INDEX_ENABLED or SEARCH_INDEX_ENABLED or USER_STATS_ENABLED else 1000
+    ))
+    GUNICORN_MAX_REQUESTS_JITTER = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+    
     # Configurações do CORS
     CORS_HEADERS = 'Content-Type, Authorization'
     CORS_ORIGINS = ['http://localhost:3000', 'http://localhost:8081', 'exp://192.168.0.4:8081', '*']
@@ -28,15 +167,138 @@ class Config:
         logger.info(f"JWT_SECRET_KEY configurada: {self.JWT_SECRET_KEY[:5]}..." if self.JWT_SECRET_KEY else "JWT_SECRET_KEY não configurada!")
     
     @staticmethod
-    def get_supabase_client() -> Client:
-        """Retorna uma instância do cliente Supabase"""
+    def get_supabase_client() -> 'Client':
+        """
+        Retorna o cliente Supabase compartilhado pelo processo
+        O cliente é criado na primeira chamada e recriado após um fork (ex.: workers do gunicorn)
+        """
+        global _supabase_client, _supabase_client_pid
+        
+        pid = os.getpid()
+        client = _supabase_client
+        if client is not None and _supabase_client_pid == pid:
+            return client
+        
+        with _supabase_client_lock:
+            if _supabase_client is None or _supabase_client_pid != pid:
+                # Após um fork as conexões herdadas do processo pai são descartadas sem fechar
+                _supabase_client = Config._create_supabase_client()
+                _supabase_client_pid = pid
+            return _supabase_client
+    
+    @staticmethod
+    def reset_supabase_client() -> None:
+        """Descarta o cliente Supabase compartilhado, fechando suas conexões (usado em testes e hooks de fork)"""
+        global _supabase_client, _supabase_client_pid
+        
+        with _supabase_client_lock:
+            client = _supabase_client
+            owned = _supabase_client_pid == os.getpid()
+            _supabase_client = None
+            _supabase_client_pid = None
+        
+        if client is not None and owned:
+            try:
+                client.postgrest.aclose()
+            except Exception as e:
+                logger.warning(f"Erro ao fechar conexões do Supabase: {e}")
+    
+    @staticmethod
+    def reset_after_fork() -> None:
+        """
+        Descarta no processo filho os clientes herdados do processo pai (hook post_fork do gunicorn)
+        As conexões pertencem ao pai e não são fechadas; o lock é recriado por segurança
+        """
+        global _supabase_client, _supabase_client_pid, _supabase_client_lock
+        global _async_postgrest_client, _async_postgrest_client_key
+        
+        _supabase_client_lock = threading.Lock()
+        _supabase_client = None
+        _supabase_client_pid = None
+        _async_postgrest_client = None
+        _async_postgrest_client_key = None
+    
+    @staticmethod
+    def get_async_postgrest_client():
+        """
+        Retorna o cliente PostgREST assíncrono do processo (usado pelo modo ASGI)
+        Deve ser chamado de dentro do event loop; é recriado após fork ou troca de loop
+        """
+        global _async_postgrest_client, _async_postgrest_client_key
+        import asyncio
+        import httpx
+        from postgrest import AsyncPostgrestClient
+        
+        key = (os.getpid(), id(asyncio.get_running_loop()))
+        if _async_postgrest_client is not None and _async_postgrest_client_key == key:
+            return _async_postgrest_client
+        
+        supabase_url = os.environ.get('SUPABASE_URL')
+        supabase_key = os.environ.get('SUPABASE_KEY')
+        
+        if not supabase_url or not supabase_key:
+            raise ValueError("URL e chave do Supabase devem ser definidos nas variáveis de ambiente")
+        
+        client = AsyncPostgrestClient(f"{supabase_url}/rest/v1", headers={'apiKey': supabase_key})
+        client.session = httpx.AsyncClient(
+            base_url=client.session.base_url,
+            headers=client.session.headers,
+            timeout=httpx.Timeout(Config.SUPABASE_READ_TIMEOUT, connect=Config.SUPABASE_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=Config.SUPABASE_ASYNC_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.SUPABASE_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=Config.SUPABASE_POOL_KEEPALIVE_EXPIRY
+            )
+        )
+        client.auth(token=supabase_key)
+        
+        _async_postgrest_client = client
+        _async_postgrest_client_key = key
+        return client
+    
+    @staticmethod
+    async def close_async_postgrest_client() -> None:
+        """Fecha as conexões do cliente PostgREST assíncrono"""
+        global _async_postgrest_client, _async_postgrest_client_key
+        
+        client = _async_postgrest_client
+        _async_postgrest_client = None
+        _async_postgrest_client_key = None
+        if client is not None:
+            await client.aclose()
+    
+    @staticmethod
+    def _create_supabase_client() -> 'Client':
+        """Cria um cliente Supabase com pool de conexões keep-alive limitado"""
+        import httpx
+        from supabase import create_client
+        
         supabase_url = os.environ.get('SUPABASE_URL')
         supabase_key = os.environ.get('SUPABASE_KEY')
         
         if not supabase_url or not supabase_key:
             raise ValueError("URL e chave do Supabase devem ser definidos nas variáveis de ambiente")
         
-        return create_client(supabase_url, supabase_key)
+        timeout = httpx.Timeout(Config.SUPABASE_READ_TIMEOUT, connect=Config.SUPABASE_CONNECT_TIMEOUT)
+        limits = httpx.Limits(
+            max_connections=Config.SUPABASE_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.SUPABASE_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=Config.SUPABASE_POOL_KEEPALIVE_EXPIRY
+        )
+        
+        client = create_client(supabase_url, supabase_key)
+        
+        # Substitui a sessão HTTP do PostgREST por uma com pool e timeouts configurados
+        session = client.postgrest.session
+        client.postgrest.session = type(session)(
+            base_url=session.base_url,
+            headers=session.headers,
+            timeout=timeout,
+            limits=limits
+        )
+        session.close()
+        
+        return client
 
 class DevelopmentConfig(Config):
     """Configuração de desenvolvimento"""
@@ -52,12 +314,23 @@ class TestingConfig(Config):
     """Configuração de testes"""
     TESTING = True
     DEBUG = True
+    DUPLICATE_INDEX_ENABLED = False
+    SEARCH_INDEX_ENABLED = False
+    USER_STATS_ENABLED = False
+    BACKEND_RESILIENCE_ENABLED = False
+
+class LocalConfig(Config):
+    """Configuração local com banco SQLite (sem Supabase)"""
+    DEBUG = True
+    ENV = 'development'
+    USER_REPOSITORY = 'sqlite'
 
 # Dicionário de configuração
 config_by_name = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
-    'testing': TestingConfig
+    'testing': TestingConfig,
+    'local': LocalConfig
 }
 
 # Padrão para configuração de desenvolvimento
@@ -0,0 +1,137 @@
+"""
+Configuração do gunicorn para produção
+
+Uso:
+    gunicorn -c config/gunicorn_conf.py
+    GUNICORN_PROFILE=cpu gunicorn -c config/gunicorn_conf.py
+    GUNICORN_PROFILE=asgi gunicorn -c config/gunicorn_conf.py
+A aplicação é wsgi:app (asgi:application no perfil asgi).
+
+Perfis (GUNICORN_PROFILE), dimensionados pelas CPUs disponíveis ao processo
+(afinidade e cota do cgroup, não as CPUs da máquina):
+  - io (padrão): workers gthread, CPUs + 1 workers; threads por worker = 1 / (1 - GUNICORN_IO_WAIT_RATIO),
+    a fração do tempo de uma requisição gasta esperando o banco (0.9 -> 10 threads), limitadas ao
+    pool de conexões do Supabase (SUPABASE_POOL_MAX_CONNECTIONS)
+  - cpu: workers sync, 2 * CPUs + 1 workers de uma thread (rotas dominadas por CPU)
+  - asgi: workers do uvicorn com asgi:application, um por CPU e ao menos dois (concorrência no event loop)
+GUNICORN_WORKERS e GUNICORN_THREADS fixam os valores calculados.
+
+Com preload (GUNICORN_PRELOAD) a aplicação é importada uma vez no master e os workers a
+compartilham copy-on-write; o hook post_fork recria em cada worker o que não pode ser
+herdado (clientes do Supabase, caches, locks e threads de segundo plano). O master não
+inicia threads nem lê o banco: os índices em memória (duplicatas, busca, estatísticas)
+não são herdados, cada worker os carrega do zero. Com GUNICORN_MAX_REQUESTS > 0 os workers
+são reciclados após esse número de requisições (+ jitter); o padrão é 0 (sem reciclagem)
+quando algum desses índices está ativo e 1000 caso contrário.
+
+Comparação de carga (benchmarks/bench_gunicorn.py: GET /api/users/<id> sem cache, banco
+SQLite com 20 ms de latência injetada, 64 conexões simultâneas, 1 CPU):
+
+    perfil  workers  threads   req/s   p50 ms   p99 ms   memória MB (PSS)   sem preload
+    io            2       10     186      278     1073                 61           114
+    cpu           3        1     102      612      711                102           151
+    asgi          2        -     180      277     1142                 91           118
+
+Com uma CPU o perfil cpu fica limitado a 3 requisições simultâneas (~35 req/s por worker
+com 20 ms de banco e o custo do Flask); io e asgi sobrepõem a espera pelo banco e fazem
+quase o dobro. O preload economiza de 25 a 50 MB por servidor, porque o código importado
+no master é compartilhado pelos workers. A medição usou GUNICORN_MAX_REQUESTS=1000 e
+índices desativados; a reciclagem encerra as conexões keep-alive do worker reciclado
+(poucos erros no cliente durante a medição).
+
+Custo do carregamento dos índices por worker (SQLite local, 100 mil usuários, 1 CPU, páginas
+de 1000 linhas; no Supabase soma-se a latência de 100 consultas por leitura):
+
+    filtro de duplicatas   2,0 s     índice de busca   3,7 s     estatísticas   0,7 s
+
+São ~6,4 s de CPU e três leituras completas de users por worker iniciado: 3N leituras ao
+subir N workers. Com a reciclagem de 1000 requisições e a vazão da tabela acima (~93 req/s
+por worker no perfil io) cada worker seria substituído a cada ~11 s e passaria mais da
+metade do tempo recarregando os índices; por isso a reciclagem fica desativada com eles.
+Até terminar, o worker responde normalmente: duplicatas são recusadas pelo índice único
+do banco, a busca usa ilike e /api/users/stats responde 503.
+"""
+import math
+import os
+import sys
+
+# Permite importar a aplicação quando o gunicorn é iniciado fora da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import Config
+
+def available_cpus() -> int:
+    """CPUs disponíveis ao processo, considerando afinidade e cota de CPU do cgroup (containers)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+def io_threads(io_wait_ratio: float, pool_size: int) -> int:
+    """Threads para manter uma CPU ocupada quando io_wait_ratio do tempo é espera pelo banco"""
+    io_wait_ratio = min(max(io_wait_ratio, 0.0), 0.95)
+    return max(1, min(pool_size, round(1 / (1 - io_wait_ratio))))
+
+def profile_settings(profile: str, cpus: int) -> dict:
+    """Classe de worker, workers e threads de um perfil"""
+    if profile == 'io':
+        return {
+            'worker_class': 'gthread',
+            'workers': cpus + 1,
+            'threads': io_threads(Config.GUNICORN_IO_WAIT_RATIO, Config.SUPABASE_POOL_MAX_CONNECTIONS)
+        }
+    if profile == 'cpu':
+        return {'worker_class': 'sync', 'workers': 2 * cpus + 1, 'threads': 1}
+    if profile == 'asgi':
+        # Ao menos dois workers: a reciclagem de um não deixa o servidor sem nenhum
+        return {'worker_class': 'uvicorn.workers.UvicornWorker', 'workers': max(2, cpus), 'threads': 1}
+    raise ValueError(f"Perfil do gunicorn desconhecido: {profile}")
+
+_settings = profile_settings(Config.GUNICORN_PROFILE, available_cpus())
+
+# Servidor
+bind = Config.GUNICORN_BIND
+worker_class = _settings['worker_class']
+workers = Config.GUNICORN_WORKERS or _settings['workers']
+threads = Config.GUNICORN_THREADS or _settings['threads']
+wsgi_app = 'asgi:application' if Config.GUNICORN_PROFILE == 'asgi' else 'wsgi:app'
+preload_app = Config.GUNICORN_PRELOAD
+
+# Timeouts (o prazo das chamadas ao banco, BACKEND_DEADLINE, deve ficar bem abaixo de timeout)
+timeout = Config.GUNICORN_TIMEOUT
+graceful_timeout = Config.GUNICORN_GRACEFUL_TIMEOUT
+keepalive = Config.GUNICORN_KEEPALIVE
+
+# Reciclagem dos workers (o jitter evita que todos reiniciem juntos)
+max_requests = Config.GUNICORN_MAX_REQUESTS
+max_requests_jitter = Config.GUNICORN_MAX_REQUESTS_JITTER
+
+# Logs no stdout/stderr
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+
+def when_ready(server):
+    server.log.info(
+        f"Perfil {Config.GUNICORN_PROFILE}: {workers} workers {worker_class}, {threads} threads, "
+        f"preload {'ativo' if preload_app else 'inativo'}"
+    )
+
+def post_fork(server, worker):
+    """Recria no worker os recursos por processo herdados do master"""
+    from app import reset_after_fork
+    reset_after_fork()
+
+def worker_exit(server, worker):
+    """Grava os logins pendentes e o último snapshot de métricas antes de o worker sair"""
+    from app.services.login_writer import last_login_writer
+    from app.utils.metrics import exporter
+    last_login_writer.stop()
+    exporter.write()
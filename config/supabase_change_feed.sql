@@ -0,0 +1,31 @@
+-- Feed de alterações (/api/users/changes) no Supabase
+-- Executar uma vez no editor SQL do projeto (idempotente)
+
+-- Exclusões: um registro por usuário excluído
+create table if not exists user_tombstones (
+    id bigint primary key,
+    deleted_at timestamp not null
+);
+create index if not exists idx_user_tombstones_deleted_at on user_tombstones (deleted_at, id);
+
+-- Leitura das alterações em ordem (updated_at, id)
+create index if not exists idx_users_updated_at on users (updated_at, id);
+
+-- Linhas anteriores ao feed sem updated_at
+update users set updated_at = coalesce(created_at, now()) where updated_at is null;
+
+-- Exclui o usuário e registra a exclusão na mesma transação (chamada via RPC pelo repositório)
+-- p_deleted_at vem da aplicação, no mesmo relógio que grava updated_at
+create or replace function delete_user_with_tombstone(p_user_id bigint, p_deleted_at timestamp)
+returns setof users
+language sql
+as $$
+    with deleted as (
+        delete from users where id = p_user_id returning *
+    ), tombstone as (
+        insert into user_tombstones (id, deleted_at)
+        select id, p_deleted_at from deleted
+        on conflict (id) do update set deleted_at = excluded.deleted_at
+    )
+    select * from deleted;
+$$;
@@ -0,0 +1,161 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+import httpx
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.asgi import create_asgi_app
+from config.config import config_by_name
+from app.services.async_user_repository import ThreadedUserRepository, set_async_user_repository, get_async_user_repository
+from app.services.resilient_user_repository import AsyncResilientUserRepository
+from app.services.user_cache import user_cache
+from app.services.login_writer import last_login_writer
+from app.utils.auth import generate_token
+
+class TestAsgiApp(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        class AsgiTestConfig(config_by_name['local']):
+            SQLITE_DATABASE_PATH = os.path.join(self.directory, 'users.db')
+            TESTING = True
+
+        self.config = AsgiTestConfig
+        self.application = create_asgi_app(AsgiTestConfig)
+        user_cache.clear()
+
+    def tearDown(self):
+        # Grava os logins pendentes no banco deste teste
+        last_login_writer.flush()
+        set_async_user_repository(None)
+        user_cache.clear()
+        shutil.rmtree(self.directory)
+
+    def client(self):
+        return httpx.AsyncClient(app=self.application, base_url='http://testserver')
+
+    async def register(self, client):
+        return await client.post('/api/users/register', json={
+            'email': 'asgi@example.com',
+            'full_name': 'Usuário ASGI',
+            'cpf': '52998224725',
+            'birth_date': '1990-01-01'
+        })
+
+    async def test_sqlite_uses_threaded_repository(self):
+        """Testa que o SQLite é adaptado com chamadas em threads (sob a política de resiliência)"""
+        repository = get_async_user_repository()
+        self.assertIsInstance(repository, AsyncResilientUserRepository)
+        self.assertIsInstance(repository.repository, ThreadedUserRepository)
+
+    async def test_crud_and_etag(self):
+        """Testa cadastro, leitura com ETag, atualização e exclusão pelas views assíncronas"""
+        async with self.client() as client:
+            response = await self.register(client)
+            self.assertEqual(response.status_code, 201)
+            user_id = response.json()['user']['id']
+
+            response = await client.get(f'/api/users/{user_id}')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['user']['email'], 'asgi@example.com')
+            etag = response.headers['etag']
+
+            response = await client.get(f'/api/users/{user_id}', headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+
+            response = await client.put(f'/api/users/{user_id}', json={'full_name': 'Novo Nome'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['user']['full_name'], 'Novo Nome')
+
+            response = await client.get(f'/api/users/me?id={user_id}', headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 200)
+
+            response = await client.delete(f'/api/users/{user_id}')
+            self.assertEqual(response.status_code, 200)
+            response = await client.get(f'/api/users/{user_id}')
+            self.assertEqual(response.status_code, 404)
+
+    async def test_login_and_list(self):
+        """Testa login e listagem paginada"""
+        async with self.client() as client:
+            await self.register(client)
+
+            response = await client.post('/api/users/login', json={
+                'username': 'asgi@example.com', 'birth_date': '1990-01-01'
+            })
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('token', response.json())
+
+            response = await client.get('/api/users/?limit=10&fields=email')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['users'], [{'email': 'asgi@example.com'}])
+
+            response = await client.get('/api/users/?limit=0')
+            self.assertEqual(response.status_code, 400)
+
+    async def test_concurrent_requests(self):
+        """Testa requisições concorrentes no mesmo event loop"""
+        async with self.client() as client:
+            response = await self.register(client)
+            user_id = response.json()['user']['id']
+
+            responses = await asyncio.gather(*[
+                client.get(f'/api/users/{user_id}') for _ in range(20)
+            ])
+            self.assertEqual({response.status_code for response in responses}, {200})
+
+    async def test_fallback_to_wsgi(self):
+        """Testa que rotas sem versão assíncrona e OPTIONS são servidas pela aplicação WSGI"""
+        token = generate_token({'id': 1, 'cpf': '52998224725', 'role': 'admin'}, self.config.SECRET_KEY)
+        async with self.client() as client:
+            await self.register(client)
+
+            response = await client.get('/api/users/export', headers={'Authorization': f'Bearer {token}'})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('asgi@example.com', response.text)
+
+            response = await client.options('/api/users/register', headers={
+                'Origin': 'http://localhost:3000', 'Access-Control-Request-Method': 'POST'
+            })
+            self.assertEqual(response.headers['access-control-allow-origin'], 'http://localhost:3000')
+
+            response = await client.get('/api/health')
+            self.assertEqual(response.json(), {'status': 'ok'})
+
+    async def test_fallback_requests_run_concurrently(self):
+        """Testa que requisições simultâneas servidas pela aplicação WSGI não esperam umas pelas outras"""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_for_other():
+            # Só passa se a outra requisição estiver em andamento ao mesmo tempo
+            barrier.wait()
+            return {'status': 'ok'}
+
+        self.application.flask_app.add_url_rule('/test/barrier', 'test_barrier', wait_for_other)
+        async with self.client() as client:
+            responses = await asyncio.gather(client.get('/test/barrier'), client.get('/test/barrier'))
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+
+    async def test_async_response_is_closed(self):
+        """Testa que a resposta das views assíncronas é fechada (call_on_close executado)"""
+        closed = []
+
+        @self.application.flask_app.after_request
+        def track_close(response):
+            response.call_on_close(lambda: closed.append(True))
+            return response
+
+        async with self.client() as client:
+            response = await client.get('/api/users/999')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(closed, [True])
+
+if __name__ == '__main__':
+    unittest.main()
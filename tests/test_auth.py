@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import time
+from unittest.mock import patch
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config.config import config_by_name
+from app.utils import auth
+from app.utils.auth import generate_token, verify_token, clear_token_cache, token_required
+
+SECRET_KEY = 'chave-de-teste-com-tamanho-suficiente'
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        clear_token_cache()
+        self.token = generate_token({'id': 1, 'cpf': '12345678909', 'role': 'user'}, SECRET_KEY)
+    
+    def test_cache_hit_skips_decode(self):
+        """Testa que o segundo uso do token não refaz a verificação da assinatura"""
+        first = verify_token(self.token, SECRET_KEY)
+        with patch('app.utils.auth.decode_token') as mock_decode:
+            second = verify_token(self.token, SECRET_KEY)
+            mock_decode.assert_not_called()
+        self.assertEqual(first, second)
+    
+    def test_cached_token_expires(self):
+        """Testa que um token em cache expira no seu próprio exp"""
+        payload = verify_token(self.token, SECRET_KEY)
+        with patch('app.utils.auth.time.time', return_value=payload['exp'] + 1):
+            with self.assertRaises(Exception) as context:
+                verify_token(self.token, SECRET_KEY)
+        self.assertIn('expirado', str(context.exception))
+    
+    def test_cache_is_keyed_by_secret(self):
+        """Testa que o cache não valida o token com outra chave"""
+        verify_token(self.token, SECRET_KEY)
+        with self.assertRaises(Exception):
+            verify_token(self.token, 'outra-chave-de-teste-com-tamanho-suficiente')
+    
+    def test_cache_is_bounded(self):
+        """Testa o limite de tamanho do cache"""
+        with patch('config.config.Config.TOKEN_CACHE_MAX_SIZE', 2):
+            for user_id in range(3):
+                token = generate_token({'id': user_id, 'cpf': '12345678909', 'role': 'user'}, SECRET_KEY)
+                verify_token(token, SECRET_KEY)
+        self.assertEqual(len(auth._token_cache), 2)
+
+class TestAuthenticateRequest(unittest.TestCase):
+    def setUp(self):
+        clear_token_cache()
+        self.app = create_app(config_by_name['testing'])
+        self.app.add_url_rule('/test/protected', 'test_protected', token_required(lambda: 'ok'))
+        self.client = self.app.test_client()
+    
+    def test_token_without_claims_is_unauthorized(self):
+        """Testa que um token assinado sem role ou sub é recusado com 401 (e não 500)"""
+        import jwt
+        
+        secret_key = self.app.config['SECRET_KEY']
+        exp = int(time.time()) + 3600
+        for payload in ({'sub': '1', 'exp': exp}, {'role': 'admin', 'exp': exp}):
+            headers = {'Authorization': f"Bearer {jwt.encode(payload, secret_key, algorithm='HS256')}"}
+            for route in ('/test/protected', '/api/users/export'):
+                response = self.client.get(route, headers=headers)
+                self.assertEqual(response.status_code, 401, (payload, route))
+                self.assertIn('inválido', response.get_json()['message'])
+
+if __name__ == '__main__':
+    unittest.main()
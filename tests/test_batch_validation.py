@@ -0,0 +1,123 @@
+import os
+import random
+import sys
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import batch_validation
+from app.utils.auth import validate_cpf, validate_birth_date
+from app.utils.batch_validation import (
+    validate_cpfs, validate_birth_dates, CPF_REASONS, DATE_REASONS
+)
+
+UNICODE_DIGITS = '٠١٢٣٤٥٦٧٨٩０１２３４５６７８９²³'
+
+def make_cpf(rng):
+    """Gera um CPF com dígitos verificadores corretos"""
+    digits = [rng.randrange(10) for _ in range(9)]
+    for size in (9, 10):
+        value = sum(digit * (size + 1 - position) for position, digit in enumerate(digits))
+        digits.append(value * 10 % 11 % 10)
+    return ''.join(map(str, digits))
+
+def random_cpfs(rng, count):
+    """CPFs válidos, formatados, alterados, repetidos, com Unicode, lixo e tipos inválidos"""
+    values = []
+    for _ in range(count):
+        cpf = make_cpf(rng)
+        kind = rng.randrange(9)
+        if kind == 1:
+            cpf = f'{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}'
+        elif kind == 2:
+            position = rng.randrange(11)
+            cpf = cpf[:position] + str((int(cpf[position]) + rng.randrange(1, 10)) % 10) + cpf[position + 1:]
+        elif kind == 3:
+            cpf = str(rng.randrange(10)) * rng.choice((10, 11, 12))
+        elif kind == 4:
+            cpf = ''.join(rng.choice('0123456789') for _ in range(rng.randrange(15)))
+        elif kind == 5:
+            position = rng.randrange(11)
+            cpf = cpf[:position] + rng.choice(UNICODE_DIGITS) + cpf[position + 1:]
+        elif kind == 6:
+            cpf = ''.join(rng.choice('0123456789 .-/abcé') for _ in range(rng.randrange(20)))
+        elif kind == 7:
+            cpf = rng.choice([None, 52998224725, b'52998224725'])
+        values.append(cpf)
+    return values
+
+def random_dates(rng, count):
+    """Datas válidas, fora do calendário, em formatos alternativos, com Unicode, lixo e tipos inválidos"""
+    values = []
+    for _ in range(count):
+        year = rng.choice((rng.randrange(0, 10000), 1900, 2000, 2024, 2023))
+        month = rng.choice((rng.randrange(0, 14), 2))
+        day = rng.randrange(0, 33)
+        kind = rng.randrange(8)
+        if kind <= 2:
+            value = f'{year:04d}-{month:02d}-{day:02d}'
+        elif kind == 3:
+            value = f'{year}-{month}-{day}'
+        elif kind == 4:
+            value = f'{year:04d}-{month:02d}-{day:2d}'
+        elif kind == 5:
+            value = f'{year:04d}-{month:02d}-{day:02d}'.replace(str(rng.randrange(10)), rng.choice(UNICODE_DIGITS))
+        elif kind == 6:
+            value = ''.join(rng.choice('0123456789-/ T:') for _ in range(rng.randrange(14)))
+        else:
+            value = rng.choice([None, 19900101, '1990-01-01 ', ' 1990-01-01'])
+        values.append(value)
+    return values
+
+def scalar(fn, value):
+    """Resultado da função escalar (exceções contam como inválido)"""
+    try:
+        return fn(value)
+    except Exception:
+        return False
+
+class TestBatchValidation(unittest.TestCase):
+    def assert_matches_scalar(self):
+        for seed in range(5):
+            rng = random.Random(seed)
+            cpfs = random_cpfs(rng, 2000)
+            result = validate_cpfs(cpfs)
+            self.assertEqual(result.valid, [scalar(validate_cpf, cpf) for cpf in cpfs])
+            self.assertEqual(result.valid, [reason == 0 for reason in result.reasons])
+
+            dates = random_dates(rng, 2000)
+            result = validate_birth_dates(dates)
+            self.assertEqual(result.valid, [scalar(validate_birth_date, date) for date in dates])
+            self.assertEqual(result.valid, [reason == 0 for reason in result.reasons])
+
+    @unittest.skipIf(batch_validation._numpy() is None, 'NumPy não instalado')
+    def test_vectorized_matches_scalar(self):
+        """Propriedade: a versão vetorizada concorda com as funções escalares"""
+        self.assert_matches_scalar()
+
+    def test_python_fallback_matches_scalar(self):
+        """Propriedade: a versão sem NumPy concorda com as funções escalares"""
+        with patch.object(batch_validation, 'np', None):
+            self.assert_matches_scalar()
+
+    def test_reason_codes(self):
+        """Testa os códigos de motivo"""
+        result = validate_cpfs(['529.982.247-25', '11111111111', '123', '52998224726', None, '5299822472²'])
+        self.assertEqual([CPF_REASONS[code] for code in result.reasons], [
+            'ok', 'repeated_digits', 'invalid_length', 'invalid_check_digit', 'invalid_type', 'invalid_characters'
+        ])
+
+        result = validate_birth_dates(['2024-02-29', '2023-02-29', '1990/01/01', '1990-1-5', 19900101])
+        self.assertEqual([DATE_REASONS[code] for code in result.reasons], [
+            'ok', 'invalid_date', 'invalid_format', 'ok', 'invalid_type'
+        ])
+
+    def test_empty_batch(self):
+        """Testa lote vazio"""
+        self.assertEqual(validate_cpfs([]), ([], []))
+        self.assertEqual(validate_birth_dates([]), ([], []))
+
+if __name__ == '__main__':
+    unittest.main()
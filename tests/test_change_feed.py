@@ -0,0 +1,110 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config.config import config_by_name
+from app.services.sqlite_user_repository import SqliteUserRepository
+from app.services.user_cache import user_cache
+from app.services.user_repository import DELETE_USER_FUNCTION, SupabaseUserRepository, get_user_repository, set_user_repository
+from app.services.user_service import UserService
+from app.utils.auth import generate_token
+from app.models.user_model import now_timestamp
+from app.utils.cursor import decode_cursor, encode_cursor
+
+def make_row(i):
+    return {'email': f'user{i}@example.com', 'full_name': f'User {i}', 'cpf': f'{i:011d}', 'birth_date': '1990-01-01'}
+
+class TestChangeFeed(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.previous_repository = get_user_repository()
+        self.app = create_app(config_by_name['testing'])
+        self.repository = SqliteUserRepository(os.path.join(self.directory, 'users.db'))
+        set_user_repository(self.repository)
+        self.ids = [row['id'] for row in self.repository.insert_many([make_row(i) for i in range(1, 4)])]
+        user_cache.clear()
+        self.client = self.app.test_client()
+        token = generate_token({'id': 1, 'cpf': '12345678909', 'role': 'admin'}, self.app.config['SECRET_KEY'])
+        self.headers = {'Authorization': f'Bearer {token}'}
+        # Sem atraso de segurança: as alterações feitas no teste já aparecem no feed
+        self.lag = patch('config.config.Config.CHANGE_FEED_SAFETY_LAG', 0.0)
+        self.lag.start()
+
+    def tearDown(self):
+        self.lag.stop()
+        set_user_repository(self.previous_repository)
+        shutil.rmtree(self.directory)
+
+    def read(self, cursor=None, limit=2):
+        query = f'/api/users/changes?limit={limit}' + (f'&cursor={cursor}' if cursor else '')
+        response = self.client.get(query, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_pages_updates_and_deletes(self):
+        """Testa a paginação do feed e a entrega de atualizações e exclusões depois do cursor"""
+        first = self.read()
+        self.assertEqual([change['id'] for change in first['changes']], self.ids[:2])
+        self.assertTrue(first['has_more'])
+        second = self.read(first['next_cursor'])
+        self.assertEqual([change['id'] for change in second['changes']], self.ids[2:])
+        self.assertFalse(second['has_more'])
+        self.assertEqual(second['changes'][0]['user']['email'], 'user3@example.com')
+
+        # Nada novo: o cursor é mantido
+        cursor = second['next_cursor']
+        empty = self.read(cursor)
+        self.assertEqual((empty['changes'], empty['next_cursor'], empty['has_more']), ([], cursor, False))
+
+        UserService.update_user(self.ids[0], {'full_name': 'Renamed'})
+        UserService.delete_user(self.ids[1])
+        changes = self.read(cursor, limit=10)['changes']
+        self.assertEqual([(change['op'], change['id']) for change in changes],
+                         [('upsert', self.ids[0]), ('delete', self.ids[1])])
+        self.assertEqual(changes[0]['user']['full_name'], 'Renamed')
+
+    def test_safety_lag_and_invalid_cursor(self):
+        """Testa que alterações recentes aguardam o atraso de segurança e que cursores inválidos são recusados"""
+        with patch('config.config.Config.CHANGE_FEED_SAFETY_LAG', 60.0):
+            self.assertEqual(self.read()['changes'], [])
+        self.assertEqual(decode_cursor(encode_cursor('2024-01-01T10:00:00.000000', 7)), ('2024-01-01T10:00:00.000000', 7))
+        self.assertEqual(self.client.get('/api/users/changes?cursor=%%%', headers=self.headers).status_code, 400)
+        self.assertEqual(self.client.get('/api/users/changes').status_code, 401)
+
+    def test_failed_tombstone_keeps_user(self):
+        """Testa que uma falha ao registrar a exclusão desfaz a exclusão do usuário"""
+        # deleted_at nulo viola a restrição NOT NULL de user_tombstones
+        with patch('app.services.sqlite_user_repository.now_timestamp', return_value=None):
+            with self.assertRaises(Exception):
+                self.repository.delete(self.ids[0])
+        self.assertIsNotNone(self.repository.get_by_id(self.ids[0]))
+        self.assertEqual(self.repository.list_tombstones(None, now_timestamp(), 10), [])
+
+    @patch('config.config.Config.get_supabase_client')
+    def test_supabase_delete_is_one_transaction(self, mock_get_supabase):
+        """Testa que no Supabase a exclusão e o registro dela são uma única chamada (mesma transação)"""
+        client = mock_get_supabase.return_value
+        client.rpc.return_value.execute.return_value = MagicMock(data=[{'id': 5}])
+        self.assertEqual(SupabaseUserRepository().delete(5), {'id': 5})
+        client.rpc.assert_called_once()
+        self.assertEqual(client.rpc.call_args[0][0], DELETE_USER_FUNCTION)
+        self.assertEqual(client.rpc.call_args[0][1]['p_user_id'], 5)
+        client.table.assert_not_called()
+
+        # Usuário inexistente e falha na chamada: nenhuma gravação parcial fica para trás
+        client.rpc.return_value.execute.return_value = MagicMock(data=[])
+        self.assertIsNone(SupabaseUserRepository().delete(6))
+        client.rpc.return_value.execute.side_effect = RuntimeError('falha')
+        with self.assertRaises(RuntimeError):
+            SupabaseUserRepository().delete(7)
+        client.table.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import gzip
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config.config import config_by_name
+from app.models.user_model import User, UserBatch
+from app.utils.auth import generate_token
+
+def make_rows(count):
+    return [{'id': i, 'email': f'usuario{i}@example.com', 'full_name': f'Usuário {i}',
+             'cpf': '12345678909', 'birth_date': '1990-01-01'} for i in range(1, count + 1)]
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(config_by_name['testing'])
+        self.client = self.app.test_client()
+    
+    @patch('app.services.user_service.UserService.get_all_users')
+    def test_large_list_is_gzipped(self, mock_get_all_users):
+        """Testa compressão gzip de uma listagem grande"""
+        mock_get_all_users.return_value = (UserBatch.from_rows(make_rows(200)), None, None)
+        
+        plain = self.client.get('/api/users/')
+        response = self.client.get('/api/users/', headers={'Accept-Encoding': 'gzip'})
+        
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertLess(len(response.data), len(plain.data) / 4)
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+        
+        # O ETag da versão comprimida também valida o If-None-Match
+        etag = response.headers['ETag']
+        self.assertTrue(etag.endswith('-gzip"'))
+        response = self.client.get('/api/users/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+    
+    def test_small_response_is_not_compressed(self):
+        """Testa que respostas abaixo do limite não são comprimidas"""
+        response = self.client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+    
+    @patch('app.services.user_service.UserService.get_all_users')
+    def test_streamed_export_is_gzipped(self, mock_get_all_users):
+        """Testa compressão incremental da exportação em streaming"""
+        mock_get_all_users.return_value = (UserBatch.from_rows(make_rows(500)), None, None)
+        token = generate_token({'id': 1, 'cpf': '12345678909', 'role': 'admin'}, self.app.config['SECRET_KEY'])
+        
+        response = self.client.get('/api/users/export', headers={
+            'Authorization': f'Bearer {token}', 'Accept-Encoding': 'gzip'
+        })
+        
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response.headers)
+        rows = [json.loads(line) for line in gzip.decompress(response.data).decode().splitlines()]
+        self.assertEqual(len(rows), 500)
+        self.assertEqual(rows[-1]['email'], 'usuario500@example.com')
+
+if __name__ == '__main__':
+    unittest.main()
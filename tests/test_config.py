@@ -0,0 +1,60 @@
+import subprocess
+import unittest
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import Config
+
+class TestSupabaseClient(unittest.TestCase):
+    def setUp(self):
+        Config.reset_supabase_client()
+        self.env = patch.dict(os.environ, {'SUPABASE_URL': 'https://teste.supabase.co', 'SUPABASE_KEY': 'aaa.bbb.ccc'})
+        self.env.start()
+    
+    def tearDown(self):
+        Config.reset_supabase_client()
+        self.env.stop()
+    
+    def test_client_is_shared(self):
+        """Testa se o cliente é criado uma única vez por processo"""
+        client = Config.get_supabase_client()
+        self.assertIs(client, Config.get_supabase_client())
+        
+        # Verifica pool e cabeçalhos de autenticação da sessão substituída
+        session = client.postgrest.session
+        self.assertEqual(session.headers['Authorization'], 'Bearer aaa.bbb.ccc')
+        self.assertEqual(session.timeout.connect, Config.SUPABASE_CONNECT_TIMEOUT)
+    
+    def test_reset_client(self):
+        """Testa se o reset descarta o cliente compartilhado"""
+        client = Config.get_supabase_client()
+        Config.reset_supabase_client()
+        self.assertIsNot(client, Config.get_supabase_client())
+    
+    def test_client_rebuilt_after_fork(self):
+        """Testa se um novo cliente é criado quando o PID muda (fork do worker)"""
+        client = Config.get_supabase_client()
+        with patch('config.config.os.getpid', return_value=os.getpid() + 1):
+            self.assertIsNot(client, Config.get_supabase_client())
+
+class TestLazyImports(unittest.TestCase):
+    def test_create_app_does_not_import_supabase(self):
+        """Testa que criar a aplicação não carrega supabase, httpx, jwt nem numpy"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        script = (
+            'import sys\n'
+            'from app import create_app\n'
+            'from config.config import config_by_name\n'
+            "create_app(config_by_name['testing']).test_client().get('/api/health')\n"
+            "print(sorted(m for m in ('supabase', 'postgrest', 'httpx', 'jwt', 'numpy') if m in sys.modules))\n"
+        )
+        output = subprocess.run([sys.executable, '-c', script], cwd=root, check=True,
+                                capture_output=True, text=True).stdout
+        self.assertEqual(output.strip(), '[]')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.duplicate_index import BloomFilter, DuplicateIndex, duplicate_index
+from app.services.sqlite_user_repository import SqliteUserRepository
+from app.services.user_repository import get_user_repository, set_user_repository
+from app.services.user_service import UserService
+
+def make_cpf(i):
+    """Gera um CPF com dígitos verificadores corretos"""
+    digits = [int(digit) for digit in f'{i:09d}']
+    for size in (9, 10):
+        value = sum(digit * (size + 1 - position) for position, digit in enumerate(digits))
+        digits.append(value * 10 % 11 % 10)
+    return ''.join(map(str, digits))
+
+def make_row(i):
+    return {'email': f'u{i}@example.com', 'full_name': f'Usuário {i}', 'cpf': make_cpf(i), 'birth_date': '1990-01-01'}
+
+class TestBloomFilter(unittest.TestCase):
+    def test_sizing_and_false_positive_rate(self):
+        """Testa o dimensionamento e a taxa de falsos positivos próxima da configurada"""
+        bloom = BloomFilter(10000, 0.01)
+        self.assertEqual(bloom.hashes, 7)
+        self.assertLess(bloom.memory_bytes, 12500)
+        for i in range(10000):
+            bloom.add(f'email:u{i}@example.com')
+
+        self.assertTrue(all(f'email:u{i}@example.com' in bloom for i in range(10000)))
+        false_positives = sum(f'email:x{i}@example.com' in bloom for i in range(10000))
+        self.assertLess(false_positives / 10000, 0.02)
+        self.assertAlmostEqual(bloom.estimated_error_rate(), 0.01, delta=0.005)
+
+class TestDuplicateIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.previous_repository = get_user_repository()
+        self.repository = SqliteUserRepository(os.path.join(self.directory, 'users.db'))
+        set_user_repository(self.repository)
+        # Sem aquecimento em segundo plano: os testes chamam warm() (o thread usaria o diretório removido no tearDown)
+        self.start = patch.object(DuplicateIndex, 'start')
+        self.start.start()
+
+    def tearDown(self):
+        self.start.stop()
+        set_user_repository(self.previous_repository)
+        duplicate_index.reset()
+        duplicate_index.enabled = False
+        shutil.rmtree(self.directory)
+
+    def test_warm_in_pages(self):
+        """Testa o aquecimento a partir da tabela, página por página"""
+        self.repository.insert_many([make_row(i) for i in range(1, 26)])
+        index = DuplicateIndex(capacity=1000, page_size=10)
+        with patch.object(self.repository, 'list_page', wraps=self.repository.list_page) as list_page:
+            self.assertEqual(index.warm(), 25)
+        self.assertEqual(list_page.call_count, 3)
+
+        self.assertEqual(index.lookup({'email': 'u3@example.com', 'cpf': make_cpf(999)}), (None, ['email']))
+        self.assertEqual(index.lookup({'email': 'novo@example.com', 'cpf': make_cpf(999)}), (None, []))
+
+    def test_resume_after_fork(self):
+        """Testa que o processo filho mantém o filtro herdado e carrega só as linhas novas"""
+        self.repository.insert_many([make_row(i) for i in range(1, 11)])
+        index = DuplicateIndex(enabled=False, capacity=1000, page_size=4)
+        self.assertEqual(index.warm(), 10)
+        self.repository.insert_many([make_row(i) for i in range(11, 14)])
+
+        index.reset_after_fork()
+        self.assertEqual(index.warm(), 3)
+        self.assertEqual(index.stats()['items'], 26)
+
+    def test_confirmed_duplicates(self):
+        """Testa que duplicatas confirmadas são recusadas sem consulta até uma exclusão"""
+        index = DuplicateIndex(capacity=1000)
+        index.add(make_row(1))
+        index.confirm('email', 'u1@example.com')
+        self.assertEqual(index.lookup({'email': 'u1@example.com', 'cpf': make_cpf(2)}), ('email', []))
+        self.assertEqual(index.stats()['rejected_without_lookup'], 1)
+
+        index.mark_deleted()
+        self.assertEqual(index.lookup({'email': 'u1@example.com', 'cpf': make_cpf(2)}), (None, ['email']))
+
+    def test_create_user_rejects_duplicates(self):
+        """Testa o cadastro com o índice: duplicatas recusadas, repetições sem ida ao banco"""
+        self.repository.insert(make_row(1))
+        duplicate_index.enabled = True
+        duplicate_index.warm()
+
+        user, error = UserService.create_user(make_row(2))
+        self.assertIsNone(error)
+
+        with patch.object(self.repository, 'insert') as insert:
+            self.assertEqual(UserService.create_user(make_row(1)), (None, 'Email já cadastrado'))
+            self.assertEqual(UserService.create_user({**make_row(3), 'cpf': make_cpf(2)}), (None, 'CPF já cadastrado'))
+            with patch.object(self.repository, 'find_existing') as find_existing:
+                self.assertEqual(UserService.create_user(make_row(1)), (None, 'Email já cadastrado'))
+            find_existing.assert_not_called()
+        insert.assert_not_called()
+
+        # Após a exclusão, o email volta a ficar disponível
+        UserService.delete_user(user.id)
+        self.assertIsNone(UserService.create_user(make_row(2))[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config.config import config_by_name
+from app.services.sqlite_user_repository import SqliteUserRepository
+from app.services.user_repository import set_user_repository
+from app.services.user_cache import LocalSharedBackend, user_cache
+
+class TestConditionalGet(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        user_cache.clear()
+        self.app = create_app(config_by_name['testing'])
+        self.client = self.app.test_client()
+        self.repository = SqliteUserRepository(os.path.join(self.directory, 'users.db'))
+        set_user_repository(self.repository)
+        self.user = self.repository.insert({
+            'email': 'a@example.com', 'full_name': 'A', 'cpf': '12345678909', 'birth_date': '1990-01-01'
+        })
+    
+    def tearDown(self):
+        set_user_repository(None)
+        shutil.rmtree(self.directory)
+    
+    def test_user_not_modified(self):
+        """Testa 304 para usuário inalterado e 200 após atualização"""
+        response = self.client.get(f"/api/users/{self.user['id']}")
+        etag = response.headers['ETag']
+        self.assertEqual(response.status_code, 200)
+        
+        response = self.client.get(f"/api/users/me?id={self.user['id']}", headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        
+        self.client.put(f"/api/users/{self.user['id']}", json={'full_name': 'B'})
+        response = self.client.get(f"/api/users/{self.user['id']}", headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+    
+    def test_not_modified_uses_projection_without_cache(self):
+        """Testa que a validação sem cache consulta apenas as colunas de versão"""
+        etag = self.client.get(f"/api/users/{self.user['id']}").headers['ETag']
+        user_cache.clear()
+        
+        with patch.object(self.repository, 'get_by_id', wraps=self.repository.get_by_id) as mock_get:
+            response = self.client.get(f"/api/users/{self.user['id']}", headers={'If-None-Match': etag})
+        
+        self.assertEqual(response.status_code, 304)
+        mock_get.assert_called_once_with(self.user['id'], ('id', 'updated_at', 'last_login'))
+    
+    def test_write_in_other_worker_is_not_hidden(self):
+        """Testa que o cache local do worker não valida um ETag de uma versão alterada em outro worker"""
+        etag = self.client.get(f"/api/users/{self.user['id']}").headers['ETag']
+        # Atualização feita por outro worker: o cache local deste continua com a versão anterior
+        self.repository.update(self.user['id'], {'full_name': 'B', 'updated_at': '2030-01-01T00:00:00.000000'})
+        self.assertIsNotNone(user_cache.get(self.user['id']))
+        
+        response = self.client.get(f"/api/users/{self.user['id']}", headers={'If-None-Match': etag})
+        self.assertNotEqual(response.status_code, 304)
+    
+    def test_not_modified_from_shared_backend(self):
+        """Testa que com backend compartilhado o ETag é validado por ele, sem consultar o banco"""
+        with patch.object(user_cache, 'shared_backend', LocalSharedBackend()):
+            etag = self.client.get(f"/api/users/{self.user['id']}").headers['ETag']
+            with patch.object(self.repository, 'get_by_id', wraps=self.repository.get_by_id) as mock_get:
+                response = self.client.get(f"/api/users/{self.user['id']}", headers={'If-None-Match': etag})
+        
+        self.assertEqual(response.status_code, 304)
+        mock_get.assert_not_called()
+    
+    def test_list_not_modified(self):
+        """Testa ETag da listagem e mudança após novo cadastro"""
+        response = self.client.get('/api/users/?fields=email')
+        etag = response.headers['ETag']
+        self.assertEqual(json.loads(response.data)['users'], [{'email': 'a@example.com'}])
+        
+        response = self.client.get('/api/users/?fields=email', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        
+        self.repository.insert({'email': 'b@example.com', 'full_name': 'B', 'cpf': '52998224725', 'birth_date': '1990-01-01'})
+        response = self.client.get('/api/users/?fields=email', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
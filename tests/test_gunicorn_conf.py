@@ -0,0 +1,64 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.gunicorn_conf import available_cpus, io_threads, profile_settings
+
+class TestGunicornConf(unittest.TestCase):
+    def test_io_threads(self):
+        """Testa as threads pela fração de espera pelo banco, limitadas ao pool de conexões"""
+        self.assertEqual(io_threads(0.9, 20), 10)
+        self.assertEqual(io_threads(0.5, 20), 2)
+        self.assertEqual(io_threads(0.0, 20), 1)
+        self.assertEqual(io_threads(0.99, 8), 8)
+
+    def test_profile_settings(self):
+        """Testa workers e classe de worker de cada perfil"""
+        self.assertGreaterEqual(available_cpus(), 1)
+        self.assertEqual(profile_settings('io', 4)['workers'], 5)
+        self.assertEqual(profile_settings('cpu', 4), {'worker_class': 'sync', 'workers': 9, 'threads': 1})
+        self.assertEqual(profile_settings('asgi', 1)['workers'], 2)
+        with self.assertRaises(ValueError):
+            profile_settings('outro', 4)
+
+    def test_preload_starts_no_threads(self):
+        """Testa que importar a aplicação (preload no master) não inicia threads; a primeira requisição inicia"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        directory = tempfile.mkdtemp()
+        script = (
+            'import threading, time\n'
+            'import config.gunicorn_conf\n'
+            'from wsgi import app\n'
+            'time.sleep(0.2)\n'
+            'print(sorted(thread.name for thread in threading.enumerate()))\n'
+            "app.test_client().get('/api/health')\n"
+            "print('user-stats' in [thread.name for thread in threading.enumerate()])\n"
+        )
+        env = {**os.environ, 'FLASK_ENV': 'local', 'SQLITE_DATABASE_PATH': os.path.join(directory, 'users.db')}
+        try:
+            output = subprocess.run([sys.executable, '-c', script], cwd=root, env=env, check=True,
+                                    capture_output=True, text=True).stdout
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(output.split('\n')[:2], ["['MainThread']", 'True'])
+
+    def test_max_requests_default(self):
+        """Testa que a reciclagem fica desativada por padrão com os índices por worker ativos"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        script = 'import config.gunicorn_conf as conf; print(conf.max_requests)'
+        base = {key: value for key, value in os.environ.items() if key != 'GUNICORN_MAX_REQUESTS'}
+        disabled = {'DUPLICATE_INDEX_ENABLED': 'false', 'SEARCH_INDEX_ENABLED': 'false', 'USER_STATS_ENABLED': 'false'}
+        cases = [({}, '0'), (disabled, '1000'), ({'GUNICORN_MAX_REQUESTS': '500'}, '500')]
+        for env, expected in cases:
+            output = subprocess.run([sys.executable, '-c', script], cwd=root, env={**base, **env}, check=True,
+                                    capture_output=True, text=True).stdout
+            self.assertEqual(output.strip(), expected, env)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+from unittest.mock import ANY, patch, MagicMock
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.user_model import User
+from app.services.login_writer import LastLoginWriter
+from app.services.user_cache import user_cache
+
+class TestLastLoginWriter(unittest.TestCase):
+    def setUp(self):
+        self.writer = LastLoginWriter(flush_size=100, flush_interval=60)
+        # Evita iniciar a thread de segundo plano nos testes
+        self.writer._ensure_started = lambda: None
+    
+    @patch('config.config.Config.get_supabase_client')
+    def test_flush_merges_and_groups(self, mock_get_supabase):
+        """Testa que logins repetidos são mesclados e agrupados por horário"""
+        self.writer.record(1, '2024-01-01T10:00:00')
+        self.writer.record(1, '2024-01-01T10:00:05')
+        self.writer.record(2, '2024-01-01T10:00:05')
+        self.assertEqual(self.writer.stats()['queue_depth'], 2)
+        
+        written = self.writer.flush()
+        
+        self.assertEqual(written, 2)
+        mock_update = mock_get_supabase.return_value.table.return_value.update
+        mock_update.assert_called_once_with({'last_login': '2024-01-01T10:00:05', 'updated_at': ANY})
+        mock_update.return_value.in_.assert_called_once_with('id', [1, 2])
+        self.assertEqual(self.writer.stats()['queue_depth'], 0)
+    
+    @patch('config.config.Config.get_supabase_client')
+    def test_flush_invalidates_cached_users(self, mock_get_supabase):
+        """Testa que a gravação tira do cache os usuários com last_login desatualizado"""
+        user_cache.clear()
+        user_cache.set(User(id=1, last_login='2024-01-01T09:00:00'))
+        user_cache.set(User(id=3))
+        self.writer.record(1, '2024-01-01T10:00:00')
+        
+        self.writer.flush()
+        self.assertIsNone(user_cache.get(1))
+        self.assertIsNotNone(user_cache.get(3))
+        
+        # Falha na gravação: o cache continua válido
+        mock_get_supabase.side_effect = Exception('indisponível')
+        self.writer.record(3, '2024-01-01T10:00:00')
+        self.writer.flush()
+        self.assertIsNotNone(user_cache.get(3))
+    
+    @patch('config.config.Config.get_supabase_client')
+    def test_failed_flush_requeues(self, mock_get_supabase):
+        """Testa que falhas devolvem os logins à fila sem sobrescrever logins novos"""
+        mock_get_supabase.side_effect = Exception('indisponível')
+        self.writer.record(1, '2024-01-01T10:00:00')
+        
+        self.assertEqual(self.writer.flush(), 0)
+        self.writer.record(1, '2024-01-01T11:00:00')
+        
+        stats = self.writer.stats()
+        self.assertEqual(stats['queue_depth'], 1)
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(self.writer._pending[1], '2024-01-01T11:00:00')
+
+if __name__ == '__main__':
+    unittest.main()
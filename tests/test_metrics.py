@@ -0,0 +1,106 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config.config import config_by_name
+from app.utils.metrics import MetricsRegistry, MultiprocessExporter, merge_snapshots, render_prometheus, metrics
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.app = create_app(config_by_name['testing'])
+        self.client = self.app.test_client()
+    
+    @patch('config.config.Config.get_supabase_client')
+    def test_metrics_endpoint(self, mock_get_supabase):
+        """Testa histogramas por rota, contagem por status e tempo das chamadas ao banco"""
+        mock_get_supabase.return_value.table.return_value.select.return_value.eq.return_value.execute.return_value = MagicMock(data=[])
+        self.client.get('/api/health')
+        self.client.get('/api/users/999')
+        
+        response = self.client.get('/api/metrics')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.mimetype.startswith('text/plain'))
+        body = response.get_data(as_text=True)
+        self.assertIn('http_requests_total{endpoint="/api/health",method="GET",status="200"} 1', body)
+        self.assertIn('http_requests_total{endpoint="/api/users/<int:user_id>",method="GET",status="404"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{endpoint="/api/health",method="GET"} 1', body)
+        self.assertIn('backend_call_duration_seconds_count{method="get_user_by_id"} 1', body)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        # A própria coleta está em andamento
+        self.assertIn('http_requests_in_flight 1', body)
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Testa buckets cumulativos e +Inf"""
+        registry = MetricsRegistry(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            registry.observe('http_request_duration_seconds', (), value)
+        body = render_prometheus(merge_snapshots([registry.snapshot()]))
+        self.assertIn('http_request_duration_seconds_bucket{le="0.1"} 2', body)
+        self.assertIn('http_request_duration_seconds_bucket{le="1.0"} 3', body)
+        self.assertIn('http_request_duration_seconds_bucket{le="+Inf"} 4', body)
+        self.assertIn('http_request_duration_seconds_count 4', body)
+    
+    def test_multiprocess_aggregation(self):
+        """Testa a soma dos workers e o descarte de gauges de workers encerrados"""
+        directory = tempfile.mkdtemp()
+        try:
+            worker = MetricsRegistry()
+            worker.inc('http_requests_total', (('status', '200'),), 3)
+            worker.add_gauge('http_requests_in_flight')
+            
+            # Simula o arquivo de outro worker ainda ativo
+            alive = worker.snapshot()
+            alive['pid'] = os.getppid()
+            with open(os.path.join(directory, f'metrics_{os.getppid()}.json'), 'w') as f:
+                json.dump(alive, f)
+            
+            # Simula um worker que já encerrou
+            dead = worker.snapshot()
+            dead['pid'] = 2 ** 22 + 12345
+            
+            current = MetricsRegistry()
+            current.inc('http_requests_total', (('status', '200'),), 2)
+            snapshots = MultiprocessExporter(current, directory).snapshots()
+            merged = merge_snapshots(snapshots + [dead])
+            
+            self.assertEqual(merged['counters'][('http_requests_total', (('status', '200'),))], 8)
+            self.assertEqual(merged['gauges'][('http_requests_in_flight', ())], 1)
+        finally:
+            shutil.rmtree(directory)
+    
+    def test_multiprocess_collectors_by_pid(self):
+        """Testa que os valores dos coletores de cada worker ativo aparecem com o rótulo pid"""
+        directory = tempfile.mkdtemp()
+        try:
+            other = MetricsRegistry()
+            other.register_collector(lambda: {'search_index_users': 7.0})
+            alive = MultiprocessExporter(other, directory)._snapshot()
+            alive['pid'] = os.getppid()
+            dead = dict(alive, pid=2 ** 22 + 12345)
+            with open(os.path.join(directory, f'metrics_{os.getppid()}.json'), 'w') as f:
+                json.dump(alive, f)
+            
+            current = MetricsRegistry()
+            current.register_collector(lambda: {'search_index_users': 5.0})
+            merged = merge_snapshots(MultiprocessExporter(current, directory).snapshots() + [dead])
+            body = render_prometheus(merged)
+            
+            self.assertIn(f'search_index_users{{pid="{os.getpid()}"}} 5', body)
+            self.assertIn(f'search_index_users{{pid="{os.getppid()}"}} 7', body)
+            self.assertNotIn(f'pid="{dead["pid"]}"', body)
+            self.assertEqual(body.count('# TYPE search_index_users gauge'), 1)
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config.config import config_by_name
+from app.services.async_user_repository import ThreadedUserRepository
+from app.services.fault_injection import FaultInjectingUserRepository, FAULT_ERROR, FAULT_HANG, FAULT_OK
+from app.services.resilience import BackendUnavailable, CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResiliencePolicy
+from app.services.resilient_user_repository import AsyncResilientUserRepository, ResilientUserRepository
+from app.services.sqlite_user_repository import SqliteUserRepository
+from app.services.user_cache import user_cache
+from app.services.user_repository import get_user_repository, set_user_repository
+from app.services.user_service import UserService
+from app.utils.auth import generate_token
+
+def make_row(i):
+    return {'email': f'u{i}@example.com', 'full_name': f'Usuário {i}', 'cpf': f'{i:011d}', 'birth_date': '1990-01-01'}
+
+class ResilienceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.sqlite = SqliteUserRepository(os.path.join(self.directory, 'users.db'))
+        self.user_id = self.sqlite.insert(make_row(1))['id']
+        self.faults = FaultInjectingUserRepository(self.sqlite, hang_time=0.5)
+        self.policy = ResiliencePolicy(
+            deadline=0.3, read_retries=2, retry_base_delay=0.001, retry_max_delay=0.002,
+            failure_threshold=3, reset_timeout=0.1
+        )
+        self.repository = ResilientUserRepository(self.faults, self.policy)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+class TestResiliencePolicy(ResilienceTestCase):
+    def test_reads_are_retried(self):
+        """Testa que leituras são repetidas em falhas transitórias e escritas não"""
+        self.faults.script(FAULT_ERROR, FAULT_ERROR, FAULT_OK)
+        self.assertEqual(self.repository.get_by_id(self.user_id)['email'], 'u1@example.com')
+        self.assertEqual(self.faults.calls, 3)
+
+        self.faults.script(FAULT_ERROR)
+        with self.assertRaises(BackendUnavailable):
+            self.repository.insert(make_row(2))
+        self.assertEqual(self.faults.calls, 4)
+        self.assertIsNone(self.sqlite.get_by_credentials('u2@example.com', '1990-01-01'))
+
+    def test_deadline(self):
+        """Testa que uma chamada presa desiste no prazo"""
+        self.faults.script(FAULT_HANG)
+        start = time.perf_counter()
+        with self.assertRaises(DeadlineExceeded):
+            self.repository.get_by_id(self.user_id)
+        self.assertLess(time.perf_counter() - start, 0.45)
+        self.assertEqual(self.policy.stats()['deadline_exceeded'], 1)
+
+    def test_circuit_breaker(self):
+        """Testa que o circuito abre, recusa sem chamar o banco e fecha após uma chamada de teste"""
+        self.faults.failure_rate = 1.0
+        for _ in range(3):
+            with self.assertRaises(BackendUnavailable):
+                self.repository.delete(self.user_id)
+        self.assertEqual(self.policy.breaker.state, CircuitBreaker.OPEN)
+
+        with self.assertRaises(CircuitOpenError):
+            self.repository.get_by_id(self.user_id)
+        self.assertEqual(self.faults.calls, 3)
+
+        self.faults.failure_rate = 0.0
+        time.sleep(0.15)
+        self.assertEqual(self.repository.get_by_id(self.user_id)['id'], self.user_id)
+        self.assertEqual(self.policy.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_client_errors_do_not_open_circuit(self):
+        """Testa que erros do banco saudável (ex.: índice único) passam sem contar como falha"""
+        for _ in range(5):
+            with self.assertRaises(Exception) as context:
+                self.repository.insert(make_row(1))
+            self.assertNotIsInstance(context.exception, BackendUnavailable)
+        self.assertEqual(self.policy.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_slow_write_is_not_abandoned(self):
+        """Testa que uma escrita mais lenta que o prazo não é dada como falha depois de gravada"""
+        self.faults.latency = 0.4
+        row = self.repository.insert(make_row(2))
+        self.assertEqual(self.sqlite.get_by_id(row['id'])['email'], 'u2@example.com')
+        self.assertEqual(self.policy.stats()['deadline_exceeded'], 0)
+
+    def test_bulk_create_reports_slow_writes(self):
+        """Testa que o cadastro em lote reporta como criadas as linhas gravadas após o prazo"""
+        previous = get_user_repository()
+        set_user_repository(self.repository)
+        self.faults.latency = 0.4
+        try:
+            results = UserService.create_users_bulk([
+                {**make_row(2), 'cpf': '52998224725'}, {**make_row(3), 'cpf': '11144477735'}
+            ])
+        finally:
+            set_user_repository(previous)
+        self.assertEqual([result.get('error') for result in results], [None, None])
+        self.assertEqual(len(self.sqlite.list_page(10)), 3)
+
+    def test_bulk_create_does_not_retry_row_by_row(self):
+        """Testa que o cadastro em lote para no banco indisponível sem repetir linha a linha"""
+        previous = get_user_repository()
+        set_user_repository(self.repository)
+        self.faults.script(FAULT_ERROR)
+        try:
+            results = UserService.create_users_bulk([{**make_row(2), 'cpf': '52998224725'}, {**make_row(3), 'cpf': '11144477735'}])
+        finally:
+            set_user_repository(previous)
+        self.assertEqual([result.get('unavailable') for result in results], [True, True])
+        self.assertEqual(self.faults.calls, 1)
+        self.assertEqual(len(self.sqlite.list_page(10)), 1)
+
+    def test_bulk_create_returns_committed_chunks(self):
+        """Testa que uma falha no segundo bloco devolve os usuários já gravados e marca o resto para reenvio"""
+        app = create_app(config_by_name['testing'])
+        token = generate_token({'id': 1, 'cpf': '12345678909', 'role': 'admin'}, app.config['SECRET_KEY'])
+        users = [{**make_row(2), 'cpf': '52998224725'}, {**make_row(3), 'cpf': '11144477735'},
+                 {**make_row(4), 'cpf': '39053344705'}]
+        previous = get_user_repository()
+        set_user_repository(self.repository)
+        self.faults.script(FAULT_OK, FAULT_ERROR)
+        try:
+            # Blocos de duas linhas: o segundo bloco falha
+            create_users_bulk = UserService.create_users_bulk
+            with patch.object(UserService, 'create_users_bulk', lambda rows: create_users_bulk(rows, chunk_size=2)):
+                response = app.test_client().post('/api/users/register/bulk', json={'users': users},
+                                                  headers={'Authorization': f'Bearer {token}'})
+        finally:
+            set_user_repository(previous)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response.headers)
+        data = response.get_json()
+        self.assertEqual((data['created'], data['failed'], data['unavailable']), (2, 1, 1))
+        self.assertEqual([result['user']['email'] for result in data['results'][:2]], ['u2@example.com', 'u3@example.com'])
+        self.assertTrue(data['results'][2]['unavailable'])
+        self.assertEqual(self.faults.calls, 2)
+        self.assertEqual(len(self.sqlite.list_page(10)), 3)
+
+    def test_hedged_read(self):
+        """Testa que a leitura de cobertura responde quando a primeira fica presa"""
+        self.policy.hedge_delay = 0.02
+        self.faults.script(FAULT_HANG, FAULT_OK)
+        start = time.perf_counter()
+        self.assertEqual(self.repository.get_by_id(self.user_id)['id'], self.user_id)
+        self.assertLess(time.perf_counter() - start, 0.2)
+        self.assertEqual(self.policy.stats()['hedge_wins'], 1)
+
+class TestAsyncResilience(ResilienceTestCase, unittest.IsolatedAsyncioTestCase):
+    async def test_hedged_read_and_retries(self):
+        """Testa hedge e novas tentativas no repositório assíncrono"""
+        self.policy.hedge_delay = 0.02
+        repository = AsyncResilientUserRepository(ThreadedUserRepository(self.faults), self.policy)
+
+        self.faults.script(FAULT_HANG, FAULT_OK, FAULT_ERROR, FAULT_OK)
+        self.assertEqual((await repository.get_by_id(self.user_id))['id'], self.user_id)
+        self.assertEqual((await repository.list_page(10))[0]['id'], self.user_id)
+        self.assertEqual(self.policy.stats()['hedge_wins'], 1)
+        self.assertEqual(self.policy.stats()['retries'], 1)
+
+class TestBackendUnavailableResponse(ResilienceTestCase):
+    def test_open_circuit_returns_503(self):
+        """Testa que a API responde 503 com Retry-After quando o circuito está aberto"""
+        app = create_app(config_by_name['testing'])
+        previous = get_user_repository()
+        set_user_repository(self.repository)
+        user_cache.clear()
+        try:
+            for _ in range(3):
+                self.policy.breaker.record_failure()
+            response = app.test_client().get(f'/api/users/{self.user_id}')
+        finally:
+            set_user_repository(previous)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response.headers)
+        self.assertEqual(self.faults.calls, 0)
+
+if __name__ == '__main__':
+    unittest.main()
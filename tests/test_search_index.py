@@ -0,0 +1,167 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config.config import config_by_name
+from app.models.user_model import now_timestamp
+from app.services.search_index import SearchIndex, normalize, search_index
+from app.services.sqlite_user_repository import SqliteUserRepository
+from app.services.user_cache import user_cache
+from app.services.user_repository import get_user_repository, set_user_repository
+from app.services.user_service import UserService
+from app.utils.auth import generate_token
+
+USERS = [
+    ('Maria Silva', 'maria.silva@example.com'),
+    ('José Álvares', 'jose@example.com'),
+    ('Silvana Costa', 'scosta@example.com'),
+    ('Ana Maria Souza', 'ana@example.com')
+]
+
+def make_row(i, full_name, email):
+    return {'email': email, 'full_name': full_name, 'cpf': f'{i:011d}', 'birth_date': '1990-01-01'}
+
+class SearchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.previous_repository = get_user_repository()
+        self.repository = SqliteUserRepository(os.path.join(self.directory, 'users.db'))
+        set_user_repository(self.repository)
+        self.ids = [row['id'] for row in self.repository.insert_many(
+            [make_row(i, *user) for i, user in enumerate(USERS, 1)]
+        )]
+        user_cache.clear()
+        search_index.reset()
+        # Sem carregamento em segundo plano: os testes chamam warm() (o thread usaria o diretório removido no tearDown)
+        self.start = patch.object(SearchIndex, 'start')
+        self.start.start()
+
+    def tearDown(self):
+        self.start.stop()
+        set_user_repository(self.previous_repository)
+        search_index.reset()
+        search_index.enabled = False
+        shutil.rmtree(self.directory)
+
+class TestSearchIndex(SearchTestCase):
+    def test_prefix_case_and_accents(self):
+        """Testa a busca por prefixo sem diferenciar maiúsculas e acentos, com ranking e paginação"""
+        self.assertEqual(normalize('José ÁLVARES'), 'jose alvares')
+        index = SearchIndex(page_size=2)
+        self.assertEqual(index.warm(), 4)
+
+        self.assertEqual(index.search('ALV', 10), ([self.ids[1]], 1))
+        self.assertEqual(index.search('álvares jo', 10), ([self.ids[1]], 1))
+        self.assertEqual(index.search('jose@ex', 10), ([self.ids[1]], 1))
+        # Início do nome antes de outra palavra do nome
+        self.assertEqual(index.search('maria', 10), ([self.ids[0], self.ids[3]], 2))
+        self.assertEqual(index.search('sil', 1), ([self.ids[2]], 2))
+        self.assertEqual(index.search('sil', 1, offset=1), ([self.ids[0]], 2))
+        self.assertEqual(index.search('zzz', 10), ([], 0))
+
+    def test_maintained_by_service(self):
+        """Testa que cadastros, atualizações e exclusões mantêm o índice"""
+        search_index.enabled = True
+        search_index.warm()
+
+        user, _ = UserService.create_user({**make_row(5, 'Érica Mendes', 'erica@example.com'), 'cpf': '52998224725'})
+        self.assertEqual([found.id for found in UserService.search_users('erica')[0]], [user.id])
+
+        UserService.update_user(user.id, {'full_name': 'Érica Prado'})
+        self.assertEqual(UserService.search_users('mendes')[0], [])
+        self.assertEqual(UserService.search_users('prado')[0][0].full_name, 'Érica Prado')
+
+        UserService.delete_user(user.id)
+        self.assertEqual(UserService.search_users('erica')[0], [])
+        self.assertEqual(search_index.stats()['users'], 4)
+
+    def test_database_until_warmed(self):
+        """Testa que, antes de o índice carregar, a busca vai ao banco em vez de usar o índice parcial"""
+        search_index.enabled = True
+        self.assertFalse(search_index.warmed)
+        users, next_cursor, error = UserService.search_users('sil')
+        self.assertIsNone(error)
+        self.assertEqual([user.id for user in users], [self.ids[0], self.ids[2]])
+        self.assertEqual(search_index.stats()['queries'], 0)
+
+    def test_refresh_from_change_feed(self):
+        """Testa que alterações feitas por outros workers chegam ao índice pelo feed de alterações"""
+        with patch('config.config.Config.CHANGE_FEED_SAFETY_LAG', 0.0):
+            index = SearchIndex()
+            index.warm()
+            # Escritas direto no banco, sem os hooks deste processo
+            created = self.repository.insert({**make_row(5, 'Érica Mendes', 'erica@example.com'), 'updated_at': now_timestamp()})
+            self.repository.update(self.ids[1], {'full_name': 'José Prado', 'updated_at': now_timestamp()})
+            self.repository.delete(self.ids[0])
+            self.assertEqual(index.refresh(), 3)
+
+        self.assertEqual(index.search('erica', 10), ([created['id']], 1))
+        self.assertEqual(index.search('prado', 10), ([self.ids[1]], 1))
+        self.assertEqual(index.search('alvares', 10), ([], 0))
+        self.assertEqual(index.search('maria', 10), ([self.ids[3]], 1))
+
+class TestSearchRoute(SearchTestCase):
+    def test_search_pushdown(self):
+        """Testa a rota de busca com o índice desativado (filtros enviados ao banco)"""
+        app = create_app(config_by_name['testing'])
+        set_user_repository(self.repository)
+        client = app.test_client()
+        token = generate_token({'id': 1, 'cpf': '12345678909', 'role': 'admin'}, app.config['SECRET_KEY'])
+        headers = {'Authorization': f'Bearer {token}'}
+
+        response = client.get('/api/users/search?q=sil&limit=1', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual([user['id'] for user in data['users']], [self.ids[0]])
+
+        response = client.get(f"/api/users/search?q=sil&limit=1&after={data['next_cursor']}", headers=headers)
+        data = response.get_json()
+        self.assertEqual([user['id'] for user in data['users']], [self.ids[2]])
+        self.assertIsNone(data['next_cursor'])
+
+        self.assertEqual(client.get('/api/users/search?q=s', headers=headers).status_code, 400)
+        self.assertEqual(client.get('/api/users/search?q=sil').status_code, 401)
+
+    def test_cursor_keeps_its_mode(self):
+        """Testa que o cursor continua no modo que o gerou quando o índice do worker muda entre as páginas"""
+        app = create_app(config_by_name['testing'])
+        set_user_repository(self.repository)
+        client = app.test_client()
+        token = generate_token({'id': 1, 'cpf': '12345678909', 'role': 'admin'}, app.config['SECRET_KEY'])
+        headers = {'Authorization': f'Bearer {token}'}
+
+        def page(after=None):
+            query = '/api/users/search?q=sil&limit=1' + (f'&after={after}' if after else '')
+            return client.get(query, headers=headers)
+
+        # Primeira página no banco (ordem por ID); o índice termina de carregar antes da segunda
+        search_index.enabled = True
+        first = page().get_json()
+        self.assertEqual([user['id'] for user in first['users']], [self.ids[0]])
+        search_index.warm()
+        second = page(first['next_cursor']).get_json()
+        self.assertEqual([user['id'] for user in second['users']], [self.ids[2]])
+        self.assertIsNone(second['next_cursor'])
+
+        # Primeira página no índice (ordem por relevância); a segunda cai em um worker sem o índice
+        first = page().get_json()
+        self.assertEqual([user['id'] for user in first['users']], [self.ids[2]])
+        self.assertEqual(search_index.stats()['queries'], 1)
+        search_index.warmed = False
+        response = page(first['next_cursor'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['error'], 'Cursor de paginação inválido')
+
+        # Cursores de antes da mudança (números) e malformados também são recusados
+        self.assertEqual(page('4512').status_code, 400)
+        self.assertEqual(page('%%%').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
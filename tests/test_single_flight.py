@@ -0,0 +1,109 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.single_flight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.flight = SingleFlight()
+
+    def run_concurrently(self, fn, count=10):
+        """Dispara count threads chamando do('chave', fn) e retorna resultados e exceções"""
+        results, errors = [], []
+
+        def worker():
+            try:
+                results.append(self.flight.do('chave', fn))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        return results, errors
+
+    def test_concurrent_calls_share_result(self):
+        """Testa que threads simultâneos executam a função uma única vez"""
+        executions = []
+
+        def slow():
+            executions.append(1)
+            time.sleep(0.1)
+            return {'id': 1}
+
+        results, errors = self.run_concurrently(slow)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(executions), 1)
+        self.assertEqual(results, [{'id': 1}] * 10)
+        self.assertEqual(self.flight.stats(), {'calls': 1, 'coalesced': 9, 'errors': 0, 'in_flight': 0})
+
+    def test_error_propagates_and_key_is_released(self):
+        """Testa que a exceção chega a todos e a chave não fica presa"""
+        def failing():
+            time.sleep(0.1)
+            raise RuntimeError('banco indisponível')
+
+        results, errors = self.run_concurrently(failing)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 10)
+        self.assertTrue(all(str(error) == 'banco indisponível' for error in errors))
+
+        self.assertEqual(self.flight.do('chave', lambda: 'ok'), 'ok')
+        self.assertEqual(self.flight.stats()['in_flight'], 0)
+
+    def test_forget_starts_new_call(self):
+        """Testa que forget faz novas chamadas ignorarem a chamada em andamento"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return 'antigo'
+
+        thread = threading.Thread(target=lambda: self.flight.do('chave', slow))
+        thread.start()
+        started.wait(5)
+        self.flight.forget('chave')
+        self.assertEqual(self.flight.do('chave', lambda: 'novo'), 'novo')
+        release.set()
+        thread.join(5)
+
+    def test_async_calls_share_result(self):
+        """Testa o agrupamento de corrotinas e que cancelar o primeiro não afeta os demais"""
+        executions = []
+
+        async def slow():
+            executions.append(1)
+            await asyncio.sleep(0.05)
+            return 'usuário'
+
+        async def scenario():
+            first = asyncio.ensure_future(self.flight.do_async('chave', slow))
+            await asyncio.sleep(0)
+            others = [asyncio.ensure_future(self.flight.do_async('chave', slow)) for _ in range(5)]
+            first.cancel()
+            return await asyncio.gather(*others)
+
+        self.assertEqual(asyncio.run(scenario()), ['usuário'] * 5)
+        self.assertEqual(len(executions), 1)
+        self.assertEqual(self.flight.stats()['coalesced'], 5)
+        self.assertEqual(self.flight.stats()['in_flight'], 0)
+
+    def test_disabled(self):
+        """Testa que desativado cada chamada executa a função"""
+        flight = SingleFlight(enabled=False)
+        flight.do('chave', lambda: None)
+        self.assertEqual(flight.stats()['calls'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config.config import config_by_name
+from app.services.sqlite_user_repository import SqliteUserRepository
+from app.services.user_repository import set_user_repository
+from app.services.user_cache import user_cache
+
+def make_row(i):
+    return {'email': f'u{i}@example.com', 'full_name': f'Usuário {i}', 'cpf': f'{i:011d}', 'birth_date': '1990-01-01'}
+
+class TestSqliteUserRepository(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.repository = SqliteUserRepository(os.path.join(self.directory, 'users.db'))
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def test_crud(self):
+        """Testa inserção, consultas, atualização e exclusão"""
+        created = self.repository.insert(make_row(1))
+        self.assertEqual(created['status'], 'active')
+        self.assertEqual(self.repository.get_by_credentials('u1@example.com', '1990-01-01')['id'], created['id'])
+        
+        updated = self.repository.update(created['id'], {'full_name': 'Novo'})
+        self.assertEqual(updated['full_name'], 'Novo')
+        self.assertIsNone(self.repository.update(999, {'full_name': 'X'}))
+        
+        deleted = self.repository.delete(created['id'])
+        self.assertEqual((deleted['id'], deleted['full_name']), (created['id'], 'Novo'))
+        self.assertIsNone(self.repository.get_by_id(created['id']))
+        self.assertIsNone(self.repository.delete(created['id']))
+    
+    def test_unique_indexes(self):
+        """Testa que email e CPF duplicados são rejeitados sem inserir o bloco"""
+        self.repository.insert(make_row(1))
+        with self.assertRaises(Exception):
+            self.repository.insert_many([make_row(2), make_row(1)])
+        self.assertIsNone(self.repository.get_by_credentials('u2@example.com', '1990-01-01'))
+    
+    def test_list_page_and_projection(self):
+        """Testa paginação por ID com projeção de colunas"""
+        self.repository.insert_many([make_row(i) for i in range(1, 6)])
+        page = self.repository.list_page(2, after=2, columns=['id', 'email'])
+        self.assertEqual(page, [{'id': 3, 'email': 'u3@example.com'}, {'id': 4, 'email': 'u4@example.com'}])
+        with self.assertRaises(Exception):
+            self.repository.list_page(2, columns=['id; DROP TABLE users'])
+    
+    def test_get_many(self):
+        """Testa busca de vários IDs em uma consulta (IDs inexistentes são ignorados)"""
+        self.repository.insert_many([make_row(i) for i in range(1, 4)])
+        rows = self.repository.get_many([3, 1, 99], columns=['id'])
+        self.assertEqual(sorted(row['id'] for row in rows), [1, 3])
+        self.assertEqual(self.repository.get_many([]), [])
+    
+    def test_concurrent_readers(self):
+        """Testa leituras concorrentes com uma conexão por thread"""
+        self.repository.insert_many([make_row(i) for i in range(1, 51)])
+        errors = []
+        connections = []
+        
+        def read():
+            try:
+                connections.append(self.repository._connection())
+                for user_id in range(1, 51):
+                    assert self.repository.get_by_id(user_id)['id'] == user_id
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(len({id(connection) for connection in connections}), 8)
+
+class TestLocalConfigAPI(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        user_cache.clear()
+        self.path = patch.object(config_by_name['local'], 'SQLITE_DATABASE_PATH', os.path.join(self.directory, 'users.db'))
+        self.path.start()
+        self.app = create_app(config_by_name['local'])
+        self.client = self.app.test_client()
+    
+    def tearDown(self):
+        self.path.stop()
+        set_user_repository(None)
+        shutil.rmtree(self.directory)
+    
+    def test_register_and_get_user(self):
+        """Testa registro e consulta de usuário usando o repositório SQLite"""
+        response = self.client.post('/api/users/register', json={
+            'email': 'a@example.com', 'full_name': 'A', 'cpf': '12345678909', 'birth_date': '1990-01-01'
+        })
+        self.assertEqual(response.status_code, 201)
+        user_id = json.loads(response.data)['user']['id']
+        
+        user_cache.clear()
+        response = self.client.get(f'/api/users/{user_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['user']['email'], 'a@example.com')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.user_model import User
+from app.services.user_cache import UserCache, LocalSharedBackend, user_cache
+from app.services.user_service import UserService
+
+class TestUserCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        """Testa despejo do usuário menos usado quando o cache enche"""
+        cache = UserCache(max_size=2, ttl=60)
+        cache.set(User(id=1))
+        cache.set(User(id=2))
+        cache.get(1)
+        cache.set(User(id=3))
+        
+        self.assertIsNotNone(cache.get(1))
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.stats()['evictions'], 1)
+    
+    def test_ttl_expiry(self):
+        """Testa expiração das entradas pelo TTL"""
+        cache = UserCache(max_size=10, ttl=5)
+        with patch('app.services.user_cache.time.monotonic', return_value=100.0):
+            cache.set(User(id=1))
+        with patch('app.services.user_cache.time.monotonic', return_value=106.0):
+            self.assertIsNone(cache.get(1))
+        self.assertEqual(cache.stats()['misses'], 1)
+    
+    def test_shared_backend(self):
+        """Testa leitura de outro processo através do backend compartilhado"""
+        shared = LocalSharedBackend()
+        UserCache(shared_backend=shared).set(User(id=7, email='a@example.com'))
+        
+        other = UserCache(shared_backend=shared)
+        self.assertEqual(other.get(7).email, 'a@example.com')
+        self.assertEqual(other.stats()['hits'], 1)
+    
+    def test_read_started_before_write_is_discarded(self):
+        """Testa que uma leitura iniciada antes de uma escrita no mesmo ID não entra no cache"""
+        cache = UserCache(max_size=2, ttl=60)
+        before = cache.read_token()
+        cache.invalidate(1)
+        cache.set(User(id=1, full_name='Antigo'), before)
+        cache.set(User(id=2, full_name='Outro'), before)
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(cache.get(2).full_name, 'Outro')
+        self.assertEqual(cache.stats()['stale'], 1)
+        
+        # Leitura iniciada depois da escrita é aceita
+        cache.set(User(id=1, full_name='Novo'), cache.read_token())
+        self.assertEqual(cache.get(1).full_name, 'Novo')
+        
+        # IDs descartados do registro de escritas: leituras anteriores a eles são recusadas
+        before = cache.read_token()
+        for user_id in (3, 4, 5):
+            cache.invalidate(user_id)
+        cache.set(User(id=6), before)
+        self.assertIsNone(cache.get(6))
+
+class TestUserServiceCache(unittest.TestCase):
+    def setUp(self):
+        user_cache.clear()
+    
+    @patch('config.config.Config.get_supabase_client')
+    def test_get_user_by_id_read_through(self, mock_get_supabase):
+        """Testa que a segunda leitura do mesmo usuário não consulta o banco"""
+        mock_eq = mock_get_supabase.return_value.table.return_value.select.return_value.eq
+        mock_eq.return_value.execute.return_value = MagicMock(data=[{'id': 1, 'email': 'a@example.com'}])
+        
+        UserService.get_user_by_id(1)
+        user, error = UserService.get_user_by_id('1')
+        
+        self.assertIsNone(error)
+        self.assertEqual(user.email, 'a@example.com')
+        self.assertEqual(mock_eq.call_count, 1)
+        self.assertEqual(user_cache.stats()['hits'], 1)
+    
+    @patch('config.config.Config.get_supabase_client')
+    def test_slow_read_does_not_overwrite_update(self, mock_get_supabase):
+        """Testa que a linha de uma leitura lenta não substitui no cache a gravada por uma atualização concorrente"""
+        mock_eq = mock_get_supabase.return_value.table.return_value.select.return_value.eq
+
+        def slow_read(*args, **kwargs):
+            # Enquanto a leitura está no banco, outra requisição atualiza o usuário
+            user_cache.set(User(id=1, full_name='Novo'))
+            return MagicMock(data=[{'id': 1, 'full_name': 'Antigo'}])
+        mock_eq.return_value.execute.side_effect = slow_read
+        
+        user, _ = UserService.get_user_by_id(1)
+        self.assertEqual(user.full_name, 'Antigo')
+        self.assertEqual(user_cache.get(1).full_name, 'Novo')
+    
+    @patch('config.config.Config.get_supabase_client')
+    def test_update_and_delete_refresh_cache(self, mock_get_supabase):
+        """Testa que atualização substitui e exclusão invalida a entrada em cache"""
+        user_cache.set(User(id=1, full_name='Antigo'))
+        mock_table = mock_get_supabase.return_value.table.return_value
+        mock_table.select.return_value.eq.return_value.execute.return_value = MagicMock(
+            data=[{'id': 1, 'full_name': 'Antigo'}]
+        )
+        mock_table.update.return_value.eq.return_value.execute.return_value = MagicMock(
+            data=[{'id': 1, 'full_name': 'Novo'}]
+        )
+        
+        UserService.update_user(1, {'full_name': 'Novo'})
+        self.assertEqual(user_cache.get(1).full_name, 'Novo')
+        
+        mock_get_supabase.return_value.rpc.return_value.execute.return_value = MagicMock(data=[{'id': 1}])
+        UserService.delete_user(1)
+        self.assertIsNone(user_cache.get(1))
+
+    @patch('config.config.Config.get_supabase_client')
+    def test_update_sends_only_changes(self, mock_get_supabase):
+        """Testa que a atualização envia só as colunas alteradas e não grava quando nada muda"""
+        mock_table = mock_get_supabase.return_value.table.return_value
+        mock_table.select.return_value.eq.return_value.execute.return_value = MagicMock(
+            data=[{'id': 1, 'email': 'a@example.com', 'full_name': 'Antigo', 'role': 'user'}]
+        )
+        mock_table.update.return_value.eq.return_value.execute.return_value = MagicMock(
+            data=[{'id': 1, 'email': 'a@example.com', 'full_name': 'Novo'}]
+        )
+
+        user, error = UserService.update_user(1, {'email': 'a@example.com', 'full_name': 'Antigo', 'role': 'user'})
+        self.assertIsNone(error)
+        self.assertEqual(user.full_name, 'Antigo')
+        mock_table.update.assert_not_called()
+
+        UserService.update_user(1, {'id': 99, 'email': 'a@example.com', 'full_name': 'Novo', 'is_admin': True})
+        changes = mock_table.update.call_args[0][0]
+        self.assertEqual(set(changes), {'full_name', 'updated_at'})
+        self.assertEqual(changes['full_name'], 'Novo')
+
+    @patch('config.config.Config.get_supabase_client')
+    def test_update_ignores_stale_cache(self, mock_get_supabase):
+        """Testa que uma entrada desatualizada no cache não faz uma alteração real parecer sem efeito"""
+        # Outro worker voltou o nome para 'Antigo'; o cache deste ainda tem 'Novo'
+        user_cache.set(User(id=1, full_name='Novo'))
+        mock_table = mock_get_supabase.return_value.table.return_value
+        mock_table.select.return_value.eq.return_value.execute.return_value = MagicMock(
+            data=[{'id': 1, 'full_name': 'Antigo'}]
+        )
+        mock_table.update.return_value.eq.return_value.execute.return_value = MagicMock(
+            data=[{'id': 1, 'full_name': 'Novo'}]
+        )
+
+        user, error = UserService.update_user(1, {'full_name': 'Novo'})
+        self.assertIsNone(error)
+        self.assertEqual(mock_table.update.call_args[0][0]['full_name'], 'Novo')
+        self.assertEqual(user_cache.get(1).full_name, 'Novo')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+import sys
+import os
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.user_model import User, UserBatch
+
+ROWS = [
+    {'id': 1, 'email': 'a@example.com', 'full_name': 'A', 'cpf': '12345678909', 'birth_date': '1990-01-01'},
+    {'id': 2, 'email': 'b@example.com', 'full_name': 'B', 'cpf': '52998224725', 'birth_date': '1991-02-02', 'role': 'admin'}
+]
+
+class TestUserModel(unittest.TestCase):
+    def test_user_has_no_instance_dict(self):
+        """Testa que User usa __slots__"""
+        self.assertFalse(hasattr(User(id=1), '__dict__'))
+    
+    def test_batch_matches_user_serialization(self):
+        """Testa que o lote serializa igual a User.to_response_dict"""
+        batch = UserBatch.from_rows(ROWS)
+        expected = [User.from_dict(row).to_response_dict() for row in ROWS]
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch.to_response_dicts(), expected)
+        self.assertEqual([user.to_response_dict() for user in batch], expected)
+    
+    def test_batch_projection(self):
+        """Testa lote com colunas projetadas"""
+        batch = UserBatch.from_rows([{'id': 1, 'email': 'a@example.com'}], ['id', 'email'])
+        self.assertEqual(batch.to_response_dicts(['email']), [{'email': 'a@example.com'}])
+        self.assertEqual(batch.column('id'), [1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório pai ao path para importações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config.config import config_by_name
+from app.services.login_writer import last_login_writer
+from app.services.sqlite_user_repository import SqliteUserRepository
+from app.services.user_cache import user_cache
+from app.services.user_repository import get_user_repository, set_user_repository
+from app.services.user_service import UserService
+from app.services.user_stats import UserStats, user_stats
+from app.utils.auth import generate_token
+
+def make_row(i, **values):
+    return {'email': f'user{i}@example.com', 'full_name': f'User {i}', 'cpf': f'{i:011d}', 'birth_date': '1990-01-01', **values}
+
+class TestUserStats(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.previous_repository = get_user_repository()
+        self.repository = SqliteUserRepository(os.path.join(self.directory, 'users.db'))
+        set_user_repository(self.repository)
+        self.ids = [row['id'] for row in self.repository.insert_many([
+            make_row(1), make_row(2, role='admin'), make_row(3, status='inactive', created_at='2020-01-01T00:00:00')
+        ])]
+        user_cache.clear()
+        # Sem reconciliação em segundo plano: os testes chamam reconcile()
+        self.start = patch.object(UserStats, 'start')
+        self.start.start()
+        user_stats.enabled = True
+
+    def tearDown(self):
+        self.start.stop()
+        last_login_writer.flush()
+        set_user_repository(self.previous_repository)
+        user_stats.reset()
+        user_stats.enabled = False
+        shutil.rmtree(self.directory)
+
+    def test_incremental_matches_reconcile(self):
+        """Testa que cadastros, atualizações, exclusões e logins mantêm as contagens iguais às da tabela"""
+        self.assertIsNone(user_stats.snapshot())
+        self.assertEqual(user_stats.reconcile(), 3)
+        snapshot = user_stats.snapshot()
+        self.assertEqual(snapshot['by_status'], {'active': 2, 'inactive': 1})
+        self.assertEqual(snapshot['signups'], {'today': 2, 'last_7_days': 2, 'last_30_days': 2})
+
+        user, _ = UserService.create_user(make_row(4, cpf='52998224725'))
+        UserService.update_user(self.ids[0], {'status': 'blocked'})
+        UserService.delete_user(self.ids[1])
+        UserService.authenticate_user('user3@example.com', '1990-01-01')
+        # Login repetido antes da gravação: conta uma vez
+        UserService.authenticate_user('user3@example.com', '1990-01-01')
+
+        incremental = user_stats.snapshot()
+        self.assertEqual(incremental['total'], 3)
+        self.assertEqual(incremental['by_status'], {'active': 1, 'blocked': 1, 'inactive': 1})
+        self.assertEqual(incremental['by_role'], {'user': 3})
+        self.assertEqual(incremental['active_users']['today'], 1)
+        self.assertIsNotNone(incremental['updated_at'])
+
+        last_login_writer.flush()
+        user_stats.reconcile()
+        reconciled = user_stats.snapshot()
+        self.assertEqual({key: reconciled[key] for key in ('total', 'by_status', 'by_role', 'signups', 'active_users')},
+                         {key: incremental[key] for key in ('total', 'by_status', 'by_role', 'signups', 'active_users')})
+        self.assertEqual(user_stats.stats()['last_drift'], 0)
+
+    def test_delete_uses_deleted_row(self):
+        """Testa que a exclusão de um usuário fora do cache atualiza as contagens sem ler a linha antes"""
+        user_stats.reconcile()
+        with patch.object(self.repository, 'get_by_id', side_effect=AssertionError('leitura extra')):
+            self.assertEqual(UserService.delete_user(self.ids[1]), (True, None))
+        snapshot = user_stats.snapshot()
+        self.assertEqual((snapshot['total'], snapshot['by_role']), (2, {'user': 2}))
+
+    def test_changes_during_reconcile(self):
+        """Testa que alterações em linhas já lidas durante a reconciliação não se perdem"""
+        stats = UserStats(page_size=2)
+        list_page = self.repository.list_page
+
+        def changing_list_page(limit, after=None, columns=None):
+            page = list_page(limit, after, columns)
+            if after is not None:
+                # Linha da primeira página, já lida, passa a inativa
+                row = self.repository.update(self.ids[0], {'status': 'inactive'})
+                stats.record_change(self.ids[0], make_row(1, status='active'), row)
+            return page
+
+        with patch.object(self.repository, 'list_page', changing_list_page):
+            stats.reconcile()
+        self.assertEqual(stats.snapshot()['by_status'], {'active': 1, 'inactive': 2})
+
+    def test_stats_route(self):
+        """Testa a rota de estatísticas antes e depois da reconciliação"""
+        app = create_app(config_by_name['testing'])
+        set_user_repository(self.repository)
+        user_stats.enabled = True
+        client = app.test_client()
+        token = generate_token({'id': 1, 'cpf': '12345678909', 'role': 'admin'}, app.config['SECRET_KEY'])
+        headers = {'Authorization': f'Bearer {token}'}
+
+        self.assertEqual(client.get('/api/users/stats', headers=headers).status_code, 503)
+        user_stats.reconcile()
+        response = client.get('/api/users/stats', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()['stats']
+        self.assertEqual(data['by_role'], {'user': 2, 'admin': 1})
+        self.assertIsNotNone(data['reconciled_at'])
+        self.assertEqual(client.get('/api/users/stats').status_code, 401)
+
+if __name__ == '__main__':
+    unittest.main()
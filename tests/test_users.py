@@ -10,12 +10,15 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app import create_app
 from config.config import config_by_name
 from app.models.user_model import User
+from app.utils.auth import generate_token
+from app.services.user_cache import user_cache
 
 class TestUserAPI(unittest.TestCase):
     def setUp(self):
         self.app = create_app(config_by_name['testing'])
         self.client = self.app.test_client()
         self.headers = {'Content-Type': 'application/json'}
+        user_cache.clear()
     
     def test_health_check(self):
         """Testa rota de verificação de saúde da API"""
@@ -158,5 +161,148 @@ class TestUserAPI(unittest.TestCase):
         self.assertIn('error', data)
         self.assertIn('CPF', data['error'])
 
+    @patch('config.config.Config.get_supabase_client')
+    def test_get_users_paginated(self, mock_get_supabase):
+        """Testa listagem paginada por cursor com projeção de colunas"""
+        mock_supabase = MagicMock()
+        mock_get_supabase.return_value = mock_supabase
+        
+        # Cadeia select -> order -> gt -> limit -> execute
+        mock_query = mock_supabase.table.return_value.select.return_value.order.return_value
+        mock_query.gt.return_value.limit.return_value.execute.return_value = MagicMock(
+            data=[
+                {'id': 11, 'email': 'a@example.com'},
+                {'id': 12, 'email': 'b@example.com'},
+                {'id': 13, 'email': 'c@example.com'}
+            ]
+        )
+        
+        response = self.client.get('/api/users/?limit=2&after=10&fields=email')
+        
+        # Verifica resposta
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['users'], [{'email': 'a@example.com'}, {'email': 'b@example.com'}])
+        self.assertEqual(data['next_cursor'], 12)
+        
+        # Verifica que a projeção e o cursor foram enviados ao banco
+        mock_supabase.table.return_value.select.assert_called_once_with('id,email,updated_at,last_login')
+        mock_query.gt.assert_called_once_with('id', 10)
+        mock_query.gt.return_value.limit.assert_called_once_with(3)
+    
+    def test_get_users_invalid_fields(self):
+        """Testa listagem com coluna desconhecida em fields"""
+        response = self.client.get('/api/users/?fields=email,senha')
+        self.assertEqual(response.status_code, 400)
+        data = json.loads(response.data)
+        self.assertIn('senha', data['error'])
+
+    @patch('config.config.Config.get_supabase_client')
+    def test_get_users_batch(self, mock_get_supabase):
+        """Testa busca em lote: uma consulta in_, ordem pedida, IDs ausentes e cache"""
+        mock_supabase = MagicMock()
+        mock_get_supabase.return_value = mock_supabase
+        user_cache.set(User(id=3, email='cache@example.com'))
+        
+        mock_in = mock_supabase.table.return_value.select.return_value.in_
+        mock_in.return_value.execute.return_value = MagicMock(
+            data=[{'id': 7, 'email': 'b@example.com'}, {'id': 5, 'email': 'a@example.com'}]
+        )
+        
+        response = self.client.get('/api/users/batch?ids=5,3,9,7,5')
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual([user['id'] for user in data['users']], [5, 3, 7])
+        self.assertEqual(data['missing'], [9])
+        
+        # Apenas os IDs fora do cache vão ao banco, em uma única consulta
+        mock_in.assert_called_once_with('id', [5, 9, 7])
+    
+    def test_get_users_batch_invalid(self):
+        """Testa validação dos IDs e do tamanho máximo da busca em lote"""
+        self.assertEqual(self.client.get('/api/users/batch').status_code, 400)
+        self.assertEqual(self.client.get('/api/users/batch?ids=1,abc').status_code, 400)
+        
+        max_ids = self.app.config['USERS_BATCH_MAX_IDS']
+        ids = ','.join(str(i) for i in range(max_ids + 1))
+        self.assertEqual(self.client.get(f'/api/users/batch?ids={ids}').status_code, 400)
+    
+    def _admin_headers(self):
+        """Cabeçalhos com token de administrador"""
+        token = generate_token({'id': 1, 'cpf': '12345678909', 'role': 'admin'}, self.app.config['SECRET_KEY'])
+        return {'Authorization': f'Bearer {token}'}
+    
+    @patch('app.services.user_service.UserService.get_all_users')
+    def test_export_users_ndjson(self, mock_get_all_users):
+        """Testa exportação em NDJSON percorrendo várias páginas"""
+        mock_get_all_users.side_effect = [
+            ([User(id=1, email='a@example.com')], 1, None),
+            ([User(id=2, email='b@example.com')], None, None)
+        ]
+        
+        response = self.client.get('/api/users/export', headers=self._admin_headers())
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        rows = [json.loads(line) for line in response.data.decode().splitlines()]
+        self.assertEqual([row['email'] for row in rows], ['a@example.com', 'b@example.com'])
+        self.assertEqual(mock_get_all_users.call_args_list[1].kwargs['after'], 1)
+    
+    @patch('app.services.user_service.UserService.get_all_users')
+    def test_export_users_csv(self, mock_get_all_users):
+        """Testa exportação em CSV"""
+        mock_get_all_users.return_value = ([User(id=1, email='a@example.com')], None, None)
+        
+        response = self.client.get('/api/users/export?format=csv', headers=self._admin_headers())
+        
+        self.assertEqual(response.status_code, 200)
+        lines = response.data.decode().splitlines()
+        self.assertEqual(lines[0], ','.join(User.FIELDS))
+        self.assertTrue(lines[1].startswith('1,a@example.com'))
+    
+    def test_export_users_requires_admin(self):
+        """Testa que a exportação exige token de administrador"""
+        token = generate_token({'id': 2, 'cpf': '12345678909', 'role': 'user'}, self.app.config['SECRET_KEY'])
+        response = self.client.get('/api/users/export', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 403)
+
+    @patch('config.config.Config.get_supabase_client')
+    def test_register_bulk(self, mock_get_supabase):
+        """Testa cadastro em lote com linhas inválidas e inserção em um único bloco"""
+        mock_insert = mock_get_supabase.return_value.table.return_value.insert
+        mock_insert.return_value.execute.return_value = MagicMock(
+            data=[
+                {'id': 1, 'email': 'a@example.com', 'cpf': '12345678909'},
+                {'id': 2, 'email': 'b@example.com', 'cpf': '52998224725'}
+            ]
+        )
+        
+        users = [
+            {'email': 'a@example.com', 'full_name': 'A', 'cpf': '12345678909', 'birth_date': '1990-01-01'},
+            {'email': 'x@example.com', 'full_name': 'X', 'cpf': '11111111111', 'birth_date': '1990-01-01'},
+            {'email': 'b@example.com', 'full_name': 'B', 'cpf': '52998224725', 'birth_date': '1991-02-02'},
+            {'email': 'a@example.com', 'full_name': 'A2', 'cpf': '39053344705', 'birth_date': '1990-01-01'}
+        ]
+        
+        response = self.client.post(
+            '/api/users/register/bulk',
+            data=json.dumps({'users': users}),
+            headers={**self.headers, **self._admin_headers()}
+        )
+        
+        self.assertEqual(response.status_code, 201)
+        data = json.loads(response.data)
+        self.assertEqual(data['created'], 2)
+        self.assertEqual(data['failed'], 2)
+        self.assertEqual(data['results'][0]['user']['id'], 1)
+        self.assertIn('CPF', data['results'][1]['error'])
+        self.assertEqual(data['results'][2]['user']['id'], 2)
+        self.assertIn('duplicado', data['results'][3]['error'])
+        
+        # Apenas uma chamada de inserção com as duas linhas válidas
+        mock_insert.assert_called_once()
+        self.assertEqual(len(mock_insert.call_args.args[0]), 2)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,5 @@
+from app import create_app
+from config.config import app_config
+
+# Cria a aplicação WSGI (gunicorn wsgi:app; o módulo app.py é encoberto pelo pacote app)
+app = create_app(app_config)